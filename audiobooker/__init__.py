@@ -1,5 +1,5 @@
 """audiobooker package"""
 
-from . import pdf_processor, chunker, tts_providers, text_cleaner, generator
+from . import pdf_processor, chunker, tts_providers, tts_cache, mp3_concat, text_cleaner, generator
 
-__all__ = ["pdf_processor", "chunker", "tts_providers", "text_cleaner", "generator"]
+__all__ = ["pdf_processor", "chunker", "tts_providers", "tts_cache", "mp3_concat", "text_cleaner", "generator"]
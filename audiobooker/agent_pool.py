@@ -0,0 +1,249 @@
+"""Pool of long-lived OpenClaw agent processes, reused across calls and jobs.
+
+A session is one agent process started with `SESSION_COMMAND` that speaks JSON
+lines on stdin/stdout: each request is `{"id": n, "type": "message",
+"message": ...}` (or `"type": "ping"`) and is answered by a line carrying the
+same `id` and a `"reply"` (or `"pong": true`). Sessions are health-checked
+before reuse when idle, replaced when they die, and killed when a call
+exceeds its timeout.
+"""
+
+import atexit
+import itertools
+import json
+import os
+import queue
+import shlex
+import subprocess
+import threading
+import time
+from typing import Dict, List, NoReturn, Optional, Sequence, Tuple
+
+SESSION_COMMAND = tuple(shlex.split(os.environ.get("OPENCLAW_SESSION_CMD", "openclaw agent --stdio --no-interactive")))
+
+
+class AgentError(RuntimeError):
+    """Base class for agent session failures."""
+
+
+class AgentTimeout(AgentError):
+    """The agent did not answer within the per-call timeout."""
+
+
+class AgentDied(AgentError):
+    """The agent process exited or closed its output."""
+
+
+class AgentUnavailable(AgentError):
+    """No session could be started (e.g. the CLI has no session mode)."""
+
+
+class AgentSession:
+    """One agent process; a reader thread feeds its output lines to a queue so reads can time out."""
+
+    def __init__(self, command: Sequence[str], cwd: Optional[str] = None) -> None:
+        self.proc = subprocess.Popen(
+            list(command),
+            cwd=cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        self.last_used = time.monotonic()
+        self._ids = itertools.count(1)
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self) -> None:
+        assert self.proc.stdout is not None
+        for line in self.proc.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def request(self, payload: Dict, timeout: float) -> Dict:
+        """Send `payload` and wait up to `timeout` seconds for the reply with the same id."""
+        req_id = next(self._ids)
+        try:
+            assert self.proc.stdin is not None
+            self.proc.stdin.write(json.dumps(dict(payload, id=req_id)) + "\n")
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise AgentDied(f"agent stdin closed: {e}") from e
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise AgentTimeout(f"no reply within {timeout:.0f}s")
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                raise AgentTimeout(f"no reply within {timeout:.0f}s") from None
+            if line is None:
+                raise AgentDied(f"agent exited with code {self.proc.wait()}")
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                continue  # log output interleaved with replies
+            if isinstance(msg, dict) and msg.get("id") == req_id:
+                self.last_used = time.monotonic()
+                return msg
+
+    def ping(self, timeout: float) -> bool:
+        try:
+            return bool(self.request({"type": "ping"}, timeout).get("pong"))
+        except AgentError:
+            return False
+
+    def close(self) -> None:
+        if self.alive():
+            self.proc.kill()
+        self.proc.wait()
+        for f in (self.proc.stdin, self.proc.stdout):
+            try:
+                if f is not None:
+                    f.close()
+            except OSError:
+                pass
+
+
+class AgentPool:
+    """Up to `size` agent sessions shared by concurrent callers.
+
+    `call()` checks out an idle session (pinging it first if it has been idle
+    longer than `health_interval`), replacing dead ones. A call that times out
+    kills its session; one that finds its agent dead is retried once on a fresh
+    session. If no session can be started, the pool disables itself for
+    `retry_after` seconds and raises AgentUnavailable so callers can fall back.
+    """
+
+    def __init__(
+        self,
+        command: Sequence[str] = SESSION_COMMAND,
+        size: int = 4,
+        timeout: float = 300.0,
+        cwd: Optional[str] = None,
+        health_interval: float = 30.0,
+        startup_timeout: float = 15.0,
+        retry_after: float = 600.0,
+    ) -> None:
+        self.command = list(command)
+        self.size = size
+        self.timeout = timeout
+        self.cwd = cwd
+        self.health_interval = health_interval
+        self.startup_timeout = startup_timeout
+        self.retry_after = retry_after
+        self.started = 0
+        self.restarts = 0
+        self._idle: List[AgentSession] = []
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._disabled_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+
+    def _start(self) -> AgentSession:
+        try:
+            session = AgentSession(self.command, cwd=self.cwd)
+        except OSError as e:
+            self._disable(str(e))
+        if not session.ping(self.startup_timeout):
+            session.close()
+            self._disable("agent did not answer a health check")
+        with self._lock:
+            self.started += 1
+        return session
+
+    def _disable(self, reason: str) -> NoReturn:
+        self._disabled_until = time.monotonic() + self.retry_after
+        raise AgentUnavailable(f"cannot start agent session `{' '.join(self.command)}`: {reason}")
+
+    def _checkout(self) -> AgentSession:
+        while True:
+            with self._lock:
+                session = self._idle.pop() if self._idle else None
+            if session is None:
+                return self._start()
+            stale = time.monotonic() - session.last_used > self.health_interval
+            if session.alive() and (not stale or session.ping(self.startup_timeout)):
+                return session
+            session.close()
+            with self._lock:
+                self.restarts += 1
+
+    def call(self, message: str, timeout: Optional[float] = None) -> str:
+        """Send `message` to an agent session and return its reply text."""
+        if not self.available:
+            raise AgentUnavailable("agent sessions disabled after a failed start")
+        timeout = self.timeout if timeout is None else timeout
+        with self._slots:
+            for attempt in range(2):
+                session = self._checkout()
+                try:
+                    reply = session.request({"type": "message", "message": message}, timeout)
+                except AgentDied:
+                    session.close()
+                    with self._lock:
+                        self.restarts += 1
+                    if attempt:
+                        raise
+                    continue
+                except AgentTimeout:
+                    session.close()  # it may still answer later; never reuse it
+                    with self._lock:
+                        self.restarts += 1
+                    raise
+                with self._lock:
+                    self._idle.append(session)
+                return str(reply.get("reply", ""))
+        raise AssertionError("unreachable")
+
+    def health(self) -> Dict[str, int]:
+        """Ping every idle session, dropping dead ones; returns session counts."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        healthy = []
+        for s in idle:
+            if s.alive() and s.ping(self.startup_timeout):
+                healthy.append(s)
+            else:
+                s.close()
+                with self._lock:
+                    self.restarts += 1
+        with self._lock:
+            self._idle.extend(healthy)
+            return {"idle": len(healthy), "started": self.started, "restarts": self.restarts}
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for s in idle:
+            s.close()
+
+
+_SHARED: Dict[Tuple[Tuple[str, ...], Optional[str]], AgentPool] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_pool(command: Sequence[str] = SESSION_COMMAND, cwd: Optional[str] = None, **kwargs) -> AgentPool:
+    """Process-wide pool for `command`, so every processor (and web job) reuses the same agents."""
+    key = (tuple(command), cwd)
+    with _SHARED_LOCK:
+        pool = _SHARED.get(key)
+        if pool is None:
+            pool = _SHARED[key] = AgentPool(command, cwd=cwd, **kwargs)
+        return pool
+
+
+@atexit.register
+def _close_shared() -> None:
+    for pool in _SHARED.values():
+        pool.close()
@@ -0,0 +1,212 @@
+"""Batch generation: many books at once, sharing a CPU pool for extraction and one TTS limit."""
+
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from audiobooker.manifest import write_json_atomic
+
+# Order in which books start: largest first keeps the batch's total time short,
+# smallest first finishes the most books early, deadline is earliest first
+PRIORITIES = ("largest", "smallest", "deadline", "input")
+
+
+def find_pdfs(sources: Iterable[str]) -> List[Path]:
+    """PDF files named by `sources`: files, directories (searched recursively) and glob patterns.
+
+    Keeps the order given, dropping duplicates; a source matching nothing is reported and skipped.
+    """
+    found: Dict[Path, None] = {}
+    for source in sources:
+        if os.path.isdir(source):
+            matches = sorted(p for p in Path(source).rglob("*") if p.suffix.lower() == ".pdf")
+        elif os.path.isfile(source):
+            matches = [Path(source)]
+        else:
+            matches = sorted(Path(p) for p in glob.glob(source, recursive=True) if p.lower().endswith(".pdf"))
+        if not matches:
+            print(f"Warning: no PDF files match {source!r}")
+        for p in matches:
+            found.setdefault(p.resolve(), None)
+    return list(found)
+
+
+def book_folders(pdfs: Iterable[Path]) -> Dict[Path, str]:
+    """Output folder name for each book: its file stem, or, when several books share a stem, the stem
+    plus a short hash of the book's path, so same-named books from different directories never mix."""
+    pdfs = list(pdfs)
+    stems: Dict[str, int] = {}
+    for p in pdfs:
+        stems[p.stem] = stems.get(p.stem, 0) + 1
+    return {p: p.stem if stems[p.stem] == 1 else
+            f"{p.stem}-{hashlib.sha256(str(p.resolve()).encode('utf-8')).hexdigest()[:8]}" for p in pdfs}
+
+
+def load_deadlines(path: str) -> Dict[str, datetime]:
+    """Read a JSON object mapping PDF paths or file names to ISO 8601 deadlines."""
+    with open(path, encoding="utf-8") as f:
+        return {name: datetime.fromisoformat(when) for name, when in json.load(f).items()}
+
+
+def _deadline(pdf: Path, deadlines: Dict[str, datetime]) -> Optional[datetime]:
+    for name in (str(pdf), pdf.name):
+        if name in deadlines:
+            return deadlines[name]
+    return None
+
+
+def order_books(pdfs: List[Path], priority: str = "largest",
+                deadlines: Optional[Dict[str, datetime]] = None) -> List[Path]:
+    """Sort `pdfs` into start order for `priority` (see PRIORITIES).
+
+    With "deadline", books without one follow those with one, largest first.
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority {priority!r}; choose from {list(PRIORITIES)}")
+    if priority == "input":
+        return list(pdfs)
+    size = {p: p.stat().st_size for p in pdfs}
+    if priority == "smallest":
+        return sorted(pdfs, key=lambda p: size[p])
+    if priority == "largest":
+        return sorted(pdfs, key=lambda p: -size[p])
+    deadlines = deadlines or {}
+
+    def key(p: Path):
+        d = _deadline(p, deadlines)
+        return (d is None, d.timestamp() if d else 0.0, -size[p])
+
+    return sorted(pdfs, key=key)
+
+
+@dataclass
+class BookResult:
+    pdf: str
+    size_bytes: int
+    folder: Optional[str] = None  # output subfolder; defaults to the PDF's stem
+    status: str = "queued"  # queued -> running -> done | failed
+    parts: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    deadline: Optional[datetime] = None
+    queued_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # Wall time per generator stage (extract, clean, chapters, plan, tts, assemble)
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    _stage: Optional[str] = field(default=None, repr=False)
+    _stage_started: float = field(default=0.0, repr=False)
+
+    def progress(self, stage: str, done: int = 0, total: int = 0) -> None:
+        """Progress callback for the generator: charges elapsed time to the stage last reported."""
+        if stage != self._stage:
+            self._charge()
+            self._stage = stage
+
+    def _charge(self) -> None:
+        now = time.time()
+        if self._stage is not None:
+            self.stage_seconds[self._stage] = self.stage_seconds.get(self._stage, 0.0) + now - self._stage_started
+        self._stage_started = now
+
+    @property
+    def seconds(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+    @property
+    def met_deadline(self) -> Optional[bool]:
+        if self.deadline is None or self.finished_at is None:
+            return None
+        return self.status == "done" and self.finished_at <= self.deadline.timestamp()
+
+    def as_dict(self) -> dict:
+        return {
+            "pdf": self.pdf,
+            "size_bytes": self.size_bytes,
+            "folder": self.folder,
+            "status": self.status,
+            "parts": self.parts,
+            "error": self.error,
+            "deadline": self.deadline.isoformat() if self.deadline else None,
+            "met_deadline": self.met_deadline,
+            "wait_seconds": round((self.started_at or self.queued_at) - self.queued_at, 3),
+            "seconds": round(self.seconds, 3),
+            "stage_seconds": {k: round(v, 3) for k, v in self.stage_seconds.items()},
+        }
+
+
+def _run_book(result: BookResult, make_generator: Callable, executor) -> BookResult:
+    result.status = "running"
+    result.started_at = time.time()
+    result._stage_started = result.started_at
+    try:
+        gen = make_generator(progress=result.progress, extract_executor=executor)
+        result.parts = gen.process(result.pdf, folder_name=result.folder)
+        if not result.parts:
+            raise RuntimeError("No audio generated")
+        result.status = "done"
+    except Exception as e:
+        print(f"Book {result.pdf} failed: {e}")
+        result.status = "failed"
+        result.error = f"{type(e).__name__}: {e}"
+    finally:
+        result._charge()
+        result.finished_at = time.time()
+    return result
+
+
+def run_batch(
+    pdfs: List[Path],
+    make_generator: Callable,
+    books: int = 2,
+    cpu_workers: int = 0,
+    deadlines: Optional[Dict[str, datetime]] = None,
+) -> List[BookResult]:
+    """Generate every book in `pdfs` (in start order), `books` at a time; return their results.
+
+    `make_generator(progress=..., extract_executor=...)` builds the generator for
+    one book; extraction runs on a process pool of `cpu_workers` (0 = one per
+    core) shared by all books, and a failing book does not stop the others.
+    Each book writes to its own folder (see `book_folders`).
+    Share one `SharedLimit` between the generators to cap TTS requests overall.
+    """
+    folders = book_folders(pdfs)
+    results = [BookResult(pdf=str(p), size_bytes=p.stat().st_size, folder=folders[p],
+                          deadline=_deadline(p, deadlines or {})) for p in pdfs]
+    with ProcessPoolExecutor(max_workers=cpu_workers or os.cpu_count() or 1) as cpu, \
+            ThreadPoolExecutor(max_workers=max(1, books), thread_name_prefix="audiobooker-book") as pool:
+        for f in [pool.submit(_run_book, r, make_generator, cpu) for r in results]:
+            f.result()
+    return results
+
+
+def write_report(results: List[BookResult], path: str, wall_seconds: float, **extra) -> dict:
+    """Write the batch summary as JSON to `path` and print a per-book table; return the report."""
+    report = {
+        "books": len(results),
+        "done": sum(r.status == "done" for r in results),
+        "failed": sum(r.status == "failed" for r in results),
+        "missed_deadlines": sum(r.met_deadline is False for r in results),
+        "wall_seconds": round(wall_seconds, 3),
+        **extra,
+        "results": [r.as_dict() for r in results],
+    }
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(Path(path), report)
+    for r in results:
+        stages = " ".join(f"{k} {v:.1f}s" for k, v in r.stage_seconds.items())
+        note = f"  ERROR {r.error}" if r.error else ""
+        if r.met_deadline is False:
+            note += "  (missed deadline)"
+        print(f"{r.status:<6} {r.seconds:8.1f}s  {Path(r.pdf).name}  [{stages}]{note}")
+    print(f"{report['done']}/{report['books']} books done, {report['failed']} failed, "
+          f"{wall_seconds:.1f}s total. Report: {path}")
+    return report
@@ -1,37 +1,185 @@
-
-
 """Text chunking utilities for natural sentence-aware splitting."""
 
-"""Text chunking utilities for natural sentence-aware splitting."""
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Tuple
 
 import regex as re
 
 SENTENCE_RE = re.compile(r'(.+?[\.\?\!]["\']?\s+)', flags=re.S)
+# Just the terminator of SENTENCE_RE: scanning for ends avoids the lazy `.+?` walk
+_SENTENCE_END_RE = re.compile(r'[\.\?\!]["\']?\s+')
+
+
+@dataclass
+class Chunk:
+    """A TTS-sized piece of text with its location in the source text.
+
+    `start`/`end` are character offsets into the source; `sentence_start` and
+    `sentence_end` index the sentences it covers (end exclusive). A chunk that
+    opens with overlap words starts inside the previous chunk's last sentence.
+    """
+
+    text: str
+    start: int
+    end: int
+    sentence_start: int
+    sentence_end: int
+
+
+def iter_sentence_spans(text: str) -> Iterator[Tuple[int, int]]:
+    """Yield `(start, end)` offsets of each whitespace-stripped sentence in one regex pass.
+
+    Sentences are exactly those SENTENCE_RE finds, plus any trailing remainder.
+    """
+    last = 0
+    for m in _SENTENCE_END_RE.finditer(text):
+        if m.start() == last:
+            continue  # SENTENCE_RE needs at least one character before the terminator
+        s, e = last, m.end()
+        while text[s].isspace():
+            s += 1
+        yield s, m.start() + len(m.group().rstrip())
+        last = e
+    seg = text[last:]
+    if seg.strip():
+        yield last + (len(seg) - len(seg.lstrip())), len(text) - (len(seg) - len(seg.rstrip()))
 
 
 def split_into_sentences(text: str) -> list[str]:
     """Return a list of sentences found in `text` using a lightweight regex."""
-    parts = [m.group(1).strip() for m in SENTENCE_RE.finditer(text)]
-    tail = SENTENCE_RE.sub("", text).strip()
-    if tail:
-        parts.append(tail)
+    parts = [text[s:e] for s, e in iter_sentence_spans(text)]
     return parts if parts else [text]
 
 
+def _tail_words_start(text: str, lo: int, hi: int, n: int) -> int:
+    """Offset of the `n`-th last whitespace-separated word in `text[lo:hi]` (or `lo`)."""
+    i = hi
+    for _ in range(n):
+        while i > lo and text[i - 1].isspace():
+            i -= 1
+        if i <= lo:
+            return lo
+        while i > lo and not text[i - 1].isspace():
+            i -= 1
+    while i < hi and text[i].isspace():
+        i += 1
+    return i
+
+
+def iter_chunks(text: str, max_chars: int = 4000, overlap: int = 200) -> Iterator[Chunk]:
+    """Yield chunks of at most `max_chars` (sentences permitting) in a single pass.
+
+    Chunks break only between sentences; a sentence longer than `max_chars`
+    becomes a chunk of its own. Each chunk after the first repeats roughly
+    `overlap` characters (`overlap // 5` words) of its predecessor; pass
+    `overlap=0` to emit every word exactly once.
+    """
+    return _chunk_spans(text, iter_sentence_spans(text), max_chars, overlap)
+
+
+def _chunk_spans(text, sentences: Iterable[Tuple[int, int]], max_chars: int, overlap: int) -> Iterator[Chunk]:
+    # `text` is a str or a _Window; `sentences` are (start, end) offsets into it
+    n_words = overlap // 5
+    parts: list[str] = []
+    cur_len = start = end = first = 0
+    spans: list[int] = []  # start offsets of the sentences in `parts`
+    span_idx: list[int] = []
+    idx = -1
+    for idx, (s_start, s_end) in enumerate(sentences):
+        s_len = s_end - s_start
+        if parts and cur_len + s_len + 1 > max_chars:
+            yield Chunk(" ".join(parts), start, end, first, idx)
+            if n_words:
+                ov_start = _tail_words_start(text, start, end, n_words)
+                k = bisect_right(spans, ov_start) - 1
+                first = span_idx[k] if k >= 0 else first
+                start = ov_start
+                parts = [" ".join(text[ov_start:end].split())]
+                cur_len = len(parts[0])
+            else:
+                parts = []
+            spans, span_idx = [], []
+        if parts:
+            cur_len += s_len + 1
+        else:
+            start, first, cur_len = s_start, idx, s_len
+        parts.append(text[s_start:s_end])
+        spans.append(s_start)
+        span_idx.append(idx)
+        end = s_end
+    if parts:
+        yield Chunk(" ".join(parts), start, end, first, idx + 1)
+
+
 def chunk_text(text: str, max_chars: int = 4000, overlap: int = 200) -> list[str]:
     """Split `text` into chunks not exceeding `max_chars`, with `overlap` approx characters of overlap.
 
     This preserves sentence boundaries to avoid mid-sentence truncation.
     """
-    sentences = split_into_sentences(text)
-    chunks: list[str] = []
-    cur = ""
-    for s in sentences:
-        if len(cur) + len(s) + 1 <= max_chars:
-            cur = (cur + " " + s).strip()
+    return [c.text for c in iter_chunks(text, max_chars=max_chars, overlap=overlap)]
+
+
+class _Window:
+    """The recent part of a text stream, indexed by offsets into the whole stream."""
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.base = 0  # stream offset of text[0]
+        self.keep = 0  # text before this offset is no longer needed
+
+    def append(self, piece: str) -> None:
+        if self.keep > self.base:
+            self.text = self.text[self.keep - self.base:]
+            self.base = self.keep
+        self.text += piece
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.text[i.start - self.base:i.stop - self.base]
+        return self.text[i - self.base]
+
+
+def _stream_sentence_spans(pieces: Iterable[str], window: _Window) -> Iterator[Tuple[int, int]]:
+    """`iter_sentence_spans` over the concatenation of `pieces`, read into `window` as needed.
+
+    A terminator at the end of the text read so far may still grow (more
+    whitespace), so its sentence is only yielded once more text follows it.
+    """
+    last = 0
+    done = False
+    pieces = iter(pieces)
+    while not done:
+        piece = next(pieces, None)
+        if piece is None:
+            done = True
         else:
-            chunks.append(cur)
-            cur = " ".join(cur.split()[-overlap // 5 :]) + " " + s
-    if cur:
-        chunks.append(cur)
-    return chunks
+            window.keep = min(window.keep, last)
+            window.append(piece)
+        text, base = window.text, window.base
+        for m in _SENTENCE_END_RE.finditer(text, last - base):
+            if m.end() == len(text) and not done:
+                break
+            if m.start() == last - base:
+                continue
+            s = last - base
+            while text[s].isspace():
+                s += 1
+            yield base + s, base + m.start() + len(m.group().rstrip())
+            last = base + m.end()
+    seg = window[last:window.base + len(window.text)]
+    if seg.strip():
+        yield last + (len(seg) - len(seg.lstrip())), window.base + len(window.text) - (len(seg) - len(seg.rstrip()))
+
+
+def iter_chunks_stream(pieces: Iterable[str], max_chars: int = 4000, overlap: int = 200) -> Iterator[str]:
+    """Chunk text that arrives in pieces (e.g. cleaned pages) exactly as `chunk_text` chunks their concatenation.
+
+    Holds about two chunks of text at a time, so chunks are available while
+    later pieces are still being produced.
+    """
+    window = _Window()
+    for chunk in _chunk_spans(window, _stream_sentence_spans(pieces, window), max_chars, overlap):
+        # the next chunk's overlap words come from this one; earlier text can go
+        window.keep = chunk.start
+        yield chunk.text
@@ -1,27 +1,62 @@
-
+import queue
+import random
 import smtplib
+import threading
+import time
+from dataclasses import dataclass
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import os
+from typing import List, Optional
+
 from dotenv import load_dotenv
 
+from audiobooker import metrics
+
 load_dotenv()
 
-def send_notification_email(recipient_email, audiobook_name, download_url):
-    """
-    Sends an email notification when an audiobook is ready.
-    Requires SMTP environment variables.
-    """
-    smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-    smtp_port = int(os.getenv("SMTP_PORT", "587"))
-    smtp_user = os.getenv("SMTP_USER")
-    smtp_pass = os.getenv("SMTP_PASSWORD")
-    sender_email = os.getenv("SENDER_EMAIL", smtp_user)
 
-    if not all([smtp_user, smtp_pass, recipient_email]):
-        print("Warning: Skipping email notification. SMTP_USER, SMTP_PASSWORD, or recipient_email not configured.")
-        return False
+@dataclass
+class SMTPSettings:
+    server: str = "smtp.gmail.com"
+    port: int = 587
+    user: Optional[str] = None
+    password: Optional[str] = None
+    sender: Optional[str] = None
+    starttls: bool = True
+    timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "SMTPSettings":
+        """Read SMTP_SERVER, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SENDER_EMAIL and SMTP_STARTTLS."""
+        user = os.getenv("SMTP_USER")
+        return cls(
+            server=os.getenv("SMTP_SERVER", "smtp.gmail.com"),
+            port=int(os.getenv("SMTP_PORT", "587")),
+            user=user,
+            password=os.getenv("SMTP_PASSWORD"),
+            sender=os.getenv("SENDER_EMAIL", user),
+            starttls=os.getenv("SMTP_STARTTLS", "1") != "0",
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.user and self.password)
 
+    def connect(self) -> smtplib.SMTP:
+        """Open an authenticated connection."""
+        server = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            server.login(self.user, self.password)
+        except BaseException:
+            server.close()
+            raise
+        return server
+
+
+def build_message(sender_email, recipient_email, audiobook_name, download_url) -> MIMEMultipart:
     msg = MIMEMultipart()
     msg['From'] = f"Audiobooker AI <{sender_email}>"
     msg['To'] = recipient_email
@@ -39,11 +74,22 @@ def send_notification_email(recipient_email, audiobook_name, download_url):
     The Audiobooker Team
     """
     msg.attach(MIMEText(body, 'plain'))
+    return msg
+
+
+def send_notification_email(recipient_email, audiobook_name, download_url):
+    """
+    Sends an email notification when an audiobook is ready.
+    Requires SMTP environment variables.
+    """
+    settings = SMTPSettings.from_env()
+    if not settings.configured or not recipient_email:
+        print("Warning: Skipping email notification. SMTP_USER, SMTP_PASSWORD, or recipient_email not configured.")
+        return False
 
+    msg = build_message(settings.sender, recipient_email, audiobook_name, download_url)
     try:
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        server.login(smtp_user, smtp_pass)
+        server = settings.connect()
         server.send_message(msg)
         server.quit()
         print(f"Notification email sent to {recipient_email}")
@@ -51,3 +97,204 @@ def send_notification_email(recipient_email, audiobook_name, download_url):
     except Exception as e:
         print(f"Error sending email: {e}")
         return False
+
+
+def _permanent(error: Exception) -> bool:
+    """True if the server refused the message for good (5xx), so a retry cannot help."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False  # the connection is at fault, not the message
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+@dataclass
+class NotificationStats:
+    queued: int = 0
+    sent: int = 0
+    failed: int = 0
+    dropped: int = 0  # queue full or SMTP not configured
+    retries: int = 0
+    batches: int = 0
+    connections: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "queued": self.queued,
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "retries": self.retries,
+            "batches": self.batches,
+            "connections": self.connections,
+        }
+
+
+class _Pending:
+    __slots__ = ("msg", "attempts")
+
+    def __init__(self, msg: MIMEMultipart) -> None:
+        self.msg = msg
+        self.attempts = 0
+
+
+class NotificationQueue:
+    """Send notification emails from a background thread over one reused SMTP connection.
+
+    `notify` only queues the message, so callers never wait for the mail
+    server. The sender collects a burst (up to `batch_size` messages, waiting
+    at most `batch_wait` seconds after the first) and sends it on the open,
+    already authenticated connection, reconnecting only when the server has
+    dropped it. The connection is closed after `idle_timeout` seconds without
+    mail. A message that fails with a temporary error is retried up to
+    `retries` times after a jittered exponential backoff; one the server
+    rejects outright (5xx) is dropped.
+    """
+
+    def __init__(self, settings: Optional[SMTPSettings] = None, max_queue: int = 1000, batch_size: int = 50,
+                 batch_wait: float = 0.5, retries: int = 5, backoff: float = 1.0, max_backoff: float = 60.0,
+                 idle_timeout: float = 60.0) -> None:
+        self.settings = settings or SMTPSettings.from_env()
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.idle_timeout = idle_timeout
+        self.stats = NotificationStats()
+        self._queue: "queue.Queue[Optional[_Pending]]" = queue.Queue(maxsize=max_queue)
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        """Messages waiting to be sent."""
+        return self._queue.qsize()
+
+    def notify(self, recipient_email, audiobook_name, download_url) -> bool:
+        """Queue a "your audiobook is ready" email; False if it was dropped."""
+        if not self.settings.configured or not recipient_email:
+            print("Warning: Skipping email notification. SMTP_USER, SMTP_PASSWORD, or recipient_email not configured.")
+            self._count("dropped")
+            return False
+        msg = build_message(self.settings.sender, recipient_email, audiobook_name, download_url)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Notification queue is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="email-notifier", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait(_Pending(msg))
+        except queue.Full:
+            print(f"Warning: Notification queue full; dropping email to {recipient_email}")
+            self._count("dropped")
+            return False
+        self._count("queued")
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Send what is queued (waiting at most `timeout` seconds), then stop and disconnect."""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def _count(self, field: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self.stats, field, getattr(self.stats, field) + n)
+        if field in ("sent", "failed", "dropped", "retries"):
+            metrics.NOTIFICATIONS.inc(n, outcome=field)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=self.idle_timeout if self._smtp is not None else None)
+            except queue.Empty:
+                self._disconnect()  # idle: do not hold the server's connection
+                continue
+            batch: List[_Pending] = []
+            if first is None:
+                stopping = True
+            else:
+                batch.append(first)
+            deadline = time.monotonic() + self.batch_wait
+            while not stopping and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+            if batch:
+                self._send_batch(batch)
+        self._disconnect()
+
+    def _send_batch(self, batch: List[_Pending]) -> None:
+        self._count("batches")
+        while batch:
+            try:
+                smtp = self._connection()
+            except Exception as e:
+                for pending in batch:
+                    pending.attempts += 1
+                batch = self._retry_later(batch, e)
+                continue
+            while batch:
+                pending = batch[0]
+                pending.attempts += 1
+                try:
+                    smtp.send_message(pending.msg)
+                except Exception as e:
+                    if _permanent(e):
+                        print(f"Error sending email to {pending.msg['To']}: {e}")
+                        self._count("failed")
+                        batch.pop(0)
+                        continue
+                    self._disconnect()
+                    batch = self._retry_later(batch, e)
+                    break
+                self._count("sent")
+                batch.pop(0)
+
+    def _retry_later(self, batch: List[_Pending], error: Exception) -> List[_Pending]:
+        """Drop messages out of attempts, then wait out the backoff; return what is left to send."""
+        left = []
+        for pending in batch:
+            if pending.attempts > self.retries:
+                print(f"Error sending email to {pending.msg['To']}: {error}")
+                self._count("failed")
+            else:
+                left.append(pending)
+        if left:
+            attempt = max(p.attempts for p in left)
+            self._count("retries", len(left))
+            time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** max(0, attempt - 1))))
+        return left
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()  # the server may have timed out the idle connection
+                return self._smtp
+            except (smtplib.SMTPException, OSError):
+                self._disconnect()
+        self._smtp = self.settings.connect()
+        self._count("connections")
+        return self._smtp
+
+    def _disconnect(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
@@ -0,0 +1,187 @@
+"""Single-pass M4B (AAC) and Opus encoding of synthesized chunks, with chapter markers.
+
+The chunk MP3s are streamed frame by frame into one ffmpeg process, so each
+part is decoded and encoded exactly once and no per-chapter files are
+written. Chapter start/end times come from the chunks' MPEG frame counts and
+are passed to ffmpeg as an ffmetadata file: as chapters, which the MP4 muxer
+turns into chapter atoms (M4B), or as Vorbis-comment chapter tags (Opus).
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from audiobooker.mp3_concat import iter_frames, probe
+
+try:
+    import ffmpeg
+except ImportError:
+    ffmpeg = None
+
+# "mp3" keeps the frame-level MP3 assembly; the others are encoded by ffmpeg
+OUTPUT_FORMATS = ("mp3", "m4b", "opus")
+# format -> (ffmpeg muxer, audio codec, bitrate); speech needs far less than music
+ENCODINGS = {
+    "m4b": ("ipod", "aac", "48k"),
+    "opus": ("ogg", "libopus", "32k"),
+}
+
+_BENCH = re.compile(r"bench: utime=([\d.]+)s stime=([\d.]+)s")
+
+
+def available() -> bool:
+    """True if ffmpeg-python is installed and the ffmpeg binary is on PATH."""
+    return ffmpeg is not None and shutil.which("ffmpeg") is not None
+
+
+@dataclass
+class Chapter:
+    title: str
+    start: float  # seconds
+    end: float
+
+
+@dataclass
+class EncodeStats:
+    """What producing one output file cost."""
+
+    format: str
+    bytes: int = 0
+    audio_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    # CPU time of the encode (ffmpeg's user + system time for M4B/Opus)
+    cpu_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "format": self.format,
+            "bytes": self.bytes,
+            "audio_seconds": round(self.audio_seconds, 3),
+            "wall_seconds": round(self.wall_seconds, 3),
+            "cpu_seconds": round(self.cpu_seconds, 3),
+        }
+
+
+def chapter_marks(chapters: Sequence[Tuple[str, List[str]]]) -> List[Chapter]:
+    """Lay `(title, chunk paths)` chapters end to end, timed from the chunks' MP3 frames."""
+    marks = []
+    t = 0.0
+    for title, paths in chapters:
+        start = t
+        for p in paths:
+            t += probe(p).duration
+        marks.append(Chapter(title, start, t))
+    return marks
+
+
+def _escape(value: str) -> str:
+    # ffmetadata syntax: '=', ';', '#', '\' and newlines are backslash-escaped
+    return re.sub(r"([=;#\\\n])", r"\\\1", value)
+
+
+def _clock(seconds: float) -> str:
+    ms = round(seconds * 1000)
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d}.{ms % 1000:03d}"
+
+
+def ffmetadata(chapters: Sequence[Chapter], title: Optional[str] = None, comments: bool = False) -> str:
+    """Render chapters (and an optional title tag) in ffmpeg's ffmetadata format.
+
+    With `comments`, chapters are written as CHAPTERnnn/CHAPTERnnnNAME tags
+    (the Vorbis comment convention Ogg players read) instead of chapter
+    sections; ffmpeg's own conversion rounds the seconds field.
+    """
+    lines = [";FFMETADATA1"]
+    if title:
+        lines += [f"title={_escape(title)}", f"album={_escape(title)}", "genre=Audiobook"]
+    if comments:
+        for n, ch in enumerate(chapters):
+            lines += [f"CHAPTER{n:03d}={_escape(_clock(ch.start))}", f"CHAPTER{n:03d}NAME={_escape(ch.title)}"]
+        return "\n".join(lines) + "\n"
+    for ch in chapters:
+        lines += [
+            "[CHAPTER]",
+            "TIMEBASE=1/1000",
+            f"START={round(ch.start * 1000)}",
+            f"END={round(ch.end * 1000)}",
+            f"title={_escape(ch.title)}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def _feed(paths: Sequence[str], pipe) -> None:
+    try:
+        for p in paths:
+            for _, frame in iter_frames(p):
+                pipe.write(frame)
+    except (BrokenPipeError, OSError):
+        pass  # ffmpeg exited early; its exit status reports why
+    finally:
+        try:
+            pipe.close()
+        except OSError:
+            pass
+
+
+def encode_chapters(chapters: Sequence[Tuple[str, List[str]]], out_file: str, fmt: str = "m4b",
+                    title: Optional[str] = None) -> EncodeStats:
+    """Encode `(title, chunk MP3 paths)` chapters into one M4B or Opus file with chapter markers.
+
+    The output is written under a temporary name and renamed into place when
+    ffmpeg succeeds. Raises RuntimeError if ffmpeg is missing or fails.
+    """
+    if fmt not in ENCODINGS:
+        raise ValueError(f"Unknown output format {fmt!r}; choose from {list(ENCODINGS)}")
+    if not available():
+        raise RuntimeError("ffmpeg-python and the ffmpeg binary are needed for M4B/Opus output")
+    muxer, codec, bitrate = ENCODINGS[fmt]
+    marks = chapter_marks(chapters)
+    paths = [p for _, chunk_paths in chapters for p in chunk_paths]
+    t0 = time.perf_counter()
+
+    out_dir = os.path.dirname(os.path.abspath(out_file))
+    fd, meta_path = tempfile.mkstemp(dir=out_dir, suffix=".ffmeta")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(ffmetadata(marks, title, comments=muxer == "ogg"))
+    tmp_out = f"{out_file}.tmp"
+    audio = ffmpeg.input("pipe:", f="mp3")
+    meta = ffmpeg.input(meta_path, f="ffmetadata")
+    # The metadata input has no streams: map it optionally ("a?") so ffmpeg only takes its chapters and tags
+    args = (
+        ffmpeg.output(audio.audio, meta["a?"], tmp_out, f=muxer, acodec=codec, audio_bitrate=bitrate,
+                      map_metadata=1, map_chapters=-1 if muxer == "ogg" else 1)
+        .global_args("-hide_banner", "-nostats", "-benchmark")
+        .overwrite_output()
+        .compile()
+    )
+    try:
+        with tempfile.TemporaryFile() as log:
+            proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=log)
+            feeder = threading.Thread(target=_feed, args=(paths, proc.stdin), daemon=True)
+            feeder.start()
+            code = proc.wait()
+            feeder.join()
+            log.seek(0)
+            stderr = log.read().decode("utf-8", "replace")
+        if code != 0:
+            raise RuntimeError(f"ffmpeg failed ({code}): {stderr.strip()[-500:]}")
+        os.replace(tmp_out, out_file)
+    finally:
+        os.unlink(meta_path)
+        if os.path.exists(tmp_out):
+            os.unlink(tmp_out)
+
+    m = _BENCH.search(stderr)
+    return EncodeStats(
+        format=fmt,
+        bytes=os.path.getsize(out_file),
+        audio_seconds=marks[-1].end if marks else 0.0,
+        wall_seconds=time.perf_counter() - t0,
+        cpu_seconds=float(m.group(1)) + float(m.group(2)) if m else 0.0,
+    )
@@ -1,37 +1,153 @@
+import asyncio
 import os
 import shutil
+import time
 from pathlib import Path
 from pydub import AudioSegment
-from audiobooker.chunker import chunk_text
-from audiobooker.pdf_processor import extract_pages, PageContent
-from audiobooker.tts_providers import EdgeTTSProvider
-from audiobooker.text_cleaner import clean_markdown
+from audiobooker import metrics
+from audiobooker.chunker import chunk_text, iter_chunks, iter_chunks_stream
+from audiobooker.encoder import OUTPUT_FORMATS, EncodeStats, encode_chapters
+from audiobooker.manifest import BookManifest, file_sha256, text_sha256
+from audiobooker.mp3_concat import concat_mp3, FormatMismatch
+from audiobooker.pdf_processor import extract_pages, PageContent, TableStats
+from audiobooker.pipeline import CHANNEL_END, Pipeline
+from audiobooker.planner import DurationModel, plan_audio_files
+from audiobooker.tts_control import ResilientTTSProvider
+from audiobooker.tts_providers import DEFAULT_VOICE, LimitedTTSProvider, make_tts_provider, provider_name
+from audiobooker.tts_cache import CachedTTSProvider
+from audiobooker.text_cleaner import clean_markdown, iter_clean_markdown
 from audiobooker.openclaw_processor import OpenClawProcessor
 
+def iter_page_texts(pdf_path, counts, table_stats, progress=None, **extract_kwargs):
+    """Yield a PDF's page texts and table summaries in reading order.
+
+    Pages and OCR'd pages are tallied in `counts["pages"]`/`counts["ocr_pages"]`;
+    `progress(pages_so_far)` is called after each page.
+    """
+    for page in extract_pages(pdf_path, table_stats=table_stats, **extract_kwargs):
+        counts["pages"] += 1
+        counts["ocr_pages"] += page.ocr
+        if progress is not None:
+            progress(counts["pages"])
+        yield page.text + "\n"
+        for t in page.tables:
+            yield "\n\n" + t + "\n"
+
+
+def extract_text(pdf_path, clean=False, progress=None, **extract_kwargs):
+    """Extract a PDF's page text and table summaries, markdown-cleaned as it streams if `clean`.
+
+    Returns (text, pages, ocr_pages, table_stats). Module-level so batch runs can
+    call it in a process pool; `progress(pages_so_far)` is called after each page.
+    """
+    table_stats = TableStats()
+    counts = {"pages": 0, "ocr_pages": 0}
+    texts = iter_page_texts(pdf_path, counts, table_stats, progress, **extract_kwargs)
+    text = "".join(iter_clean_markdown(texts) if clean else texts)
+    return text, counts["pages"], counts["ocr_pages"], table_stats
+
+
 class AudiobookGenerator:
-    def __init__(self, output_dir="out", voice="en-GB-RyanNeural", chunk_size=4000, split_seconds=3600, keep_chunks=False, use_openclaw=True, play_vlc=True):
+    def __init__(self, output_dir="out", voice=None, chunk_size=4000, split_seconds=3600, keep_chunks=False, use_openclaw=True, play_vlc=True, tts_concurrency=4, tts_cache=None, stream_pages=False, extract_workers=1, extract_engine="pdfplumber", table_mode="auto", ocr=True, ocr_workers=0, ocr_cache_dir=None, chunk_overlap=200, progress=None, on_segment=None, resume=False, openclaw_parallelism=4, openclaw_cache_dir=None, duration_model=None, tts_provider="edge", tts_limit=None, extract_executor=None, output_format="mp3", pipeline=False, tts_retries=0, tts_timeout=None, tts_adaptive=False):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.images_dir = self.output_dir / "images"
-        self.voice = voice
         self.chunk_size = chunk_size
+        # Characters repeated at the start of each chunk; 0 synthesizes every word once
+        self.chunk_overlap = chunk_overlap
         self.split_seconds = split_seconds
         self.keep_chunks = keep_chunks
-        self.tts = EdgeTTSProvider(voice=self.voice)
+        # A TTSProvider, or the name of one in TTS_PROVIDERS ("edge", "local", "synthetic")
+        if tts_provider is None or isinstance(tts_provider, str):
+            tts_provider = make_tts_provider(tts_provider or "edge", voice=voice)
+        self.tts = tts_provider
+        # Voice sent with every request; defaults to the provider's own
+        self.voice = voice or getattr(tts_provider, "voice", None) or DEFAULT_VOICE
+        # Optional SharedLimit capping TTS requests in flight across generators (batch runs);
+        # applied under the cache, so cache hits do not take a slot
+        if tts_limit is not None:
+            self.tts = LimitedTTSProvider(self.tts, tts_limit)
+        # Optional retries with backoff, per-attempt timeout, circuit breaker and (tts_adaptive) an AIMD
+        # in-flight limit of at most tts_concurrency; backoff waits happen outside the shared limit
+        self.tts_control = None
+        if tts_retries or tts_timeout or tts_adaptive:
+            self.tts = self.tts_control = ResilientTTSProvider(
+                self.tts, max_limit=tts_concurrency, initial_limit=max(1, tts_concurrency // 2),
+                adaptive=tts_adaptive, retries=tts_retries, timeout=tts_timeout)
+        # Optional shared TTSCache: identical chunks (same text/voice/rate/provider) are reused
+        self.tts_cache = tts_cache
+        if tts_cache is not None:
+            self.tts = CachedTTSProvider(self.tts, tts_cache)
+        # Max number of chunk syntheses kept in flight at once (1 = sequential)
+        self.tts_concurrency = tts_concurrency
+        # Sampled header/footer detection + bounded-memory page streaming, optionally multi-process
+        self.stream_pages = stream_pages
+        self.extract_workers = extract_workers
+        self.extract_engine = extract_engine
+        # Table extraction on every page, only on pages with table-like ruling lines, or never;
+        # table_stats records what the last extraction ran, skipped and saved
+        self.table_mode = table_mode
+        self.table_stats = TableStats()
+        # OCR pages that have an image but no text layer, in this many processes (0 = one per core),
+        # caching the text by page image in ocr_cache_dir
+        self.ocr = ocr
+        self.ocr_workers = ocr_workers
+        self.ocr_cache_dir = ocr_cache_dir
+        self.ocr_pages = 0
+        # Optional concurrent.futures executor (a process pool shared by a batch run) for PDF extraction
+        self.extract_executor = extract_executor
         self.use_openclaw = use_openclaw
-        self.openclaw = OpenClawProcessor() if use_openclaw else None
+        # Long texts are cleaned/split in overlapping windows, this many agent calls at a time;
+        # window results are cached by content hash (on disk when a cache dir is given)
+        self.openclaw = OpenClawProcessor(parallelism=openclaw_parallelism, cache_dir=openclaw_cache_dir) if use_openclaw else None
         self.play_vlc = play_vlc
+        # Chars-per-second model used to plan parts; calibrated from every synthesized chunk
+        # and saved after each part when it has a path (share one across jobs)
+        self.duration_model = duration_model if duration_model is not None else DurationModel()
+        # Optional callable(stage, done, total); it may raise to abort the run (e.g. job cancellation)
+        self.progress = progress
+        # Optional callable(index, path) run as each chunk finishes, with `index` its
+        # position in the book; the chunk file may be deleted after it returns
+        self.on_segment = on_segment
+        # Reuse the chapter plan, chunks and parts recorded in the book's manifest.json
+        self.resume = resume
+        # "mp3" joins chunk frames into chapter files and parts; "m4b"/"opus" encode each part's
+        # chunks once with ffmpeg, with chapter markers and no chapter files
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format {output_format!r}; choose from {list(OUTPUT_FORMATS)}")
+        self.output_format = output_format
+        # Size and CPU cost of each part assembled by the last process() call
+        self.encode_stats = []
+        # Run extract/clean/chunk, TTS and assembly as concurrent stages joined by bounded queues
+        self.pipeline = pipeline
+
+    def _report(self, stage, done=0, total=0):
+        if self.progress is not None:
+            self.progress(stage, done, total)
 
     def assemble_audio(self, parts, out_file):
-        combined = None
+        existing = []
         for p in parts:
             if not os.path.exists(p):
                 print(f"Warning: Audio part {p} not found, skipping.")
                 continue
+            existing.append(p)
+        if not existing:
+            raise ValueError("No audio parts to assemble")
+        if Path(out_file).suffix.lower() == ".mp3":
+            # Join MP3 frames directly: constant memory and no re-encode
+            try:
+                return concat_mp3(existing, str(out_file))
+            except FormatMismatch as e:
+                print(f"Falling back to decoding for assembly: {e}")
+        return self._assemble_decoded(existing, out_file)
+
+    def _assemble_decoded(self, parts, out_file):
+        """Decode every part with pydub and re-encode; used when formats differ."""
+        combined = None
+        for p in parts:
             seg = AudioSegment.from_file(p)
             combined = seg if combined is None else (combined + seg)
-        if combined is None:
-            raise ValueError("No audio parts to assemble")
         combined.export(out_file, format=Path(out_file).suffix.replace(".", ""))
         return out_file
 
@@ -70,93 +186,458 @@ class AudiobookGenerator:
             except Exception as e:
                 print(f"Error launching VLC: {e}")
 
-    def process(self, input_source, is_text=False):
-        # input_source is either a text string (if is_text=True) or a pdf path (str)
-        
-        # 0. Prepare output folder named after the PDF (if it's a file)
-        if not is_text and os.path.isfile(input_source):
-            pdf_path = Path(input_source)
-            book_title = pdf_path.stem
-            final_output_dir = self.output_dir / book_title
-            final_output_dir.mkdir(parents=True, exist_ok=True)
-            folder_for_generation = final_output_dir
-        else:
-            final_output_dir = self.output_dir
-            folder_for_generation = self.output_dir
+    def _tts_rate(self):
+        # wrappers (limit, cache, retries) pass attribute lookups through to the real provider
+        return getattr(self.tts, "rate", "")
+
+    def _manifest_settings(self):
+        """Settings that change the generated audio; a manifest only resumes when they match."""
+        return {
+            "voice": self.voice,
+            "tts_provider": provider_name(self.tts),
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "split_seconds": self.split_seconds,
+            "use_openclaw": self.use_openclaw,
+            "extract_engine": self.extract_engine,
+            "table_mode": self.table_mode,
+            "ocr": self.ocr,
+            "output_format": self.output_format,
+            "pipeline": self.pipeline,
+        }
+
+    def _extract_kwargs(self):
+        return dict(
+            _image_dir=str(self.images_dir),
+            stream=self.stream_pages,
+            workers=self.extract_workers,
+            engine=self.extract_engine,
+            table_mode=self.table_mode,
+            ocr=self.ocr,
+            ocr_workers=self.ocr_workers,
+            ocr_cache_dir=self.ocr_cache_dir,
+        )
+
+    def _record_extraction(self, n_pages, ocr_pages, table_stats):
+        self.ocr_pages = ocr_pages
+        self.table_stats = table_stats
+        metrics.PAGES_EXTRACTED.inc(n_pages)
+        metrics.OCR_PAGES.inc(ocr_pages)
+        print(table_stats.summary())
+        if ocr_pages:
+            print(f"OCR: read {ocr_pages} scanned pages")
+        metrics.TABLE_PAGES.inc(table_stats.extracted, outcome="extracted")
+        metrics.TABLE_PAGES.inc(table_stats.skipped, outcome="skipped")
 
-        full_text = ""
+    def _build_plan(self, input_source, is_text):
+        """Extract, clean and split the input; return (chapters, audio_plan)."""
+        cleaned_text = None
         if is_text:
             full_text = input_source
         else:
-            pages_iter = extract_pages(input_source, str(self.images_dir))
-            for page in pages_iter:
-                full_text += page.text + "\n"
-                for t in page.tables:
-                    full_text += "\n\n" + t + "\n"
+            self._report("extract")
+            extract_kwargs = self._extract_kwargs()
+            # Without OpenClaw, pages are cleaned as extraction proceeds, so the raw text is never held whole
+            clean = not self.use_openclaw
+            with metrics.STAGE_SECONDS.time(stage="extract"):
+                if self.extract_executor is not None:
+                    result = self.extract_executor.submit(extract_text, input_source, clean, **extract_kwargs).result()
+                else:
+                    result = extract_text(input_source, clean, lambda n: self._report("extract", n), **extract_kwargs)
+            text, n_pages, ocr_pages, table_stats = result
+            if clean:
+                cleaned_text = text
+            else:
+                full_text = text
+            self._record_extraction(n_pages, ocr_pages, table_stats)
 
         # 1. Clean Text
-        if self.use_openclaw:
-            print("Cleaning text with OpenClaw...")
-            cleaned_text = self.openclaw.clean_text(full_text)
-        else:
-            cleaned_text = clean_markdown(full_text)
+        self._report("clean")
+        if cleaned_text is None:
+            with metrics.STAGE_SECONDS.time(stage="clean"):
+                if self.use_openclaw:
+                    print("Cleaning text with OpenClaw...")
+                    cleaned_text = self.openclaw.clean_text(full_text)
+                else:
+                    cleaned_text = clean_markdown(full_text)
+        metrics.CHARS_CLEANED.inc(len(cleaned_text))
 
         # 2. Split into Chapters
-        if self.use_openclaw:
-            print("Splitting into chapters with OpenClaw...")
-            chapters = self.openclaw.split_into_chapters(cleaned_text)
-        else:
-            # Basic fallback: treat whole text as one chapter
-            chapters = [{"title": "Main Content", "content": cleaned_text}]
+        self._report("chapters")
+        with metrics.STAGE_SECONDS.time(stage="chapters"):
+            if self.use_openclaw:
+                print("Splitting into chapters with OpenClaw...")
+                chapters = self.openclaw.split_into_chapters(cleaned_text)
+            else:
+                # Basic fallback: treat whole text as one chapter
+                chapters = [{"title": "Main Content", "content": cleaned_text}]
+
+        # 3. Plan Audio Files: pack whole chapters into parts of about split_seconds
+        self._report("plan")
+        with metrics.STAGE_SECONDS.time(stage="plan"):
+            audio_plan = plan_audio_files(chapters, self.split_seconds, model=self.duration_model,
+                                          voice=self.voice, rate=self._tts_rate())
+
+        return chapters, audio_plan
+
+    def _assemble_part(self, i, group, group_chunks, outpath, folder_for_generation, book_title, n_parts=None):
+        """Build part `i` from its chapters' chunk files; return the chapter files it wrote.
 
-        # 3. Plan Audio Files
-        if self.use_openclaw:
-            print("Planning audio files with OpenClaw...")
-            audio_plan = self.openclaw.plan_audio_files(chapters, target_duration_sec=self.split_seconds)
+        MP3 parts are joined from one file per chapter; M4B/Opus parts are
+        encoded straight from the chunks. `n_parts` is reported as progress when known.
+        """
+        group_files = []
+        with metrics.STAGE_SECONDS.time(stage="assemble"):
+            if self.output_format == "mp3":
+                t0, cpu0 = time.perf_counter(), time.process_time()
+                for j, (chapter, ch_files) in enumerate(zip(group, group_chunks)):
+                    print(f"Assembling audio for Chapter: {chapter['title']}")
+                    # Merge chunks into a single chapter file (optional but cleaner for assembly)
+                    chapter_file = folder_for_generation / f"group{i:03d}_ch{j:02d}_full.mp3"
+                    self.assemble_audio(ch_files, str(chapter_file))
+                    group_files.append(str(chapter_file))
+
+                # Merge all chapters in the group into one final audio part
+                if n_parts is not None:
+                    self._report("assemble", i, n_parts)
+                self.assemble_audio(group_files, outpath)
+                stats = EncodeStats("mp3", os.path.getsize(outpath), wall_seconds=time.perf_counter() - t0,
+                                    cpu_seconds=time.process_time() - cpu0)
+            else:
+                if n_parts is not None:
+                    self._report("assemble", i, n_parts)
+                stats = encode_chapters([(ch["title"], files) for ch, files in zip(group, group_chunks)],
+                                        str(outpath), self.output_format, title=book_title)
+                print(f"Encoded {outpath.name}: {len(group)} chapter(s), {stats.bytes / 1e6:.1f} MB, "
+                      f"{stats.cpu_seconds:.1f}s encoder CPU")
+        self.encode_stats.append(stats)
+        metrics.AUDIO_BYTES.inc(os.path.getsize(outpath))
+        return group_files
+
+    def _finish_part(self, manifest, outpath, part_keys, temp_files):
+        manifest.record_part(str(outpath), part_keys)
+        self.duration_model.save()
+        # Chunks are only deleted once the part that needs them is checkpointed
+        if not self.keep_chunks:
+            for f in temp_files:
+                try: Path(f).unlink()
+                except: pass
+
+    def _generate(self, input_source, is_text, manifest, folder_for_generation, book_title):
+        """Plan the whole book, then synthesize and assemble it part by part; return (parts, temp files)."""
+        if manifest.plan is not None:
+            print(f"Resuming from {manifest.path}: skipping extraction and planning")
+            audio_plan = manifest.resumed_plan()
         else:
-            # Fallback simple grouping
-            audio_plan = [[ch] for ch in chapters]
+            chapters, audio_plan = self._build_plan(input_source, is_text)
+            manifest.set_plan(chapters, audio_plan)
 
         # 4. Generate Audio for each chapter and assemble按照 plan
         final_parts = []
         all_temp_files = [] # Track all temp files for cleanup at the end
         
+        # Chunk every chapter up front so total progress is known and all chunks of
+        # a group can be synthesized concurrently; output order is preserved per chapter.
+        planned = []
+        with metrics.STAGE_SECONDS.time(stage="chunk"):
+            for i, group in enumerate(audio_plan):
+                group_chunks = []
+                tts_jobs = []
+                for j, chapter in enumerate(group):
+                    # Chunk chapter if it's too long for TTS
+                    ch_chunks = chunk_text(chapter['content'], max_chars=self.chunk_size, overlap=self.chunk_overlap)
+                    ch_files = []
+                    for k, c in enumerate(ch_chunks):
+                        fname = folder_for_generation / f"group{i:03d}_ch{j:03d}_c{k:03d}.mp3"
+                        tts_jobs.append((c, str(fname)))
+                        ch_files.append(str(fname))
+                    group_chunks.append(ch_files)
+                planned.append((group, group_chunks, tts_jobs))
+        total_chunks = sum(len(jobs) for _, _, jobs in planned)
+        chunk_index = {path: n for n, (_, path) in enumerate(job for _, _, jobs in planned for job in jobs)}
+        chunk_keys = {path: manifest.chunk_key(text, self.voice) for _, _, jobs in planned for text, path in jobs}
+        chunk_chars = {path: len(text) for _, _, jobs in planned for text, path in jobs}
+        rate = self._tts_rate()
+        chunks_done = 0
+
+        def _chunk_done(path):
+            nonlocal chunks_done
+            chunks_done += 1
+            # A resumed part's chunks may already be gone; there is nothing to hand over then
+            if self.on_segment is not None and os.path.exists(path):
+                self.on_segment(chunk_index[path], path)
+            self._report("tts", chunks_done, total_chunks)
+
+        def _chunk_synthesized(path):
+            metrics.CHUNKS_SYNTHESIZED.inc()
+            manifest.record_chunk(path, chunk_keys[path])
+            self.duration_model.observe_file(path, chunk_chars[path], self.voice, rate)
+            _chunk_done(path)
+
+        self._report("tts", 0, total_chunks)
+        for i, (group, group_chunks, tts_jobs) in enumerate(planned):
+            outpath = folder_for_generation / f"audiobook_part_{i + 1:03d}.{self.output_format}"
+            part_keys = [chunk_keys[path] for _, path in tts_jobs]
+            if manifest.part_done(str(outpath), part_keys):
+                print(f"Skipping {outpath.name}: already generated")
+                for _, path in tts_jobs:
+                    _chunk_done(path)
+                final_parts.append(str(outpath))
+                continue
+
+            all_temp_files.extend(path for _, path in tts_jobs)
+            pending = []
+            for text, path in tts_jobs:
+                if manifest.chunk_done(path, chunk_keys[path]):
+                    _chunk_done(path)
+                else:
+                    pending.append((text, path))
+            print(f"Generating audio for {len(group)} chapter(s), {len(pending)} of {len(tts_jobs)} chunk(s) "
+                  f"with up to {self.tts_concurrency} in flight")
+            try:
+                with metrics.STAGE_SECONDS.time(stage="tts"):
+                    self.tts.synthesize_many(pending, voice=self.voice, concurrency=self.tts_concurrency,
+                                             on_done=_chunk_synthesized)
+            finally:
+                # Checkpoint whatever finished, even if the batch failed midway
+                manifest.save()
+
+            group_files = self._assemble_part(i, group, group_chunks, outpath, folder_for_generation, book_title,
+                                              n_parts=len(planned))
+            all_temp_files.extend(group_files)
+            self._finish_part(manifest, outpath, part_keys, group_files + [path for _, path in tts_jobs])
+            final_parts.append(str(outpath))
+        return final_parts, all_temp_files
+
+    def _plan_events(self, audio_plan):
         for i, group in enumerate(audio_plan):
-            group_files = []
             for j, chapter in enumerate(group):
-                print(f"Generating audio for Chapter: {chapter['title']}")
-                # Chunk chapter if it's too long for TTS
-                ch_chunks = chunk_text(chapter['content'], max_chars=self.chunk_size)
-                ch_files = []
-                for k, c in enumerate(ch_chunks):
-                    fname = folder_for_generation / f"group{i:03d}_ch{j:03d}_c{k:03d}.mp3"
-                    self.tts.synthesize(c, str(fname), voice=self.voice)
-                    ch_files.append(str(fname))
-                    all_temp_files.append(str(fname))
-                
-                # Merge chunks into a single chapter file (optional but cleaner for assembly)
-                chapter_file = folder_for_generation / f"group{i:03d}_ch{j:02d}_full.mp3"
-                self.assemble_audio(ch_files, str(chapter_file))
-                group_files.append(str(chapter_file))
-                all_temp_files.append(str(chapter_file))
-                
-                # Cleanup chapter chunks immediately if not keeping
-                if not self.keep_chunks:
-                    for f in ch_files:
-                        try: Path(f).unlink()
-                        except: pass
-            
-            # Merge all chapters in the group into one final audio part
-            idx = len(final_parts) + 1
-            outpath = folder_for_generation / f"audiobook_part_{idx:03d}.mp3"
-            self.assemble_audio(group_files, outpath)
-            final_parts.append(str(outpath))
-            
-            # Cleanup chapter files immediately if not keeping
-            if not self.keep_chunks:
-                for f in group_files:
-                    try: Path(f).unlink()
-                    except: pass
+                for c in iter_chunks(chapter['content'], max_chars=self.chunk_size, overlap=self.chunk_overlap):
+                    yield "chunk", i, j, c.text
+            yield "part", i, group
+
+    def _streamed_events(self, input_source, is_text, part_chars):
+        """Chunks of the cleaned text as extraction proceeds, cut into parts of about `part_chars`."""
+        if is_text:
+            pieces = iter_clean_markdown((input_source,))
+        else:
+            counts, table_stats = {"pages": 0, "ocr_pages": 0}, TableStats()
+            pieces = iter_clean_markdown(iter_page_texts(input_source, counts, table_stats, **self._extract_kwargs()))
+        group = [{"title": "Main Content"}]
+        i = chars = 0
+        for text in iter_chunks_stream(pieces, max_chars=self.chunk_size, overlap=self.chunk_overlap):
+            yield "chunk", i, 0, text
+            chars += len(text)
+            if chars >= part_chars:
+                yield "part", i, group
+                i, chars = i + 1, 0
+        if chars:
+            yield "part", i, group
+        if not is_text:
+            self._record_extraction(counts["pages"], counts["ocr_pages"], table_stats)
+
+    def _generate_pipelined(self, input_source, is_text, manifest, folder_for_generation, book_title, streamed):
+        """Synthesize chunks as they are produced and assemble each part while the next is synthesized.
+
+        Three stages joined by bounded queues: text (extract, clean, chunk) in
+        one thread, TTS on an event loop in this one, assembly in another. A
+        stage that gets ahead blocks on its full queue, so memory stays bounded.
+        With OpenClaw, chapters need the whole text, so the text stage plans the
+        book first (and stores the plan) before chunking. Without it, the text
+        is streamed and parts are cut at chunk boundaries once they reach about
+        `split_seconds`. Returns (parts, temp files).
+        """
+        final_parts = []
+        all_temp_files = []
+        rate = self._tts_rate()
+
+        def produce(chunks):
+            with metrics.STAGE_SECONDS.time(stage="extract" if not is_text else "chunk"):
+                if streamed:
+                    part_chars = round(self.split_seconds * self.duration_model.chars_per_sec(self.voice, rate))
+                    events = self._streamed_events(input_source, is_text, manifest.stream_part_chars(part_chars))
+                else:
+                    if manifest.plan is not None:
+                        print(f"Resuming from {manifest.path}: skipping extraction and planning")
+                        audio_plan = manifest.resumed_plan()
+                    else:
+                        chapters, audio_plan = self._build_plan(input_source, is_text)
+                        manifest.set_plan(chapters, audio_plan)
+                    events = self._plan_events(audio_plan)
+
+                def new_part(i):
+                    outpath = folder_for_generation / f"audiobook_part_{i + 1:03d}.{self.output_format}"
+                    # A finished part only matches once all its chunks are seen, so they are held back until then
+                    return {"outpath": outpath, "files": [], "keys": [], "held": [],
+                            "expected": manifest.part_keys(str(outpath))}
+
+                index = 0
+                part = None
+                for event in events:
+                    if part is None:
+                        part = new_part(event[1])
+                    if event[0] == "part":
+                        _, i, group = event
+                        part["files"] += [[] for _ in range(len(group) - len(part["files"]))]
+                        skip = part["expected"] is not None and part["keys"] == part["expected"]
+                        if not skip:
+                            for item in part["held"]:
+                                chunks.put(item)
+                        chunks.put(("part", i, group, part["files"], part["keys"], part["outpath"], skip,
+                                    part["held"] if skip else []))
+                        part = None
+                        continue
+                    _, i, j, text = event
+                    while len(part["files"]) <= j:
+                        part["files"].append([])
+                    path = str(folder_for_generation / f"group{i:03d}_ch{j:03d}_c{len(part['files'][j]):03d}.mp3")
+                    key = manifest.chunk_key(text, self.voice)
+                    part["files"][j].append(path)
+                    part["keys"].append(key)
+                    item = ("chunk", index, text, path, key, manifest.chunk_done(path, key))
+                    index += 1
+                    expected = part["expected"]
+                    if expected is not None and expected[:len(part["keys"])] == part["keys"]:
+                        part["held"].append(item)
+                        continue
+                    if expected is not None:
+                        part["expected"] = None
+                        for held in part["held"]:
+                            chunks.put(held)
+                        part["held"] = []
+                    chunks.put(item)
+            chunks.close()
+
+        def assemble(parts):
+            for _, i, group, group_chunks, part_keys, outpath, skip, _ in parts:
+                if skip:
+                    print(f"Skipping {outpath.name}: already generated")
+                    final_parts.append(str(outpath))
+                    continue
+                chunk_files = [f for files in group_chunks for f in files]
+                all_temp_files.extend(chunk_files)
+                group_files = self._assemble_part(i, group, group_chunks, outpath, folder_for_generation, book_title)
+                all_temp_files.extend(group_files)
+                self._finish_part(manifest, outpath, part_keys, group_files + chunk_files)
+                final_parts.append(str(outpath))
+
+        async def synthesize(pipe, chunks, parts):
+            sem = asyncio.Semaphore(max(1, self.tts_concurrency))
+            provider = provider_name(self.tts)
+            seen = done = 0
+            tasks = []  # synthesis of the current part's chunks
+            hand_over = None  # the latest part's wait-then-queue task
+
+            def chunk_done(index, path):
+                nonlocal done
+                done += 1
+                # A resumed part's chunks may already be gone; there is nothing to hand over then
+                if self.on_segment is not None and os.path.exists(path):
+                    self.on_segment(index, path)
+                self._report("tts", done, seen)
+
+            def stop_on_error(task):
+                if not task.cancelled() and task.exception() is not None:
+                    pipe.fail(task.exception())
+
+            async def one(index, text, path, key):
+                try:
+                    t0 = time.perf_counter()
+                    await self.tts.synthesize_async(text, path, voice=self.voice)
+                    metrics.TTS_REQUEST_SECONDS.observe(time.perf_counter() - t0, provider=provider)
+                finally:
+                    sem.release()
+                metrics.CHUNKS_SYNTHESIZED.inc()
+                manifest.record_chunk(path, key)
+                self.duration_model.observe_file(path, len(text), self.voice, rate)
+                chunk_done(index, path)
+
+            async def queue_part(part, part_tasks, previous):
+                await asyncio.gather(*part_tasks)
+                if previous is not None:
+                    await previous  # parts reach the assembler in order
+                await asyncio.to_thread(parts.put, part)
+
+            pending = []
+            try:
+                while True:
+                    item = await asyncio.to_thread(chunks.get)
+                    if item is CHANNEL_END:
+                        break
+                    if item[0] == "chunk":
+                        _, index, text, path, key, finished = item
+                        seen += 1
+                        if finished:
+                            chunk_done(index, path)
+                            continue
+                        await sem.acquire()
+                        task = asyncio.create_task(one(index, text, path, key))
+                        tasks.append(task)
+                    else:
+                        for _, index, _, path, _, _ in item[7]:  # chunks of a part already generated
+                            seen += 1
+                            chunk_done(index, path)
+                        task = hand_over = asyncio.create_task(queue_part(item, tasks, hand_over))
+                        tasks = []
+                        pending = [t for t in pending if not t.done()]
+                    task.add_done_callback(stop_on_error)
+                    pending.append(task)
+                await asyncio.gather(*pending)
+                parts.close()
+            except BaseException as e:
+                pipe.fail(e)
+                raise
+            finally:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        self._report("extract" if not is_text else "chunk")
+        try:
+            with Pipeline() as pipe:
+                # enough chunks queued to keep every TTS slot busy; one finished part waits for the assembler
+                chunks = pipe.channel(2 * max(1, self.tts_concurrency))
+                parts = pipe.channel(1)
+                pipe.spawn(produce, chunks, name="text")
+                pipe.spawn(assemble, parts, name="assemble")
+                with metrics.STAGE_SECONDS.time(stage="tts"):
+                    asyncio.run(synthesize(pipe, chunks, parts))
+        finally:
+            # Checkpoint whatever finished, even if a stage failed midway
+            manifest.save()
+        return final_parts, all_temp_files
+
+    def process(self, input_source, is_text=False, folder_name=None):
+        # input_source is either a text string (if is_text=True) or a pdf path (str)
+        
+        # 0. Prepare output folder named after the PDF (if it's a file), or `folder_name` if given
+        if not is_text and os.path.isfile(input_source):
+            pdf_path = Path(input_source)
+            book_title = pdf_path.stem
+            final_output_dir = self.output_dir / (folder_name or book_title)
+            final_output_dir.mkdir(parents=True, exist_ok=True)
+            folder_for_generation = final_output_dir
+        else:
+            book_title = None
+            final_output_dir = self.output_dir
+            folder_for_generation = self.output_dir
+
+        if is_text:
+            source_hash = text_sha256(input_source)
+        else:
+            source_hash = file_sha256(input_source)
+        # A pipelined run without OpenClaw streams its text, so it has no stored plan
+        streamed = self.pipeline and not self.use_openclaw
+        manifest = BookManifest.open(folder_for_generation, source_hash, self._manifest_settings(),
+                                     resume=self.resume, streamed=streamed)
+        self.encode_stats = []
+        if self.pipeline:
+            final_parts, all_temp_files = self._generate_pipelined(input_source, is_text, manifest,
+                                                                   folder_for_generation, book_title, streamed)
+        else:
+            final_parts, all_temp_files = self._generate(input_source, is_text, manifest,
+                                                         folder_for_generation, book_title)
+        manifest.mark_complete()
         
         # 5. Post-processing: Move PDF and Final Cleanup
         if not is_text and os.path.isfile(input_source):
@@ -174,6 +655,12 @@ class AudiobookGenerator:
                 except: pass
 
         print(f"Generation complete. Files saved in: {final_output_dir}")
+        if self.tts_cache is not None:
+            st = self.tts_cache.stats
+            print(f"TTS cache: {st.hits} hits, {st.misses} misses ({st.hit_rate:.0%} hit rate), "
+                  f"~{st.seconds_saved:.1f}s of synthesis saved")
+        if self.tts_control is not None:
+            print(self.tts_control.summary())
         
         if self.play_vlc and final_parts:
             self.play_with_vlc(final_parts)
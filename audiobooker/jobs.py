@@ -0,0 +1,191 @@
+"""Background job execution with progress reporting and cancellation."""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once cancellation has been requested."""
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+TERMINAL = ("done", "failed", "cancelled")
+
+
+@dataclass
+class Job:
+    id: str
+    label: str = ""
+    key: Optional[str] = None
+    status: str = "queued"  # queued -> running -> done | failed | cancelled
+    stage: str = "queued"
+    done: int = 0
+    total: int = 0
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    version: int = 0
+    _stage_started: float = field(default_factory=time.time, repr=False)
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+    _future: Any = field(default=None, repr=False)
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def progress(self, stage: str, done: int = 0, total: int = 0) -> None:
+        """Progress callback handed to the generator; raises JobCancelled if cancelled."""
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+        if stage != self.stage:
+            self._stage_started = time.time()
+        self.stage, self.done, self.total = stage, done, total
+        self.version += 1
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Remaining time for the current stage, extrapolated from its rate so far."""
+        if not self.total or not self.done or self.status != "running":
+            return None
+        elapsed = time.time() - self._stage_started
+        return elapsed / self.done * (self.total - self.done)
+
+    def snapshot(self) -> Dict[str, Any]:
+        eta = self.eta_seconds
+        return {
+            "job_id": self.id,
+            "label": self.label,
+            "status": self.status,
+            "stage": self.stage,
+            "done": self.done,
+            "total": self.total,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "version": self.version,
+        }
+
+
+class JobManager:
+    """Run jobs on a bounded thread pool with a bounded queue.
+
+    `fn(job, *args, **kwargs)` receives its `Job` so it can report progress with
+    `job.progress(...)`; its return value becomes `job.result`. Jobs submitted
+    with the same `key` while one is queued or running coalesce onto it.
+    `on_finish(job)` is called once a job is done, failed or cancelled, whether or not it ever ran.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 16, retain: int = 1000,
+                 on_finish: Optional[Callable[[Job], None]] = None) -> None:
+        self.max_workers = max_workers
+        self.on_finish = on_finish
+        self.max_queue = max_queue
+        self.retain = retain
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="audiobooker-job")
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, status: str) -> int:
+        return sum(1 for j in self._jobs.values() if j.status == status)
+
+    @property
+    def queued(self) -> int:
+        with self._lock:
+            return self._count("queued")
+
+    @property
+    def running(self) -> int:
+        with self._lock:
+            return self._count("running")
+
+    def submit(self, fn: Callable[..., Any], *args, label: str = "", job_id: Optional[str] = None,
+               key: Optional[str] = None, **kwargs) -> Job:
+        """Queue `fn`; if a queued or running job has the same `key`, return that job instead."""
+        job = Job(id=job_id or str(uuid.uuid4()), label=label, key=key)
+        with self._lock:
+            active = self._by_key.get(key) if key is not None else None
+            if active is not None and active.status not in TERMINAL:
+                return active
+            if self._count("queued") >= self.max_queue:
+                raise JobQueueFull(f"Job queue is full ({self.max_queue} waiting)")
+            self._jobs[job.id] = job
+            if key is not None:
+                self._by_key[key] = job
+            self._prune()
+        job._future = self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job: Job, fn, args, kwargs) -> None:
+        if job.cancel_requested:
+            # cancelled after the pool picked the job up, when the future could no longer be cancelled
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            job.version += 1
+            self._finished(job)
+            return
+        job.status = "running"
+        job.started_at = time.time()
+        job.version += 1
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = "done"
+            job.stage = "done"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            print(f"Job {job.id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            job.version += 1
+            self._finished(job)
+
+    def _finished(self, job: Job) -> None:
+        if self.on_finish is not None:
+            try:
+                self.on_finish(job)
+            except Exception as e:
+                print(f"Job {job.id} finish hook failed: {e}")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job immediately, or ask a running one to stop at its next progress report."""
+        job = self._jobs.get(job_id)
+        if job is None or job.status in TERMINAL:
+            return job
+        job._cancel.set()
+        if job._future is not None and job._future.cancel():
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            job.version += 1
+            self._finished(job)
+        return job
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond `retain` (caller holds the lock)."""
+        finished = [j for j in self._jobs.values() if j.status in TERMINAL]
+        for j in sorted(finished, key=lambda j: j.created_at)[: max(0, len(self._jobs) - self.retain)]:
+            del self._jobs[j.id]
+            if j.key is not None and self._by_key.get(j.key) is j:
+                del self._by_key[j.key]
+
+    def shutdown(self, wait: bool = True) -> None:
+        for job in list(self._jobs.values()):
+            if job.status not in TERMINAL:
+                self.cancel(job.id)
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,129 @@
+"""Offline TTS with a local engine (espeak-ng or piper), run in a process pool.
+
+Each chunk is synthesized to WAV by the engine and encoded to MP3 (mono,
+24 kHz, 48 kbps, like Edge TTS output) by ffmpeg or lame, so chunks from
+either source assemble the same way. Both are external programs; the pool
+runs one chunk per worker, by default one per core, and keeps everything off
+the event loop.
+"""
+
+import asyncio
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from audiobooker.tts_providers import TTSProvider
+
+# engine -> default voice (espeak-ng language/voice name; piper takes a path to a .onnx voice model)
+ENGINES = {
+    "espeak-ng": "en-gb",
+    "piper": None,
+}
+# Matches the MP3 that Edge TTS returns
+SAMPLE_RATE = 24000
+BITRATE_KBPS = 48
+
+
+def engine_command(engine: str, voice: str, wav_path: str) -> List[str]:
+    """Command line that reads text on stdin and writes it spoken to `wav_path`."""
+    if engine == "espeak-ng":
+        return ["espeak-ng", "-v", voice, "-w", wav_path, "--stdin"]
+    if engine == "piper":
+        return ["piper", "--model", voice, "--output_file", wav_path]
+    raise ValueError(f"Unknown local TTS engine {engine!r}; choose from {list(ENGINES)}")
+
+
+def encoder_command(wav_path: str, mp3_path: str) -> Optional[List[str]]:
+    """Command line encoding `wav_path` to `mp3_path` with ffmpeg or lame; None if neither is on PATH."""
+    if shutil.which("ffmpeg"):
+        return ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", wav_path, "-ac", "1",
+                "-ar", str(SAMPLE_RATE), "-b:a", f"{BITRATE_KBPS}k", "-f", "mp3", mp3_path]
+    if shutil.which("lame"):
+        return ["lame", "--quiet", "-m", "m", "--resample", str(SAMPLE_RATE // 1000), "-b", str(BITRATE_KBPS),
+                wav_path, mp3_path]
+    return None
+
+
+def available(engine: str = "espeak-ng") -> bool:
+    """True if the engine's binary and an MP3 encoder (ffmpeg or lame) are on PATH."""
+    encoder = shutil.which("ffmpeg") or shutil.which("lame")
+    return engine in ENGINES and shutil.which(engine) is not None and encoder is not None
+
+
+def _run(args: List[str], stdin: Optional[bytes] = None) -> None:
+    proc = subprocess.run(args, input=stdin, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        stderr = proc.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(f"{args[0]} failed ({proc.returncode}): {stderr[-500:]}")
+
+
+def synthesize_chunk(engine: str, voice: str, text: str, out_path: str) -> str:
+    """Speak `text` into the MP3 `out_path`. Module-level so it can run in a process pool.
+
+    The WAV and the MP3 are written under temporary names; `out_path` only
+    appears once encoding has succeeded.
+    """
+    wav_path = f"{out_path}.wav"
+    tmp_path = f"{out_path}.tmp.mp3"
+    try:
+        _run(engine_command(engine, voice, wav_path), stdin=text.encode("utf-8"))
+        encode = encoder_command(wav_path, tmp_path)
+        if encode is None:
+            raise RuntimeError("ffmpeg or lame is needed to encode local TTS output to MP3")
+        _run(encode)
+        os.replace(tmp_path, out_path)
+    finally:
+        for path in (wav_path, tmp_path):
+            if os.path.exists(path):
+                os.unlink(path)
+    return out_path
+
+
+class LocalTTSProvider(TTSProvider):
+    """Synthesize with a local engine in a pool of `workers` processes (0 = one per core).
+
+    The pool starts on first use and is shared by every event loop and thread
+    using this provider, so one instance serves a whole batch or web server.
+    """
+
+    def __init__(self, engine: str = "espeak-ng", voice: Optional[str] = None, workers: int = 0) -> None:
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown local TTS engine {engine!r}; choose from {list(ENGINES)}")
+        if not available(engine):
+            raise RuntimeError(f"{engine} and ffmpeg or lame must be on PATH for local TTS")
+        self.engine = engine
+        self.voice = voice or ENGINES[engine]
+        if not self.voice:
+            raise ValueError(f"{engine} needs a voice (a .onnx voice model path)")
+        self.workers = workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def synthesize(self, text: str, out_path: str, voice: Optional[str] = None) -> None:
+        self._executor().submit(synthesize_chunk, self.engine, voice or self.voice, text, out_path).result()
+
+    async def synthesize_async(self, text: str, out_path: str, voice: Optional[str] = None) -> None:
+        """Wait for the pool without blocking the loop; requests beyond `workers` queue in the pool."""
+        future = self._executor().submit(synthesize_chunk, self.engine, voice or self.voice, text, out_path)
+        await asyncio.wrap_future(future)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,161 @@
+"""Per-book job manifest for checkpointed, resumable generation."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+MANIFEST_NAME = "manifest.json"
+CHAPTERS_NAME = "chapters.json"
+VERSION = 1
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def text_sha256(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def write_json_atomic(path: Path, data) -> None:
+    """Write `data` to `path` atomically, so a crash never leaves a torn manifest."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class BookManifest:
+    """Record of a book's generation progress, stored in its output folder.
+
+    `manifest.json` holds the source hash, the settings that shape the audio,
+    the chapter plan and every finished chunk and part with its checksum. The
+    chapter texts go to `chapters.json` once, so per-chunk saves stay small.
+    A manifest whose source hash or settings differ from the current run is
+    discarded rather than resumed. Streamed (pipelined) runs have no stored
+    plan: they re-derive their chunks and resume from the chunk and part records.
+    """
+
+    def __init__(self, folder: Path, source_hash: str, settings: Dict) -> None:
+        self.folder = Path(folder)
+        self.path = self.folder / MANIFEST_NAME
+        self.data: Dict = {
+            "version": VERSION,
+            "source_hash": source_hash,
+            "settings": settings,
+            "plan": None,
+            "chunks": {},
+            "parts": {},
+            "complete": False,
+        }
+        self.chapters: Optional[List[Dict[str, str]]] = None
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+
+    @classmethod
+    def open(cls, folder: Path, source_hash: str, settings: Dict, resume: bool = False,
+             streamed: bool = False) -> "BookManifest":
+        """Load the manifest in `folder` when resuming a matching run, else start a new one."""
+        m = cls(folder, source_hash, settings)
+        if resume and m.path.exists():
+            try:
+                data = json.loads(m.path.read_text(encoding="utf-8"))
+                chapters = None if streamed else json.loads((m.folder / CHAPTERS_NAME).read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable manifest: {e}")
+                return m
+            if (
+                data.get("version") == VERSION
+                and data.get("source_hash") == source_hash
+                and data.get("settings") == settings
+                and (data.get("plan") is not None or streamed)
+            ):
+                m.data = data
+                m.chapters = chapters
+            else:
+                print("Manifest does not match this input/settings; starting over.")
+        return m
+
+    @property
+    def plan(self) -> Optional[List[List[int]]]:
+        return self.data["plan"]
+
+    def set_plan(self, chapters: List[Dict[str, str]], audio_plan: List[List[Dict[str, str]]]) -> None:
+        """Store the chapter texts and the grouping of chapters into parts."""
+        index = {id(ch): n for n, ch in enumerate(chapters)}
+        self.chapters = chapters
+        write_json_atomic(self.folder / CHAPTERS_NAME, chapters)
+        self.data["plan"] = [[index[id(ch)] for ch in group] for group in audio_plan]
+        self.save()
+
+    def resumed_plan(self) -> List[List[Dict[str, str]]]:
+        assert self.chapters is not None and self.plan is not None
+        return [[self.chapters[n] for n in group] for group in self.plan]
+
+    def stream_part_chars(self, chars: int) -> int:
+        """Characters per part for a streamed run, fixed by its first run so a resumed one cuts parts alike."""
+        return self.data.setdefault("part_chars", chars)
+
+    def chunk_key(self, text: str, voice: str) -> str:
+        return text_sha256(voice, text)
+
+    def chunk_done(self, path: str, key: str) -> bool:
+        """True if `path` holds the finished, unmodified audio for the chunk `key`."""
+        rec = self.data["chunks"].get(Path(path).name)
+        if not rec or rec["key"] != key or not os.path.exists(path):
+            return False
+        return file_sha256(path) == rec["sha256"]
+
+    def record_chunk(self, path: str, key: str) -> None:
+        with self._lock:
+            self.data["chunks"][Path(path).name] = {"key": key, "sha256": file_sha256(path)}
+        # Per-chunk saves are throttled; part boundaries always save
+        if time.monotonic() - self._last_save >= 1.0:
+            self.save()
+
+    def part_done(self, path: str, chunk_keys: List[str]) -> bool:
+        rec = self.data["parts"].get(Path(path).name)
+        if not rec or rec["chunks"] != chunk_keys or not os.path.exists(path):
+            return False
+        return file_sha256(path) == rec["sha256"]
+
+    def part_keys(self, path: str) -> Optional[List[str]]:
+        """Chunk keys of the finished part at `path`, if it is recorded and unmodified."""
+        rec = self.data["parts"].get(Path(path).name)
+        if rec and self.part_done(path, rec["chunks"]):
+            return rec["chunks"]
+        return None
+
+    def record_part(self, path: str, chunk_keys: List[str]) -> None:
+        with self._lock:
+            self.data["parts"][Path(path).name] = {"chunks": chunk_keys, "sha256": file_sha256(path)}
+        self.save()
+
+    def mark_complete(self) -> None:
+        self.data["complete"] = True
+        self.save()
+
+    def save(self) -> None:
+        with self._lock:
+            write_json_atomic(self.path, self.data)
+            self._last_save = time.monotonic()
@@ -0,0 +1,220 @@
+"""Per-stage counters and histograms, rendered in the Prometheus text format.
+
+Instrumentation is off until `enable()` is called (the web app does so at
+start-up). While disabled every `inc`/`observe`/`time` call returns after a
+single flag check, so the generator can stay instrumented unconditionally.
+"""
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+_enabled = False
+_NULL = nullcontext()
+
+
+def enable(on: bool = True) -> None:
+    global _enabled
+    _enabled = on
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if not _enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_fmt_labels(self.labels, k)} {_fmt_value(v)}" for k, v in items]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(_Metric):
+    """A gauge read from a callback at scrape time (e.g. queue depth)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Optional[Callable[[], float]] = None) -> None:
+        super().__init__(name, help)
+        self.fn = fn
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        self.fn = fn
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name} {_fmt_value(self.fn())}"] if self.fn is not None else []
+
+    def reset(self) -> None:
+        pass
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # per label key: [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        if not _enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            row[-2] += value
+            row[-1] += 1
+
+    def time(self, **labels: str):
+        """Context manager observing the duration of its block (a shared no-op when disabled)."""
+        if not _enabled:
+            return _NULL
+        return self._timer(labels)
+
+    @contextmanager
+    def _timer(self, labels: Dict[str, str]) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def count(self, **labels: str) -> int:
+        row = self._values.get(self._key(labels))
+        return int(row[-1]) if row else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        out = []
+        for key, row in items:
+            cumulative = 0.0
+            for bound, n in zip(self.buckets, row):
+                cumulative += n
+                le = 'le="' + _fmt_value(bound) + '"'
+                out.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, le)} {_fmt_value(cumulative)}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labels, key)} {_fmt_value(row[-2])}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labels, key)} {_fmt_value(row[-1])}")
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for m in self.metrics.values():
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        for m in self.metrics.values():
+            m.reset()
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "audiobooker_stage_seconds", "Time spent per pipeline stage", labels=("stage",)))
+PAGES_EXTRACTED = REGISTRY.register(Counter(
+    "audiobooker_pages_extracted_total", "PDF pages extracted"))
+OCR_PAGES = REGISTRY.register(Counter(
+    "audiobooker_ocr_pages_total", "Scanned PDF pages read by OCR"))
+TABLE_PAGES = REGISTRY.register(Counter(
+    "audiobooker_table_pages_total", "Pages table extraction ran on or skipped", labels=("outcome",)))
+CHARS_CLEANED = REGISTRY.register(Counter(
+    "audiobooker_chars_cleaned_total", "Characters of text produced by the cleaning stage"))
+CHUNKS_SYNTHESIZED = REGISTRY.register(Counter(
+    "audiobooker_chunks_synthesized_total", "Text chunks synthesized to audio"))
+TTS_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "audiobooker_tts_request_seconds", "Latency of individual TTS chunk requests", labels=("provider",)))
+TTS_RETRIES = REGISTRY.register(Counter(
+    "audiobooker_tts_retries_total", "TTS requests retried after a failure", labels=("provider",)))
+AUDIO_BYTES = REGISTRY.register(Counter(
+    "audiobooker_audio_bytes_total", "Bytes of final audio parts written"))
+JOB_REQUESTS = REGISTRY.register(Counter(
+    "audiobooker_job_requests_total", "Web generation requests by outcome: new, coalesced or reused",
+    labels=("outcome",)))
+TTS_FAILURES = REGISTRY.register(Counter(
+    "audiobooker_tts_failures_total", "Failed TTS request attempts by error type", labels=("provider", "error")))
+NOTIFICATIONS = REGISTRY.register(Counter(
+    "audiobooker_notifications_total", "Notification emails by outcome: sent, failed, dropped or retries",
+    labels=("outcome",)))
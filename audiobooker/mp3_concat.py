@@ -0,0 +1,317 @@
+"""Decode-free MP3 concatenation at the MPEG frame level.
+
+Parts that share MPEG version, layer, sample rate and channel count can be
+joined by copying their audio frames verbatim: no PCM is produced and the
+audio is never re-encoded. ID3v2/ID3v1/APE tags and per-file Xing/Info/VBRI
+frames are dropped, and a single fresh Info (CBR) or Xing (VBR) frame carrying
+the new frame and byte counts is written at the start of the output.
+"""
+
+import os
+import struct
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from typing import Iterator, List, Optional, Tuple
+
+_BITRATES = {
+    # (mpeg1, layer) -> kbps by bitrate index
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG-1
+    2: (22050, 24000, 16000),  # MPEG-2
+    0: (11025, 12000, 8000),  # MPEG-2.5
+}
+_READ_SIZE = 1 << 16
+_MAX_FRAME = 2881
+
+
+class FormatMismatch(ValueError):
+    """Raised when parts cannot be joined without decoding."""
+
+
+@dataclass(frozen=True)
+class FrameHeader:
+    raw: int
+    version: int  # 3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5
+    layer: int
+    bitrate_index: int
+    sample_rate: int
+    padding: int
+    protected: bool
+    channels: int
+
+    @property
+    def mpeg1(self) -> bool:
+        return self.version == 3
+
+    @property
+    def bitrate(self) -> int:
+        return _BITRATES[(self.mpeg1, self.layer)][self.bitrate_index] * 1000
+
+    @property
+    def samples(self) -> int:
+        if self.layer == 1:
+            return 384
+        if self.layer == 3 and not self.mpeg1:
+            return 576
+        return 1152
+
+    @cached_property
+    def length(self) -> int:
+        if self.layer == 1:
+            return (12 * self.bitrate // self.sample_rate + self.padding) * 4
+        return self.samples // 8 * self.bitrate // self.sample_rate + self.padding
+
+    @property
+    def side_info_size(self) -> int:
+        if self.mpeg1:
+            return 17 if self.channels == 1 else 32
+        return 9 if self.channels == 1 else 17
+
+    @property
+    def format(self) -> Tuple[int, int, int, int]:
+        """The properties that must match for frames to be concatenated."""
+        return (self.version, self.layer, self.sample_rate, self.channels)
+
+
+def parse_header(data: bytes, pos: int = 0) -> Optional[FrameHeader]:
+    """Parse the 4-byte frame header at `pos`, or return None if it is not one."""
+    if len(data) - pos < 4:
+        return None
+    return _decode_header(struct.unpack_from(">I", data, pos)[0])
+
+
+@lru_cache(maxsize=512)
+def _decode_header(raw: int) -> Optional[FrameHeader]:
+    # Cached: a file only ever uses a handful of distinct header words
+    if raw >> 21 != 0x7FF:
+        return None
+    version = (raw >> 19) & 3
+    layer = 4 - ((raw >> 17) & 3)
+    br_idx = (raw >> 12) & 0xF
+    sr_idx = (raw >> 10) & 3
+    if version == 1 or layer == 4 or br_idx in (0, 15) or sr_idx == 3:
+        return None
+    return FrameHeader(
+        raw=raw,
+        version=version,
+        layer=layer,
+        bitrate_index=br_idx,
+        sample_rate=_SAMPLE_RATES[version][sr_idx],
+        padding=(raw >> 9) & 1,
+        protected=not (raw >> 16) & 1,
+        channels=1 if ((raw >> 6) & 3) == 3 else 2,
+    )
+
+
+def _is_info_frame(hdr: FrameHeader, frame: bytes) -> bool:
+    """True for Xing/Info/VBRI metadata frames, which carry no audio."""
+    off = 4 + (2 if hdr.protected else 0) + hdr.side_info_size
+    return frame[off:off + 4] in (b"Xing", b"Info") or frame[36:40] == b"VBRI"
+
+
+def _audio_span(f) -> Tuple[int, int]:
+    """Return the (start, end) byte offsets of `f` once tags are excluded."""
+    size = os.fstat(f.fileno()).st_size
+    start = 0
+    head = f.read(10)
+    while len(head) == 10 and head[:3] == b"ID3":
+        s = head[6:10]
+        tag_len = 10 + ((s[0] << 21) | (s[1] << 14) | (s[2] << 7) | s[3])
+        if head[5] & 0x10:  # footer present
+            tag_len += 10
+        start += tag_len
+        f.seek(start)
+        head = f.read(10)
+    end = size
+    if end - start >= 128:
+        f.seek(end - 128)
+        if f.read(3) == b"TAG":
+            end -= 128
+    if end - start >= 32:
+        f.seek(end - 32)
+        footer = f.read(32)
+        if footer[:8] == b"APETAGEX":
+            ape_len, flags = struct.unpack_from("<II", footer, 12)
+            end -= ape_len + (32 if flags & 0x80000000 else 0)
+    return start, max(start, end)
+
+
+def iter_frames(path: str) -> Iterator[Tuple[FrameHeader, bytes]]:
+    """Yield `(header, frame_bytes)` for each audio frame, reading in fixed-size blocks.
+
+    Tags and metadata frames are skipped; junk between frames is resynced past.
+    """
+    with open(path, "rb") as f:
+        start, end = _audio_span(f)
+        f.seek(start)
+        remaining = end - start
+        buf = b""
+        pos = 0
+        first = True
+        synced = False
+        while True:
+            if len(buf) - pos < _MAX_FRAME and remaining:
+                chunk = f.read(min(_READ_SIZE, remaining))
+                remaining -= len(chunk)
+                buf = buf[pos:] + chunk
+                pos = 0
+            if len(buf) - pos < 4:
+                return
+            hdr = parse_header(buf, pos)
+            if hdr is not None and not synced:
+                # After junk, only trust a sync word that is followed by a matching frame
+                nxt = parse_header(buf, pos + hdr.length)
+                if nxt is None and len(buf) - pos >= hdr.length + 4:
+                    hdr = None
+                elif nxt is not None and nxt.format != hdr.format:
+                    hdr = None
+            if hdr is None:
+                synced = False
+                nxt_pos = buf.find(b"\xff", pos + 1)
+                pos = nxt_pos if nxt_pos != -1 else len(buf)
+                continue
+            if len(buf) - pos < hdr.length:
+                return  # truncated final frame
+            synced = True
+            frame = buf[pos:pos + hdr.length]
+            pos += hdr.length
+            if first:
+                first = False
+                if _is_info_frame(hdr, frame):
+                    continue
+            yield hdr, frame
+
+
+def first_header(path: str) -> Optional[FrameHeader]:
+    """Return the header of the first audio frame in `path`, if any."""
+    for hdr, _ in iter_frames(path):
+        return hdr
+    return None
+
+
+@dataclass
+class Mp3Info:
+    frames: int
+    bytes: int
+    sample_rate: int
+    channels: int
+    duration: float
+
+
+def probe(path: str) -> Mp3Info:
+    """Scan `path` frame by frame and return its exact length, without decoding."""
+    frames = nbytes = samples = 0
+    hdr = None
+    for hdr, frame in iter_frames(path):
+        frames += 1
+        nbytes += len(frame)
+        samples += hdr.samples
+    if hdr is None:
+        raise ValueError(f"No MPEG audio frames found in {path}")
+    return Mp3Info(frames, nbytes, hdr.sample_rate, hdr.channels, samples / hdr.sample_rate)
+
+
+def _info_frame(template: FrameHeader, frames: int, nbytes: int, vbr: bool) -> bytes:
+    """Build a Xing/Info frame shaped like `template` holding frame and byte counts."""
+    raw = template.raw | 0x10000  # no CRC
+    raw &= ~0x200  # no padding
+    hdr = parse_header(struct.pack(">I", raw))
+    assert hdr is not None
+    need = 4 + hdr.side_info_size + 16
+    br_idx = hdr.bitrate_index
+    while hdr.length < need and br_idx < 14:
+        br_idx += 1
+        raw = (raw & ~0xF000) | (br_idx << 12)
+        hdr = parse_header(struct.pack(">I", raw))
+        assert hdr is not None
+    frame = bytearray(hdr.length)
+    struct.pack_into(">I", frame, 0, raw)
+    off = 4 + hdr.side_info_size
+    frame[off:off + 4] = b"Xing" if vbr else b"Info"
+    struct.pack_into(">III", frame, off + 4, 0x3, frames, nbytes + hdr.length)
+    return bytes(frame)
+
+
+def check_compatible(paths: List[str]) -> Optional[FrameHeader]:
+    """Return the shared first-frame header of `paths`, or raise FormatMismatch."""
+    ref = None
+    for p in paths:
+        hdr = first_header(p)
+        if hdr is None:
+            raise FormatMismatch(f"{p} contains no MPEG audio frames")
+        if hdr.layer != 3:
+            raise FormatMismatch(f"{p} is MPEG layer {hdr.layer}, only layer III is concatenated")
+        if ref is None:
+            ref = hdr
+        elif hdr.format != ref.format:
+            raise FormatMismatch(f"{p} format {hdr.format} differs from {ref.format}")
+    return ref
+
+
+def concat_mp3(paths: List[str], out_file: str) -> str:
+    """Join MP3 `paths` into `out_file` frame by frame, in constant memory.
+
+    Raises FormatMismatch if the parts differ in version, layer, sample rate or
+    channel count; callers should then fall back to decoding.
+    """
+    ref = check_compatible(paths)
+    if ref is None:
+        raise ValueError("No audio parts to assemble")
+    placeholder = _info_frame(ref, 0, 0, False)
+    frames = nbytes = 0
+    bitrates = set()
+    with open(out_file, "wb") as out:
+        out.write(placeholder)
+        for p in paths:
+            batch = []
+            for hdr, frame in iter_frames(p):
+                batch.append(frame)
+                frames += 1
+                nbytes += len(frame)
+                bitrates.add(hdr.bitrate_index)
+                if len(batch) >= 512:
+                    out.write(b"".join(batch))
+                    batch.clear()
+            out.write(b"".join(batch))
+        out.seek(0)
+        out.write(_info_frame(ref, frames, nbytes, len(bitrates) > 1))
+    return out_file
+
+
+def silent_frame(sample_rate: int = 24000, channels: int = 1, kbps: int = 48) -> bytes:
+    """Return one valid MPEG layer III frame that decodes to silence."""
+    for version, rates in _SAMPLE_RATES.items():
+        if sample_rate in rates:
+            break
+    else:
+        raise ValueError(f"Unsupported sample rate {sample_rate}")
+    br_idx = _BITRATES[(version == 3, 3)].index(kbps)
+    raw = (
+        (0x7FF << 21) | (version << 19) | (1 << 17) | (1 << 16)
+        | (br_idx << 12) | (rates.index(sample_rate) << 10)
+        | ((3 if channels == 1 else 0) << 6)
+    )
+    hdr = parse_header(struct.pack(">I", raw))
+    assert hdr is not None
+    return struct.pack(">I", raw) + bytes(hdr.length - 4)
+
+
+def write_silence(path: str, seconds: float, sample_rate: int = 24000, channels: int = 1, kbps: int = 48) -> str:
+    """Write an MP3 of `seconds` of silence built directly from frames (no encoder needed)."""
+    frame = silent_frame(sample_rate, channels, kbps)
+    hdr = parse_header(frame)
+    assert hdr is not None
+    remaining = max(1, round(seconds * sample_rate / hdr.samples))
+    with open(path, "wb") as f:
+        while remaining:
+            n = min(1024, remaining)
+            f.write(frame * n)
+            remaining -= n
+    return path
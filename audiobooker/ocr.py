@@ -0,0 +1,201 @@
+"""OCR for scanned PDF pages: rasterize with PyMuPDF and read with tesseract in a process pool."""
+
+import functools
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
+try:
+    import pytesseract
+    from PIL import Image
+except ImportError:
+    pytesseract = None
+
+OCR_DPI = 300
+OCR_LANG = "eng"
+# Pages whose text layer has fewer characters than this (and that carry an image) are OCR'd
+MIN_TEXT_CHARS = 8
+
+
+def needs_ocr(text: str) -> bool:
+    """True if a page's extracted text is too short to be its real content."""
+    return len(text.strip()) < MIN_TEXT_CHARS
+
+
+@functools.lru_cache(maxsize=None)
+def available() -> bool:
+    """True if PyMuPDF, pytesseract and Pillow are installed and the tesseract binary is on PATH."""
+    return fitz is not None and pytesseract is not None and shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+
+
+def render_page(page, dpi: int = OCR_DPI):
+    """Rasterize a PyMuPDF page to an 8-bit grayscale pixmap."""
+    return page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+
+
+def page_key(page, dpi: int = OCR_DPI, lang: str = OCR_LANG) -> str:
+    """Return the hex digest identifying the OCR text of a PyMuPDF page.
+
+    Hashes what the page draws (its content stream and the raw image and form
+    streams it uses) instead of a rendering, so a cache hit costs no rasterization.
+    """
+    doc = page.parent
+    h = hashlib.sha256()
+    h.update(f"{dpi}:{lang}:{tuple(page.rect)}:{page.rotation}\0".encode("utf-8"))
+    h.update(page.read_contents())
+    xrefs = {img[0] for img in page.get_images(full=True)} | {x[0] for x in page.get_xobjects()}
+    for xref in sorted(xrefs):
+        h.update(doc.xref_stream_raw(xref) or b"")
+    return h.hexdigest()
+
+
+class OCRCache:
+    """Directory of OCR'd page texts keyed by `page_key`, at `<root>/<key[:2]>/<key>.txt`.
+
+    Writes are published with `os.replace`, so processes sharing the directory
+    never read a partial entry.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.txt"
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return self.path_for(key).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, text: str) -> None:
+        dest = self.path_for(key)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=dest.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, dest)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+
+# The document each worker last OCR'd from, kept open between pages. Keyed by process and thread, so
+# a forked worker never closes a document inherited from its parent and threads never share one.
+_worker_docs: Dict[Tuple[int, int], Tuple[str, object]] = {}
+
+
+def _document(pdf_path: str):
+    key = (os.getpid(), threading.get_ident())
+    entry = _worker_docs.get(key)
+    if entry is not None and entry[0] == pdf_path:
+        return entry[1]
+    if entry is not None:
+        entry[1].close()
+    doc = fitz.open(pdf_path)
+    _worker_docs[key] = (pdf_path, doc)
+    return doc
+
+
+def ocr_page(pdf_path: str, idx: int, cache_dir: Optional[str] = None, dpi: int = OCR_DPI,
+             lang: str = OCR_LANG) -> Tuple[str, bool]:
+    """Rasterize page `idx` (0-based) and OCR it; return (text, whether it came from the cache)."""
+    if fitz is None:
+        raise RuntimeError("pymupdf not installed")
+    page = _document(pdf_path)[idx]
+    cache = OCRCache(cache_dir) if cache_dir else None
+    if cache is not None:
+        key = page_key(page, dpi, lang)
+        text = cache.get(key)
+        if text is not None:
+            return text, True
+    if not available():
+        raise RuntimeError("tesseract is not installed")
+    pix = render_page(page, dpi)
+    image = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+    text = pytesseract.image_to_string(image, lang=lang)
+    if cache is not None:
+        cache.put(key, text)
+    return text, False
+
+
+class PageOCR:
+    """OCR the pages of one PDF in a process pool (started on first use).
+
+    `submit` queues a page and `text` waits for its result; results stay
+    available until `release`. A failing page (e.g. tesseract missing) reads
+    as None, with one warning per run.
+    """
+
+    def __init__(self, pdf_path: str, workers: int = 0, cache_dir: Optional[str] = None,
+                 dpi: int = OCR_DPI, lang: str = OCR_LANG) -> None:
+        self.pdf_path = pdf_path
+        # 0 = one process per core
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+        self.dpi = dpi
+        self.lang = lang
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._futures: Dict[int, Future] = {}
+        self._warned = False
+        # This PDF, open for hashing pages against the cache; our own, so other jobs cannot close it
+        self._doc = fitz.open(pdf_path) if cache_dir and fitz is not None else None
+
+    def submit(self, idx: int) -> None:
+        if idx in self._futures:
+            return
+        if self._doc is not None:
+            # cache hits are answered here, without rasterizing or starting the pool
+            text = OCRCache(self.cache_dir).get(page_key(self._doc[idx], self.dpi, self.lang))
+            if text is not None:
+                self._futures[idx] = done = Future()
+                done.set_result((text, True))
+                return
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._futures[idx] = self._pool.submit(ocr_page, self.pdf_path, idx, self.cache_dir, self.dpi, self.lang)
+
+    def text(self, idx: int) -> Optional[str]:
+        """The OCR text of page `idx`, or None if OCR failed."""
+        self.submit(idx)
+        try:
+            text, _ = self._futures[idx].result()
+        except Exception as e:
+            if not self._warned:
+                print(f"Warning: OCR failed ({e}); scanned pages will have no text.")
+                self._warned = True
+            return None
+        return text
+
+    def release(self, idx: int) -> None:
+        self._futures.pop(idx, None)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        self._futures.clear()
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
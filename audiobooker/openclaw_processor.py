@@ -1,133 +1,273 @@
 
 import os
 import json
+import hashlib
+import tempfile
+import threading
 import subprocess
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+
+import regex as re
+
+from audiobooker.agent_pool import AgentError, AgentPool, AgentUnavailable, shared_pool
+from audiobooker.chunker import iter_sentence_spans
+from audiobooker.planner import DurationModel, plan_audio_files
+
+
+def split_windows(text: str, window_chars: int = 8000, overlap_chars: int = 400) -> List[Tuple[int, int]]:
+    """Split `text` into windows of whole sentences, returned as `(first, end)` sentence index ranges.
+
+    Windows hold at most `window_chars` (a longer sentence gets a window of its
+    own); each window after the first repeats the trailing sentences of its
+    predecessor that fit in `overlap_chars`.
+    """
+    spans = list(iter_sentence_spans(text))
+    windows = []
+    i = 0
+    while i < len(spans):
+        start = spans[i][0]
+        j = i + 1
+        while j < len(spans) and spans[j][1] - start <= window_chars:
+            j += 1
+        windows.append((i, j))
+        if j == len(spans):
+            break
+        k = j
+        while k - 1 > i and spans[j - 1][1] - spans[k - 1][0] <= overlap_chars:
+            k -= 1
+        i = k
+    return windows
+
+
+def _norm(s: str) -> str:
+    return " ".join(s.split())
+
+
+def merge_windows(pieces: List[str], overlaps: List[int]) -> str:
+    """Join cleaned windows, dropping the sentences each one repeats from its predecessor.
+
+    `overlaps[n]` is how many sentences window `n + 1` shared with window `n` in
+    the source. Repeated sentences are found by matching the tail of one window
+    against the head of the next; if cleaning reworded them, the source overlap
+    count is dropped instead.
+    """
+    if not pieces:
+        return ""
+    out = [pieces[0].strip()]
+    prev = [_norm(pieces[0][s:e]) for s, e in iter_sentence_spans(pieces[0])]
+    for piece, n_overlap in zip(pieces[1:], overlaps):
+        spans = list(iter_sentence_spans(piece))
+        head = [_norm(piece[s:e]) for s, e in spans]
+        drop = min(n_overlap, len(spans))
+        for k in range(min(len(prev), len(head), 2 * n_overlap + 2), 0, -1):
+            if prev[-k:] == head[:k]:
+                drop = k
+                break
+        if drop < len(spans):
+            out.append(piece[spans[drop][0]:].strip())
+        prev = head
+    return "\n".join(p for p in out if p)
+
+
+def _find_start(text: str, quote: str, lo: int, hi: int) -> int:
+    """Offset of `quote` (whitespace-insensitive) in `text[lo:hi]`, or -1."""
+    words = quote.split()[:12]
+    if not words:
+        return -1
+    m = re.search(r"\s+".join(re.escape(w) for w in words), text[lo:hi])
+    return lo + m.start() if m else -1
+
 
 class OpenClawProcessor:
     """
     OpenClaw integration for intelligent PDF processing and chapter management.
+
+    Long texts are processed map-reduce style: the text is cut into overlapping
+    windows on sentence boundaries, up to `parallelism` windows are sent to the
+    agent at once, and the results are merged. Agent responses are cached by a
+    hash of their prompt, in memory and optionally in `cache_dir`.
+
+    Calls go to a pool of persistent agent sessions (process-wide by default,
+    so web jobs share it); if no session can be started, each call spawns
+    `openclaw agent` as before. Either way a call is abandoned after `timeout`
+    seconds.
     """
-    def __init__(self, openclaw_dir: str = None):
+    def __init__(self, openclaw_dir: str = None, window_chars: int = 8000, window_overlap: int = 400,
+                 parallelism: int = 4, cache_dir: Optional[str] = None, timeout: float = 300.0,
+                 pool: Optional[AgentPool] = None, use_sessions: bool = True):
         self.openclaw_dir = openclaw_dir or os.path.join(os.getcwd(), "openclaw")
+        self.timeout = timeout
+        if pool is None and use_sessions:
+            pool = shared_pool(size=max(1, parallelism), timeout=timeout)
+        self.pool = pool
+        self.window_chars = window_chars
+        self.window_overlap = window_overlap
+        self.parallelism = parallelism
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._cache: Dict[str, str] = {}
+        self._cache_lock = threading.Lock()
 
     def _call_agent(self, prompt: str) -> str:
         """Call the OpenClaw agent with a prompt."""
+        if self.pool is not None and self.pool.available:
+            try:
+                return self.pool.call(prompt, timeout=self.timeout).strip()
+            except AgentUnavailable as e:
+                print(f"OpenClaw session unavailable ({e}); spawning the agent per call.")
+            except AgentError as e:
+                print(f"Warning: OpenClaw call failed: {e}. Falling back to basic processing.")
+                return ""
+        return self._spawn_agent(prompt)
+
+    def _spawn_agent(self, prompt: str) -> str:
+        """Run one `openclaw agent` process for `prompt`."""
         # Try global 'openclaw' command first, then local pnpm version
         try:
             # Using --no-interactive to ensure we get a clean output for parsing
             # We assume the gateway and LM Studio are already configured as per user's previous workflows.
             cmd = ["openclaw", "agent", "--message", prompt, "--no-interactive"]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=self.timeout)
             return result.stdout.strip()
+        except subprocess.TimeoutExpired:
+            print(f"Warning: OpenClaw call timed out after {self.timeout:.0f}s. Falling back to basic processing.")
+            return ""
         except (subprocess.CalledProcessError, FileNotFoundError):
             try:
                 # Fallback to local checkout if global command is not available
                 cmd = ["pnpm", "openclaw", "agent", "--message", prompt, "--no-interactive"]
-                result = subprocess.run(cmd, cwd=self.openclaw_dir, capture_output=True, text=True, check=True, shell=True)
+                result = subprocess.run(cmd, cwd=self.openclaw_dir, capture_output=True, text=True, check=True,
+                                        shell=True, timeout=self.timeout)
                 return result.stdout.strip()
             except Exception as e:
                 print(f"Warning: OpenClaw call failed: {e}. Falling back to basic processing.")
                 return ""
 
-    def clean_text(self, text: str) -> str:
-        """Use OpenClaw to remove headers, footers, and other PDF noise."""
-        if not text:
-            return ""
-        
+    def _call_cached(self, prompt: str) -> str:
+        """`_call_agent` with results cached by prompt hash; failed (empty) calls are not cached."""
+        key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with self._cache_lock:
+            if key in self._cache:
+                return self._cache[key]
+        path = self.cache_dir / f"{key}.txt" if self.cache_dir is not None else None
+        if path is not None and path.exists():
+            resp = path.read_text(encoding="utf-8")
+        else:
+            resp = self._call_agent(prompt)
+            if not resp:
+                return resp
+            if path is not None:
+                fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(resp)
+                os.replace(tmp, path)
+        with self._cache_lock:
+            self._cache[key] = resp
+        return resp
+
+    def _windows(self, text: str) -> Tuple[List[Tuple[int, int]], List[int]]:
+        """Character ranges of the windows of `text`, and the sentences each shares with the previous one."""
+        spans = list(iter_sentence_spans(text))
+        sentence_windows = split_windows(text, self.window_chars, self.window_overlap)
+        ranges = [(spans[i][0], spans[j - 1][1]) for i, j in sentence_windows]
+        overlaps = [prev_j - i for (_, prev_j), (i, _) in zip(sentence_windows, sentence_windows[1:])]
+        return ranges, overlaps
+
+    def _map(self, fn, items):
+        if len(items) <= 1 or self.parallelism <= 1:
+            return [fn(x) for x in items]
+        with ThreadPoolExecutor(max_workers=min(self.parallelism, len(items))) as pool:
+            return list(pool.map(fn, items))
+
+    def _clean_window(self, window: str) -> str:
         prompt = (
             "You are a text cleaning assistant. Please clean the following PDF-extracted text by "
             "removing repetitive headers, footers, page numbers, and any other non-content noise. "
             "Preserve the core content and flow of the text. Return ONLY the cleaned text.\n\n"
-            f"--- TEXT START ---\n{text[:8000]}\n--- TEXT END ---"
+            f"--- TEXT START ---\n{window}\n--- TEXT END ---"
         )
-        cleaned = self._call_agent(prompt)
-        return cleaned if cleaned else text
+        cleaned = self._call_cached(prompt)
+        return cleaned if cleaned else window
 
-    def split_into_chapters(self, text: str) -> List[Dict[str, str]]:
-        """Use OpenClaw to identify chapter boundaries and split the text."""
+    def clean_text(self, text: str) -> str:
+        """Use OpenClaw to remove headers, footers, and other PDF noise, window by window."""
         if not text:
-            return []
+            return ""
+        ranges, overlaps = self._windows(text)
+        if not ranges:
+            return text
+        if len(ranges) > 1:
+            print(f"Cleaning {len(ranges)} windows with up to {self.parallelism} OpenClaw calls in flight")
+        pieces = self._map(self._clean_window, [text[s:e] for s, e in ranges])
+        return merge_windows(pieces, overlaps)
 
+    def _chapter_starts(self, window: str) -> List[Dict[str, str]]:
         prompt = (
-            "You are a literary assistant. Analyze the following text and split it into chapters. "
+            "You are a literary assistant. Analyze the following text and find where chapters begin. "
             "Identify natural chapter breaks based on themes, titles, or narrative shifts. "
-            "Return the result as a JSON list of objects, each with a 'title' field and a 'content' field. "
+            "Return the result as a JSON list of objects, each with a 'title' field and a 'start' field "
+            "holding the first sentence of the chapter copied exactly from the text. "
             "Return ONLY the JSON.\n\n"
-            f"--- TEXT START ---\n{text[:15000]}\n--- TEXT END ---"
+            f"--- TEXT START ---\n{window}\n--- TEXT END ---"
         )
-        resp = self._call_agent(prompt)
-        
+        resp = self._call_cached(prompt)
         try:
             # Find the JSON array in the response
             start_idx = resp.find('[')
             end_idx = resp.rfind(']') + 1
             if start_idx != -1 and end_idx != -1:
-                json_str = resp[start_idx:end_idx]
-                chapters = json.loads(json_str)
-                if isinstance(chapters, list):
-                    return chapters
+                found = json.loads(resp[start_idx:end_idx])
+                if isinstance(found, list):
+                    return [c for c in found if isinstance(c, dict)]
         except (json.JSONDecodeError, ValueError):
             pass
+        return []
 
-        # Fallback if AI fails or returns invalid JSON
-        return [{"title": "Main Content", "content": text}]
+    def split_into_chapters(self, text: str) -> List[Dict[str, str]]:
+        """Use OpenClaw to identify chapter boundaries and split the text.
 
-    def plan_audio_files(self, chapters: List[Dict[str, str]], target_duration_sec: int = 3600) -> List[List[Dict[str, str]]]:
+        Each window reports the chapters starting in it; their positions are
+        located in `text`, boundaries seen by two overlapping windows are
+        merged, and a chapter continues across windows until the next boundary.
+        """
+        if not text:
+            return []
+        ranges, _ = self._windows(text)
+        results = self._map(self._chapter_starts, [text[s:e] for s, e in ranges])
+
+        boundaries: Dict[int, str] = {}
+        for (lo, hi), found in zip(ranges, results):
+            for ch in found:
+                # Older agent replies carry the whole 'content' instead of a 'start' quote
+                quote = str(ch.get("start") or ch.get("content") or "")
+                pos = _find_start(text, quote, lo, hi)
+                if pos != -1:
+                    boundaries.setdefault(pos, str(ch.get("title") or f"Chapter {len(boundaries) + 1}"))
+        if not boundaries:
+            # Fallback if AI fails or returns invalid JSON
+            return [{"title": "Main Content", "content": text}]
+
+        starts = sorted(boundaries)
+        starts[0] = 0  # any lead-in text belongs to the first chapter
+        titles = [boundaries[p] for p in sorted(boundaries)]
+        chapters = []
+        for pos, end, title in zip(starts, starts[1:] + [len(text)], titles):
+            content = text[pos:end].strip()
+            if content:
+                chapters.append({"title": title, "content": content})
+        return chapters
+
+    def plan_audio_files(self, chapters: List[Dict[str, str]], target_duration_sec: int = 3600,
+                         model: Optional[DurationModel] = None, voice: str = "", rate: str = "") -> List[List[Dict[str, str]]]:
         """
         Groups chapters into audio files. 
         Rule: No chapter is cut between 2 adjacent audio files.
         One audio file may contain more than one chapter.
+
+        Planning is done locally (see `audiobooker.planner`): chapter durations
+        come from the calibrated duration model, so no agent round-trip is needed.
         """
-        # Since we don't know the duration of each chapter yet without synthesizing, 
-        # we can use character count as a proxy or just group them one by one.
-        # However, the user wants OpenClaw to "manage" this.
-        # We can ask OpenClaw to group them based on content or estimated length.
-        
-        prompt = (
-            "I have a list of chapters and I need to group them into audio files. "
-            "Rules:\n"
-            "1. Each audio file should ideally be around 1 hour of content (approx 50,000 characters).\n"
-            "2. No chapter should be cut between two audio files.\n"
-            "3. One audio file may contain multiple chapters.\n"
-            "Please provide a grouping plan as a JSON list of lists, where each inner list contains the indices of the chapters "
-            "belonging to that audio file. Return ONLY the JSON.\n\n"
-            f"Chapters:\n"
-        )
-        for i, ch in enumerate(chapters):
-            prompt += f"Index {i}: {ch['title']} ({len(ch['content'])} chars)\n"
-            
-        resp = self._call_agent(prompt)
-        
-        try:
-            start_idx = resp.find('[')
-            end_idx = resp.rfind(']') + 1
-            if start_idx != -1 and end_idx != -1:
-                grouping_indices = json.loads(resp[start_idx:end_idx])
-                planned_groups = []
-                for group in grouping_indices:
-                    planned_groups.append([chapters[i] for i in group if i < len(chapters)])
-                return planned_groups
-        except:
-            pass
-            
-        # Fallback grouping by character count
-        planned_groups = []
-        current_group = []
-        current_chars = 0
-        max_chars = 50000 # Approx 1 hour of speech
-        
-        for ch in chapters:
-            ch_len = len(ch['content'])
-            if current_chars + ch_len > max_chars and current_group:
-                planned_groups.append(current_group)
-                current_group = [ch]
-                current_chars = ch_len
-            else:
-                current_group.append(ch)
-                current_chars += ch_len
-        
-        if current_group:
-            planned_groups.append(current_group)
-            
-        return planned_groups
+        return plan_audio_files(chapters, target_duration_sec, model=model, voice=voice, rate=rate)
@@ -1,12 +1,21 @@
 """PDF extraction utilities: clean pages, detect headers/footers, and summarize tables."""
 
 import re
-from dataclasses import dataclass
-from typing import List, Optional
-from collections import Counter
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, fields
+from typing import Iterable, List, Optional
+from collections import Counter, deque
 
 import pdfplumber
 
+from audiobooker.ocr import PageOCR, needs_ocr, ocr_page
+
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
 
 @dataclass
 class PageContent:
@@ -14,6 +23,57 @@ class PageContent:
     text: str
     tables: List[str]
     image_paths: List[str]
+    # True if `text` was read from the page image by OCR (a scanned page)
+    ocr: bool = False
+
+
+# Table extraction per page: "always", "auto" (only pages whose ruling lines
+# could bound a table, see `might_have_table`) or "never"
+TABLE_MODES = ("always", "auto", "never")
+# In "auto" mode every Nth page the pre-check rules out is extracted anyway, to
+# time what skipping saves and to catch tables the pre-check would have missed
+TABLE_AUDIT_EVERY = 16
+
+
+@dataclass
+class TableStats:
+    """What table detection did over a run of `extract_pages`."""
+
+    pages: int = 0
+    skipped: int = 0
+    extracted: int = 0
+    audited: int = 0
+    tables: int = 0
+    missed: int = 0
+    classify_seconds: float = 0.0
+    extract_seconds: float = 0.0
+    audit_seconds: float = 0.0
+
+    @property
+    def seconds_saved(self) -> float:
+        """Estimated extraction time avoided, using the mean time of the audited pages."""
+        if not self.audited:
+            return 0.0
+        return self.skipped * (self.audit_seconds / self.audited) - self.classify_seconds
+
+    def add(self, other: "TableStats") -> None:
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+    def as_dict(self) -> dict:
+        d = {f.name: getattr(self, f.name) for f in fields(self)}
+        d["classify_seconds"] = round(self.classify_seconds, 3)
+        d["extract_seconds"] = round(self.extract_seconds, 3)
+        d["audit_seconds"] = round(self.audit_seconds, 3)
+        d["seconds_saved"] = round(self.seconds_saved, 3)
+        return d
+
+    def summary(self) -> str:
+        return (
+            f"Table detection: {self.extracted}/{self.pages} pages extracted ({self.tables} tables), "
+            f"{self.skipped} skipped, ~{self.seconds_saved:.2f}s saved"
+            + (f", {self.missed} tables found on pages the pre-check ruled out" if self.missed else "")
+        )
 
 
 def is_index_like(text: str) -> bool:
@@ -57,28 +117,410 @@ def summarize_table(table):
     return "Table summary: " + (" | ".join(lines) if lines else "no readable rows")
 
 
-def extract_pages(pdf_path: str, _image_dir: Optional[str] = None):
-    """Yield PageContent entries for all non-index pages in the PDF file."""
-    pages_text = []
-    pages_meta = []
-    with pdfplumber.open(pdf_path) as pdf:
-        for i, page in enumerate(pdf.pages, start=1):
-            text = page.extract_text() or ""
-            pages_text.append(text)
-            pages_meta.append(page)
-    repeated = detect_repeated_lines(pages_text)
-    for i, (text, page) in enumerate(zip(pages_text, pages_meta), start=1):
-        if is_index_like(text):
-            continue
-        lines = [
-            line
-            for line in text.splitlines()
-            if line.strip() and line.strip() not in repeated
-        ]
-        cleaned = "\n".join(lines)
-        tables: list[str] = []
-        for t in page.extract_tables() or []:
-            tables.append(summarize_table(t))
-        images: list[str] = []
-        # image extraction left minimal for now
-        yield PageContent(page_no=i, text=cleaned, tables=tables, image_paths=images)
+def _distinct(positions: Iterable[float], tolerance: float = 1.0) -> int:
+    """Number of distinct positions, treating values within `tolerance` as one."""
+    count = 0
+    last = None
+    for x in sorted(positions):
+        if last is None or x - last > tolerance:
+            count += 1
+        last = x
+    return count
+
+
+def might_have_table(horizontal: Iterable[float], vertical: Iterable[float]) -> bool:
+    """True if ruling lines at these y (horizontal) and x (vertical) positions could bound a table.
+
+    Both engines' default table finders build cells from intersecting ruling
+    lines and keep only tables of two or more cells, which takes three rulings
+    one way and two the other; prose, underlines and single frames never qualify.
+    """
+    h, v = _distinct(horizontal), _distinct(vertical)
+    return h >= 2 and v >= 2 and h + v >= 5
+
+
+class PdfEngine:
+    """Per-page access to a PDF used by `extract_pages`.
+
+    Engines return raw page text and raw tables (lists of rows); cleaning and
+    summarizing is shared so every engine produces the same `PageContent` shape.
+    """
+
+    name = ""
+
+    def __init__(self, pdf_path: str) -> None:
+        self.pdf_path = pdf_path
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def text(self, idx: int) -> str:
+        raise NotImplementedError
+
+    def tables(self, idx: int) -> list:
+        raise NotImplementedError
+
+    def might_have_table(self, idx: int) -> bool:
+        """Cheap pre-check run before `tables` in "auto" mode; False only if page `idx` has no table."""
+        return True
+
+    def has_images(self, idx: int) -> bool:
+        """True if page `idx` draws any image; text-less pages without one are not OCR'd."""
+        return True
+
+    def release(self, idx: int) -> None:
+        """Drop any per-page caches once page `idx` has been processed."""
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class PdfplumberEngine(PdfEngine):
+    """pdfplumber: slower, but the reference for text layout and table extraction."""
+
+    name = "pdfplumber"
+
+    def __init__(self, pdf_path: str) -> None:
+        super().__init__(pdf_path)
+        self.pdf = pdfplumber.open(pdf_path)
+
+    def __len__(self) -> int:
+        return len(self.pdf.pages)
+
+    def text(self, idx: int) -> str:
+        return self.pdf.pages[idx].extract_text() or ""
+
+    def tables(self, idx: int) -> list:
+        return self.pdf.pages[idx].extract_tables() or []
+
+    def might_have_table(self, idx: int) -> bool:
+        # page.edges covers the lines, rects and curves the "lines" strategy uses
+        edges = self.pdf.pages[idx].edges
+        return might_have_table(
+            (e["top"] for e in edges if e["orientation"] == "h"),
+            (e["x0"] for e in edges if e["orientation"] == "v"),
+        )
+
+    def has_images(self, idx: int) -> bool:
+        return bool(self.pdf.pages[idx].images)
+
+    def release(self, idx: int) -> None:
+        self.pdf.pages[idx].close()
+
+    def close(self) -> None:
+        self.pdf.close()
+
+
+class FitzEngine(PdfEngine):
+    """PyMuPDF: much faster text extraction, with its own table finder."""
+
+    name = "fitz"
+
+    def __init__(self, pdf_path: str) -> None:
+        if fitz is None:
+            raise RuntimeError("pymupdf not installed")
+        super().__init__(pdf_path)
+        self.doc = fitz.open(pdf_path)
+
+    def __len__(self) -> int:
+        return self.doc.page_count
+
+    def text(self, idx: int) -> str:
+        # Rebuild lines from word boxes like pdfplumber does (words sharing a
+        # baseline form one line); much cheaper than get_text(sort=True).
+        rows: dict = {}
+        for x0, _, _, y1, word, *_ in self.doc[idx].get_text("words"):
+            rows.setdefault(round(y1), []).append((x0, word))
+        clusters: list = []
+        last_y = None
+        for y in sorted(rows):
+            if last_y is not None and y - last_y <= 1:
+                clusters[-1].extend(rows[y])  # baseline jitter of a point
+            else:
+                clusters.append(list(rows[y]))
+            last_y = y
+        return "\n".join(" ".join(w for _, w in sorted(c)) for c in clusters)
+
+    def tables(self, idx: int) -> list:
+        return [t.extract() for t in self.doc[idx].find_tables().tables]
+
+    def might_have_table(self, idx: int) -> bool:
+        horizontal: list = []
+        vertical: list = []
+        for d in self.doc[idx].get_drawings():
+            for item in d["items"]:
+                if item[0] == "re":
+                    r = item[1]
+                    horizontal += (r.y0, r.y1)
+                    vertical += (r.x0, r.x1)
+                elif item[0] == "l":
+                    p1, p2 = item[1], item[2]
+                    if abs(p1.y - p2.y) < 1:
+                        horizontal.append(p1.y)
+                    elif abs(p1.x - p2.x) < 1:
+                        vertical.append(p1.x)
+        return might_have_table(horizontal, vertical)
+
+    def has_images(self, idx: int) -> bool:
+        return bool(self.doc[idx].get_images())
+
+    def close(self) -> None:
+        self.doc.close()
+
+
+class AutoEngine(FitzEngine):
+    """PyMuPDF for text and the table pre-check; pdfplumber for the tables themselves."""
+
+    name = "auto"
+
+    def __init__(self, pdf_path: str) -> None:
+        super().__init__(pdf_path)
+        self._plumber: Optional[PdfplumberEngine] = None
+
+    def tables(self, idx: int) -> list:
+        if self._plumber is None:
+            self._plumber = PdfplumberEngine(self.pdf_path)
+        tables = self._plumber.tables(idx)
+        self._plumber.release(idx)
+        return tables
+
+    def close(self) -> None:
+        if self._plumber is not None:
+            self._plumber.close()
+        super().close()
+
+
+ENGINES = {e.name: e for e in (PdfplumberEngine, FitzEngine, AutoEngine)}
+
+
+def open_engine(pdf_path: str, engine: str = "pdfplumber") -> PdfEngine:
+    """Open `pdf_path` with the extraction engine registered as `engine`."""
+    try:
+        cls = ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown extraction engine {engine!r}; choose from {sorted(ENGINES)}")
+    return cls(pdf_path)
+
+
+def _page_tables(eng: PdfEngine, idx: int, table_mode: str, stats: TableStats) -> list:
+    """Raw tables of page `idx` under `table_mode` (see TABLE_MODES), recorded in `stats`."""
+    stats.pages += 1
+    if table_mode == "never":
+        stats.skipped += 1
+        return []
+    if table_mode == "auto":
+        t0 = time.perf_counter()
+        candidate = eng.might_have_table(idx)
+        stats.classify_seconds += time.perf_counter() - t0
+        if not candidate:
+            if (stats.skipped + stats.audited) % TABLE_AUDIT_EVERY:
+                stats.skipped += 1
+                return []
+            t0 = time.perf_counter()
+            tables = eng.tables(idx)
+            stats.audit_seconds += time.perf_counter() - t0
+            stats.audited += 1
+            stats.missed += len(tables)
+            stats.tables += len(tables)
+            return tables
+    t0 = time.perf_counter()
+    tables = eng.tables(idx)
+    stats.extract_seconds += time.perf_counter() - t0
+    stats.extracted += 1
+    stats.tables += len(tables)
+    return tables
+
+
+def _page_content(
+    i: int, text: str, eng: PdfEngine, repeated, table_mode: str, stats: TableStats, ocr: bool = False
+) -> Optional[PageContent]:
+    """Build the PageContent for page `i` (1-based), or None if it should be skipped."""
+    if is_index_like(text):
+        return None
+    lines = [
+        line
+        for line in text.splitlines()
+        if line.strip() and line.strip() not in repeated
+    ]
+    cleaned = "\n".join(lines)
+    tables: list[str] = []
+    for t in _page_tables(eng, i - 1, table_mode, stats):
+        tables.append(summarize_table(t))
+    images: list[str] = []
+    # image extraction left minimal for now
+    return PageContent(page_no=i, text=cleaned, tables=tables, image_paths=images, ocr=ocr)
+
+
+def _sample_indices(n_pages: int, sample_size: int) -> List[int]:
+    """Evenly spaced page indices used for header/footer detection."""
+    if n_pages <= sample_size:
+        return list(range(n_pages))
+    step = n_pages / sample_size
+    return sorted({int(k * step) for k in range(sample_size)})
+
+
+def _is_scanned(eng: PdfEngine, idx: int, text: str) -> bool:
+    return needs_ocr(text) and eng.has_images(idx)
+
+
+def _page_texts(eng: PdfEngine, indices, ocr: Optional[PageOCR], lookahead: int, release_ocr: bool = True):
+    """Yield (idx, text, ocr'd) for `indices` in order.
+
+    Scanned pages go to the OCR pool as soon as they are seen and are yielded
+    once read, while text is extracted from up to `lookahead` pages behind them.
+    """
+    pending: deque = deque()
+
+    def resolve():
+        idx, text, scanned = pending.popleft()
+        if scanned:
+            ocr_text = ocr.text(idx)
+            if release_ocr:
+                ocr.release(idx)
+            if ocr_text is None:
+                return idx, text, False
+            text = ocr_text
+        return idx, text, scanned
+
+    for idx in indices:
+        text = eng.text(idx)
+        scanned = ocr is not None and _is_scanned(eng, idx, text)
+        if scanned:
+            ocr.submit(idx)
+        pending.append((idx, text, scanned))
+        while pending and (len(pending) > lookahead or not pending[0][2]):
+            yield resolve()
+    while pending:
+        yield resolve()
+
+
+def _detect_repeated_sampled(eng: PdfEngine, sample_size: int, ocr: Optional[PageOCR] = None):
+    """Run `detect_repeated_lines` over a sample of pages, releasing each page after use.
+
+    Scanned pages are OCR'd for the sample and their text kept in `ocr` for the main pass.
+    """
+    texts = []
+    indices = _sample_indices(len(eng), sample_size)
+    for idx, text, _ in _page_texts(eng, indices, ocr, len(indices), release_ocr=False):
+        texts.append(text)
+        eng.release(idx)
+    return detect_repeated_lines(texts) if texts else set()
+
+
+def _extract_range(pdf_path: str, engine: str, start: int, stop: int, repeated, table_mode: str,
+                   ocr_cache_dir: Optional[str] = None, ocr: bool = True):
+    """Worker: extract pages [start, stop) (0-based) in a separate process; return (pages, TableStats).
+
+    Scanned pages are OCR'd inline, the worker processes being the pool; a
+    page that fails keeps its extracted text (the sample pass has already warned).
+    """
+    out = []
+    stats = TableStats()
+    with open_engine(pdf_path, engine) as eng:
+        for idx in range(start, stop):
+            text = eng.text(idx)
+            scanned = ocr and _is_scanned(eng, idx, text)
+            if scanned:
+                try:
+                    text = ocr_page(pdf_path, idx, ocr_cache_dir)[0]
+                except Exception:
+                    scanned = False
+            content = _page_content(idx + 1, text, eng, repeated, table_mode, stats, scanned)
+            eng.release(idx)
+            if content is not None:
+                out.append(content)
+    return out, stats
+
+
+def _extract_parallel(
+    pdf_path: str, engine: str, n_pages: int, repeated, workers: int, pages_per_task: int,
+    table_mode: str, table_stats: TableStats, ocr: bool, ocr_cache_dir: Optional[str],
+):
+    """Fan page ranges out to a process pool and yield results in page order.
+
+    At most `2 * workers` ranges are in flight, so memory stays bounded.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    ranges = iter([(s, min(s + pages_per_task, n_pages)) for s in range(0, n_pages, pages_per_task)])
+    pending: deque = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+
+        def submit_next() -> None:
+            r = next(ranges, None)
+            if r is not None:
+                pending.append(pool.submit(
+                    _extract_range, pdf_path, engine, r[0], r[1], repeated, table_mode, ocr_cache_dir, ocr))
+
+        for _ in range(2 * workers):
+            submit_next()
+        while pending:
+            done, stats = pending.popleft().result()
+            table_stats.add(stats)
+            submit_next()
+            yield from done
+
+
+def extract_pages(
+    pdf_path: str,
+    _image_dir: Optional[str] = None,
+    stream: bool = False,
+    workers: int = 1,
+    sample_size: int = 32,
+    pages_per_task: int = 16,
+    engine: str = "pdfplumber",
+    table_mode: str = "auto",
+    table_stats: Optional[TableStats] = None,
+    ocr: bool = True,
+    ocr_workers: int = 0,
+    ocr_cache_dir: Optional[str] = None,
+):
+    """Yield PageContent entries for all non-index pages in the PDF file.
+
+    By default all page text is read before header/footer detection runs.
+    With `stream=True` (or `workers > 1`), repeated lines are detected on up to
+    `sample_size` evenly spaced pages and pages are then yielded one at a time
+    with bounded memory. `workers > 1` extracts text and tables for ranges of
+    `pages_per_task` pages in a process pool, still yielding in page order.
+    `engine` selects the backend: "pdfplumber", "fitz" or "auto" (see ENGINES).
+    `table_mode` is one of TABLE_MODES; pass a TableStats as `table_stats` to
+    learn how many pages table extraction ran on or skipped, and the time taken.
+    With `ocr`, pages with an image but (almost) no text layer are rasterized
+    and OCR'd in a pool of `ocr_workers` processes (0 = one per core; with
+    `workers > 1` the extraction workers OCR their own pages after the
+    sample), their text cached by page image in `ocr_cache_dir` when given.
+    """
+    if table_mode not in TABLE_MODES:
+        raise ValueError(f"Unknown table mode {table_mode!r}; choose from {list(TABLE_MODES)}")
+    if table_stats is None:
+        table_stats = TableStats()
+    page_ocr = PageOCR(pdf_path, ocr_workers, ocr_cache_dir) if ocr else None
+    with open_engine(pdf_path, engine) as eng, page_ocr or nullcontext():
+        n_pages = len(eng)
+        if stream or workers > 1:
+            repeated = _detect_repeated_sampled(eng, sample_size, page_ocr)
+            if workers <= 1:
+                lookahead = 2 * page_ocr.workers if page_ocr else 0
+                for idx, text, scanned in _page_texts(eng, range(n_pages), page_ocr, lookahead):
+                    content = _page_content(idx + 1, text, eng, repeated, table_mode, table_stats, scanned)
+                    eng.release(idx)
+                    if content is not None:
+                        yield content
+                return
+        else:
+            pages = list(_page_texts(eng, range(n_pages), page_ocr, n_pages))
+            repeated = detect_repeated_lines([text for _, text, _ in pages])
+            for idx, text, scanned in pages:
+                content = _page_content(idx + 1, text, eng, repeated, table_mode, table_stats, scanned)
+                if content is not None:
+                    yield content
+            return
+    yield from _extract_parallel(
+        pdf_path, engine, n_pages, repeated, workers, pages_per_task, table_mode, table_stats, ocr, ocr_cache_dir
+    )
@@ -0,0 +1,111 @@
+"""Stages running in their own threads, connected by bounded queues.
+
+A full queue blocks its producer, so a fast stage waits for a slow one
+instead of buffering without limit. The first stage to fail stops the
+others: their blocked `put`/`get` calls raise `PipelineAborted`, and `join`
+re-raises the original error.
+"""
+
+import queue
+import threading
+from typing import Any, Callable, Iterator, List, Optional
+
+# Put by `Channel.close`; `get` returns it (and iteration ends) once the producer is done
+CHANNEL_END = object()
+_POLL_SECONDS = 0.1
+
+
+class PipelineAborted(Exception):
+    """Raised in a stage when another stage of the pipeline has failed."""
+
+
+class Channel:
+    """Bounded queue between two stages of a `Pipeline`."""
+
+    def __init__(self, pipeline: "Pipeline", maxsize: int) -> None:
+        self._pipeline = pipeline
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+        # Largest number of items seen waiting; shows where the pipeline backs up
+        self.peak = 0
+
+    def put(self, item: Any) -> None:
+        while True:
+            self._pipeline.check()
+            try:
+                self._queue.put(item, timeout=_POLL_SECONDS)
+                self.peak = max(self.peak, self._queue.qsize())
+                return
+            except queue.Full:
+                pass
+
+    def get(self) -> Any:
+        """Next item, or CHANNEL_END once the producer has closed the channel."""
+        while True:
+            self._pipeline.check()
+            try:
+                return self._queue.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                pass
+
+    def close(self) -> None:
+        self.put(CHANNEL_END)
+
+    def __iter__(self) -> Iterator[Any]:
+        while True:
+            item = self.get()
+            if item is CHANNEL_END:
+                return
+            yield item
+
+
+class Pipeline:
+    """Threads connected by `Channel`s; use as a context manager around the stage on the calling thread."""
+
+    def __init__(self) -> None:
+        self._abort = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def channel(self, maxsize: int) -> Channel:
+        return Channel(self, maxsize)
+
+    def spawn(self, fn: Callable, *args, name: str = "") -> None:
+        """Run `fn(*args)` as a stage in a new thread."""
+
+        def run() -> None:
+            try:
+                fn(*args)
+            except BaseException as e:
+                self.fail(e)
+
+        t = threading.Thread(target=run, name=f"audiobooker-{name or fn.__name__}", daemon=True)
+        self._threads.append(t)
+        t.start()
+
+    def fail(self, error: BaseException) -> None:
+        """Record the first real error and stop every stage."""
+        with self._lock:
+            if self._error is None and not isinstance(error, PipelineAborted):
+                self._error = error
+        self._abort.set()
+
+    def check(self) -> None:
+        if self._abort.is_set():
+            raise PipelineAborted()
+
+    def join(self) -> None:
+        """Wait for every stage; raise the error that stopped the pipeline, if any."""
+        for t in self._threads:
+            t.join()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self) -> "Pipeline":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc is not None:
+            self.fail(exc)
+        self.join()
+        return False
@@ -0,0 +1,139 @@
+"""Local audio part planning from a calibrated chars-per-second duration model."""
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from audiobooker.manifest import write_json_atomic
+from audiobooker.mp3_concat import probe
+
+try:
+    from mutagen import MutagenError
+    from mutagen.mp3 import MP3
+except ImportError:
+    MP3 = None
+
+# Prior for voices with no calibration yet: ~50,000 characters per hour of speech
+DEFAULT_CHARS_PER_SEC = 50000 / 3600
+# Weight of the prior, in seconds of observed audio; real data quickly dominates
+PRIOR_SECONDS = 60.0
+
+
+def mp3_duration(path: str) -> Optional[float]:
+    """Duration of an MP3 from its headers (Xing/Info frame or bitrate), without decoding."""
+    if MP3 is not None:
+        try:
+            return float(MP3(path).info.length)
+        except (MutagenError, OSError, ValueError):
+            pass
+    try:
+        return probe(path).duration
+    except (ValueError, OSError):
+        return None
+
+
+class DurationModel:
+    """Characters-per-second speech rate per (voice, rate), learned from synthesized chunks.
+
+    Each key keeps running totals of characters and seconds, blended with a
+    small prior, so estimates improve with every chunk observed. When `path` is
+    set the totals are loaded from and saved to that JSON file, letting
+    calibration accumulate across jobs.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = Path(path).expanduser() if path else None
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "DurationModel":
+        model = cls(path)
+        if model.path is not None and model.path.exists():
+            try:
+                model.stats = json.loads(model.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable duration model {model.path}: {e}")
+        return model
+
+    @staticmethod
+    def key(voice: str, rate: str = "") -> str:
+        return f"{voice}|{rate}"
+
+    def chars_per_sec(self, voice: str, rate: str = "") -> float:
+        st = self.stats.get(self.key(voice, rate), {})
+        chars = st.get("chars", 0.0) + PRIOR_SECONDS * DEFAULT_CHARS_PER_SEC
+        return chars / (st.get("seconds", 0.0) + PRIOR_SECONDS)
+
+    def estimate(self, chars: int, voice: str, rate: str = "") -> float:
+        """Estimated seconds of speech for `chars` characters."""
+        return chars / self.chars_per_sec(voice, rate)
+
+    def observe(self, chars: int, seconds: float, voice: str, rate: str = "") -> None:
+        if chars <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            st = self.stats.setdefault(self.key(voice, rate), {"chars": 0.0, "seconds": 0.0, "samples": 0})
+            st["chars"] += chars
+            st["seconds"] += seconds
+            st["samples"] += 1
+
+    def observe_file(self, path: str, chars: int, voice: str, rate: str = "") -> None:
+        """Learn from a finished chunk file, reading its duration from the MP3 headers."""
+        seconds = mp3_duration(path)
+        if seconds:
+            self.observe(chars, seconds, voice, rate)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            write_json_atomic(self.path, self.stats)
+
+
+def balanced_partition(durations: Sequence[float], target: float) -> List[Tuple[int, int]]:
+    """Split `durations` into contiguous `(start, end)` runs whose sums are close to `target`.
+
+    Minimizes the sum of squared deviations from `target` with a DP over part
+    ends. A part never needs to be longer than about twice the target plus one
+    item, so each end only looks back over that many items: linear time for
+    any realistic chapter size. Ties resolve to the earliest split, so the
+    plan is deterministic.
+    """
+    n = len(durations)
+    if n == 0:
+        return []
+    target = max(float(target), 1e-9)
+    limit = 2 * target + max(durations)
+    best = [0.0] + [float("inf")] * n
+    back = [0] * (n + 1)
+    for end in range(1, n + 1):
+        total = 0.0
+        for start in range(end - 1, -1, -1):
+            total += durations[start]
+            if total > limit and start < end - 1:
+                break
+            cost = best[start] + (total - target) ** 2
+            if cost < best[end]:
+                best[end], back[end] = cost, start
+    parts = []
+    end = n
+    while end:
+        parts.append((back[end], end))
+        end = back[end]
+    return parts[::-1]
+
+
+def plan_audio_files(
+    chapters: List[Dict[str, str]],
+    target_duration_sec: float = 3600,
+    model: Optional[DurationModel] = None,
+    voice: str = "",
+    rate: str = "",
+) -> List[List[Dict[str, str]]]:
+    """Group consecutive chapters into parts of about `target_duration_sec`, never splitting a chapter."""
+    model = model or DurationModel()
+    durations = [model.estimate(len(ch["content"]), voice, rate) for ch in chapters]
+    return [chapters[s:e] for s, e in balanced_partition(durations, target_duration_sec)]
@@ -0,0 +1,133 @@
+"""Outputs of finished web jobs, kept so an identical request reuses them instead of regenerating."""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Optional
+
+from audiobooker.manifest import text_sha256, write_json_atomic
+
+INDEX_NAME = "results.json"
+
+
+def save_upload(src: BinaryIO, dest: Path, block_size: int = 1 << 20) -> str:
+    """Stream the file object `src` to `dest`, hashing it on the way; return its SHA-256.
+
+    The data goes to `<dest>.part` first, so `dest` never holds a partial upload.
+    """
+    h = hashlib.sha256()
+    tmp = dest.with_name(dest.name + ".part")
+    try:
+        with open(tmp, "wb") as out:
+            for block in iter(lambda: src.read(block_size), b""):
+                h.update(block)
+                out.write(block)
+        os.replace(tmp, dest)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    return h.hexdigest()
+
+
+def job_key(source_hash: str, settings: Dict) -> str:
+    """Key of a generation job: its input's hash plus every setting that shapes the audio."""
+    return text_sha256(source_hash, json.dumps(settings, sort_keys=True))
+
+
+def _tree_bytes(folder: Path) -> int:
+    return sum(p.stat().st_size for p in folder.rglob("*") if p.is_file())
+
+
+class ResultStore:
+    """Finished jobs by job key, each owning its output folder `<root>/<job_id>`.
+
+    The index is kept in `<root>/results.json` so results survive a restart.
+    An entry not requested for `max_age` seconds is evicted, and the least
+    recently used ones go next while the folders total more than `max_bytes`;
+    eviction deletes the folder and calls `on_evict(job_id)`.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 10 * 1024**3, max_age: float = 7 * 24 * 3600,
+                 on_evict: Optional[Callable[[str], None]] = None) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.on_evict = on_evict
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        try:
+            with open(self.root / INDEX_NAME, encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def get(self, key: str) -> Optional[Dict]:
+        """The stored entry for `key` (job_id, result, bytes, created_at, last_used), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not (self.root / entry["job_id"]).is_dir() or time.time() - entry["last_used"] > self.max_age:
+                self._drop(key)
+                self._save()
+                return None
+            entry["last_used"] = time.time()
+            self._save()
+            return dict(entry)
+
+    def put(self, key: str, job_id: str, result: Dict) -> None:
+        """Record the finished job `job_id`, whose outputs are in `<root>/<job_id>`, then evict."""
+        now = time.time()
+        entry = {"job_id": job_id, "result": result, "bytes": _tree_bytes(self.root / job_id),
+                 "created_at": now, "last_used": now}
+        with self._lock:
+            old = self._entries.get(key)
+            if old is not None and old["job_id"] != job_id:
+                self._drop(key)
+            self._entries[key] = entry
+            self._evict(keep=key)
+            self._save()
+
+    def evict(self) -> int:
+        """Drop expired entries, then the least recently used while over budget; return how many."""
+        with self._lock:
+            removed = self._evict()
+            self._save()
+        return removed
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(e["bytes"] for e in self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self, keep: Optional[str] = None) -> int:
+        now = time.time()
+        total = self.size_bytes
+        removed = 0
+        for key, entry in sorted(self._entries.items(), key=lambda kv: kv[1]["last_used"]):
+            if key == keep:
+                continue
+            if now - entry["last_used"] > self.max_age or total > self.max_bytes:
+                total -= entry["bytes"]
+                self._drop(key)
+                removed += 1
+        return removed
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        shutil.rmtree(self.root / entry["job_id"], ignore_errors=True)
+        if self.on_evict is not None:
+            self.on_evict(entry["job_id"])
+
+    def _save(self) -> None:
+        write_json_atomic(self.root / INDEX_NAME, self._entries)
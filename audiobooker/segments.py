@@ -0,0 +1,112 @@
+"""Ordered store of finished chunk audio, for listening while a book is still generating."""
+
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+from audiobooker.mp3_concat import iter_frames, probe
+
+
+class SegmentStore:
+    """Keep a copy of every synthesized chunk as `seg{index:05d}.mp3`.
+
+    Chunks finish out of order when synthesized concurrently, so only the
+    contiguous run starting at index 0 is exposed as ready. Files are hard-linked
+    when possible, so the generator can still delete its own chunk files.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.complete = False
+        self._durations: Dict[int, float] = {}
+        self._ready = 0
+        self._lock = threading.Lock()
+
+    def path(self, index: int) -> Path:
+        return self.root / f"seg{index:05d}.mp3"
+
+    @classmethod
+    def load(cls, root: str) -> "SegmentStore":
+        """Index the segments already on disk, e.g. for a job from a previous server run."""
+        store = cls(root)
+        for f in sorted(store.root.glob("seg*.mp3")):
+            store._record(int(f.stem[3:]))
+        store.finish()
+        return store
+
+    def add(self, index: int, src: str) -> None:
+        """Record chunk `index`, whose audio is currently at `src`."""
+        dest = self.path(index)
+        if dest.exists():
+            dest.unlink()
+        try:
+            os.link(src, dest)
+        except OSError:
+            shutil.copyfile(src, dest)
+        self._record(index)
+
+    def _record(self, index: int) -> None:
+        dest = self.path(index)
+        try:
+            duration = probe(str(dest)).duration
+        except ValueError:
+            duration = 0.0  # not MPEG audio (e.g. a stub provider); still keep ordering
+        with self._lock:
+            self._durations[index] = duration
+            while self._ready in self._durations:
+                self._ready += 1
+
+    def finish(self) -> None:
+        """Mark that no further segments will be added."""
+        self.complete = True
+
+    @property
+    def ready(self) -> int:
+        """Number of leading segments available for playback."""
+        return self._ready
+
+    def duration(self, index: int) -> float:
+        return self._durations[index]
+
+    def ready_seconds(self) -> float:
+        return sum(self._durations[i] for i in range(self._ready))
+
+    def locate(self, seconds: float) -> Tuple[int, float]:
+        """Map a position in the book to (segment index, offset within it)."""
+        for i in range(self._ready):
+            d = self._durations[i]
+            if seconds < d:
+                return i, seconds
+            seconds -= d
+        return self._ready, 0.0
+
+    def read(self, index: int, skip_seconds: float = 0.0) -> bytes:
+        """Raw MPEG frames of segment `index` (tags stripped), starting `skip_seconds` in."""
+        frames = []
+        t = 0.0
+        for hdr, frame in iter_frames(str(self.path(index))):
+            if t >= skip_seconds:
+                frames.append(frame)
+            t += hdr.samples / hdr.sample_rate
+        return b"".join(frames)
+
+    def playlist(self, url_for: Callable[[int], str]) -> str:
+        """Render an HLS (EVENT) playlist of ready segments; ENDLIST once complete."""
+        n = self._ready
+        target = max([self._durations[i] for i in range(n)] or [1.0])
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            "#EXT-X-PLAYLIST-TYPE:EVENT",
+            f"#EXT-X-TARGETDURATION:{int(target) + 1}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+        ]
+        for i in range(n):
+            lines.append(f"#EXTINF:{self._durations[i]:.3f},")
+            lines.append(url_for(i))
+        if self.complete:
+            lines.append("#EXT-X-ENDLIST")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,183 @@
+"""HTTP serving helpers for finished audio: byte ranges, strong ETags and conditional requests.
+
+Framework-free so it can be tested without a server; the web app turns the
+results into responses.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from audiobooker.manifest import MANIFEST_NAME, file_sha256
+from audiobooker.planner import mp3_duration
+
+try:
+    import mutagen
+except ImportError:
+    mutagen = None
+
+# Outputs of a finished job never change (new settings mean a new job), so clients may keep them
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Still being written: clients must revalidate
+REVALIDATE = "no-cache"
+
+
+class RangeNotSatisfiable(ValueError):
+    """The requested byte range starts past the end of the file (HTTP 416)."""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """The single byte range `(start, end)` (end exclusive) asked for by a Range header.
+
+    Returns None when the whole file should be sent: no header, a malformed
+    one, or several ranges (which a server may answer with the full body).
+    Raises RangeNotSatisfiable if the range lies beyond the file.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    try:
+        start = int(first) if first else None
+        last_byte = int(last) if last else None
+    except ValueError:
+        return None
+    if not dash or (start is None and last_byte is None):
+        return None
+    if start is None:  # suffix range: the last N bytes
+        if last_byte <= 0 or size == 0:
+            raise RangeNotSatisfiable(spec)
+        return max(0, size - last_byte), size
+    end = last_byte + 1 if last_byte is not None else size
+    if start < 0 or (last_byte is not None and last_byte < start):
+        return None  # invalid, so ignored
+    if start >= size:
+        raise RangeNotSatisfiable(spec)
+    return start, min(end, size)
+
+
+def _etags(header: str) -> List[str]:
+    return [t.strip().removeprefix("W/") for t in header.split(",") if t.strip()]
+
+
+def not_modified(headers, etag: str, mtime: float) -> bool:
+    """True if a GET with these request headers can be answered 304 Not Modified.
+
+    If-None-Match wins over If-Modified-Since, as RFC 9110 requires.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = _etags(if_none_match)
+        return "*" in tags or etag in tags
+    since = headers.get("if-modified-since")
+    if since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def range_applies(headers, etag: str, mtime: float) -> bool:
+    """False if an If-Range precondition says the client's copy is stale (send the whole file)."""
+    if_range = headers.get("if-range")
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range.strip() == etag  # strong comparison only
+    return if_range.strip() == http_date(mtime)
+
+
+def http_date(mtime: float) -> str:
+    return formatdate(int(mtime), usegmt=True)
+
+
+def _manifest_sha256(path: Path, st: os.stat_result) -> Optional[str]:
+    """The part's checksum from its book manifest, if recorded after the file was last written."""
+    manifest = path.parent / MANIFEST_NAME
+    try:
+        if manifest.stat().st_mtime_ns < st.st_mtime_ns:
+            return None
+        rec = json.loads(manifest.read_text(encoding="utf-8"))["parts"].get(path.name)
+    except (OSError, ValueError, KeyError, AttributeError):
+        return None
+    return rec.get("sha256") if isinstance(rec, dict) else None
+
+
+def audio_duration(path: Path) -> Optional[float]:
+    """Length in seconds from the file's headers, without decoding; None if unknown."""
+    if path.suffix.lower() == ".mp3":
+        return mp3_duration(str(path))
+    if mutagen is not None:
+        try:
+            audio = mutagen.File(str(path))
+        except (mutagen.MutagenError, OSError, ValueError):
+            return None
+        if audio is not None and audio.info is not None:
+            return float(audio.info.length)
+    return None
+
+
+class FileInfoCache:
+    """Strong ETag and duration of served files, computed once per file version.
+
+    The ETag is the file's SHA-256, taken from the book manifest when the part
+    is recorded there and hashed from the content otherwise. A version is the
+    (path, size, mtime) triple, so a rewritten file gets a new ETag.
+    """
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int, int], Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, path: Path, st: os.stat_result) -> Dict:
+        key = (str(path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+            entry = self._entries[key] = {}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def etag(self, path: Path, st: Optional[os.stat_result] = None) -> str:
+        st = st or path.stat()
+        entry = self._entry(path, st)
+        if "etag" not in entry:
+            digest = _manifest_sha256(path, st) or file_sha256(str(path))
+            entry["etag"] = f'"{digest[:32]}"'
+        return entry["etag"]
+
+    def duration(self, path: Path, st: Optional[os.stat_result] = None) -> Optional[float]:
+        st = st or path.stat()
+        entry = self._entry(path, st)
+        if "duration" not in entry:
+            entry["duration"] = audio_duration(path)
+        return entry["duration"]
+
+
+def recorded_parts(job_dir: Path) -> List[Tuple[Path, bool]]:
+    """Finished parts of a job, as recorded in its book manifests, with each book's completion flag.
+
+    Text jobs keep their manifest in the job folder, PDF jobs in a subfolder named after the book.
+    """
+    parts = []
+    for manifest in sorted([job_dir / MANIFEST_NAME, *job_dir.glob(f"*/{MANIFEST_NAME}")]):
+        try:
+            data = json.loads(manifest.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        for name in sorted(data.get("parts", {})):
+            path = manifest.parent / name
+            if path.is_file():
+                parts.append((path, bool(data.get("complete"))))
+    return parts
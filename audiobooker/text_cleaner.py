@@ -1,47 +1,228 @@
+"""Text cleaning utilities for TTS preparation.
 
-"""Text cleaning utilities for TTS preparation."""
+`clean_markdown` strips markdown syntax in a single tokenizing pass over the
+text; `iter_clean_markdown` does the same for a stream of page texts with
+bounded memory. Both produce exactly what the original rule-by-rule passes
+(`_clean_passes`, kept as the reference) produce.
+"""
 
-import regex as re
+import re
+from typing import Iterable, Iterator, List, Tuple
 
+import regex
+
+# Long texts are cleaned in segments of about this many characters (see `_is_cut`)
+SEGMENT_CHARS = 1 << 16
 
-def clean_markdown(text: str) -> str:
-    """Remove markdown syntax and special characters that degrade TTS quality."""
-    if not text:
-        return ""
 
+_LINK = regex.compile(r'\[([^\]]+)\]\([^\)]+\)')
+_IMAGE = regex.compile(r'!\[[^\]]*\]\([^\)]+\)')
+_HEADER = regex.compile(r'(?m)^#+\s*')
+_EMPHASIS = regex.compile(r'[\*_`]')
+_RULE = regex.compile(r'(?m)^[-*_]{3,}\s*$')
+_SEPARATOR = regex.compile(r'(?m)^\|?\s*[-: ]+\|\s*[-: \|]*$')
+_SPACES = regex.compile(r' +')
+_BLANK_LINES = regex.compile(r'\n{3,}')
+
+
+def _clean_passes(text: str) -> str:
+    """The original cleaning rules, one regex pass each (no final strip)."""
     # 1. Remove Markdown links [text](url) -> text
     # We do this first so we don't break the brackets/parentheses with other cleans
-    text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', text)
+    text = _LINK.sub(r'\1', text)
 
     # 2. Remove Markdown images ![alt](url) -> ''
-    text = re.sub(r'!\[[^\]]*\]\([^\)]+\)', '', text)
+    text = _IMAGE.sub('', text)
 
     # 3. Remove header markers (#, ##, ###) at start of lines
-    # (?m)^ means multiline mode start of line
-    text = re.sub(r'(?m)^#+\s*', '', text)
+    text = _HEADER.sub('', text)
 
     # 4. Remove bold/italic markers (*, **, _, __)
-    # We just strip the logic chars. 
     # Note: simple stripping of * and _ handles both *italic* and **bold**
-    # We replace with empty string.
-    text = re.sub(r'[\*_`]', '', text)
+    text = _EMPHASIS.sub('', text)
 
     # 5. Remove horizontal rules (---, ***, ___)
-    text = re.sub(r'(?m)^[-*_]{3,}\s*$', '', text)
+    text = _RULE.sub('', text)
 
     # 6. Handle tables: replace | with , to make it read better (pause instead of "pipe")
     # Also ignore the separator row like | --- | --- |
-    text = re.sub(r'(?m)^\|?\s*[-: ]+\|\s*[-: \|]*$', '', text) # Remove separator lines
+    text = _SEPARATOR.sub('', text)
     text = text.replace('|', ',')
 
     # 7. Remove other common markdown oddities or special chars
     # ~ (strikethrough)
     text = text.replace('~', '')
-    
+
     # 8. Collapse whitespace
     # Replace multiple spaces with one
-    text = re.sub(r' +', ' ', text)
+    text = _SPACES.sub(' ', text)
     # Replace 3+ newlines with 2
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = _BLANK_LINES.sub('\n\n', text)
+    return text
+
+
+# A line that rules 3, 5 or 6 might rewrite: a header, a rule ("---" once the
+# emphasis markers are gone) or a table separator row. Deliberately generous.
+_STRUCTURAL_LINE = r"#|[*_`]*-[*_`]*-[*_`]*-|(?:[-:|*_`]|[^\S\n])*\|(?:[-:|*_`]|[^\S\n])*$"
+
+# One match per token: a run of ordinary text (single spaces, and single line
+# breaks before a letter or digit, included), then the special token ending it.
+# The ordinary run is copied through unchanged.
+_TOKEN = re.compile(
+    r"(?P<text>[^\]\n |*_`~]*(?:(?: (?![ *_`~])|\n(?=[^\W_])|\](?!\())[^\]\n |*_`~]*)*)"
+    r"(?:(?P<nl>\n(?:[*_`~]*\n)*)(?P<structural>(?=" + _STRUCTURAL_LINE + r"))?"
+    r"|(?P<space> (?:[*_`~]* )*)"
+    r"|(?P<pipe>\|)"
+    r"|(?P<link>\]\()"
+    r"|[*_`~]+"
+    r"|\Z)",
+    re.M,
+)
+_FIRST_LINE = re.compile(_STRUCTURAL_LINE, re.M)
+# Markdown-dense segments are cheaper to clean with the passes than piecewise
+_MAX_FALLBACKS = 8
+
+
+class _NeedsPasses(Exception):
+    """A link, header, rule or separator row at offset `args[0]`, in the token starting at `args[1]`."""
+
+
+def _replace(m: "re.Match[str]") -> str:
+    kind = m.lastgroup
+    if kind == "text":  # emphasis markers, strikethrough or end of input
+        return m.group("text")
+    if kind == "nl" or kind == "structural":
+        if m.group("structural") is not None:
+            raise _NeedsPasses(m.start("nl"), m.start())
+        n = m.group("nl").count("\n")
+        return m.group("text") + ("\n\n" if n >= 3 else "\n" * n)
+    if kind == "space":
+        return m.group("text") + " "
+    if kind == "pipe":
+        return m.group("text") + ","
+    raise _NeedsPasses(m.start("link"), m.start())
+
+
+def _can_cut(segment: str) -> bool:
+    """True if no link or image in `segment` is still open at its end."""
+    for s in (segment, _LINK.sub(r'\1', segment)) if "](" in segment else (segment,):
+        if s.rfind("[") > s.rfind("]") or s.rfind("](") > s.rfind(")"):
+            return False
+    return True
+
 
-    return text.strip()
+def _is_cut(text: str, start: int, p: int) -> bool:
+    """True if `text` can be cut at the newline `p`, given a cut at `start`.
+
+    Cuts fall on a newline between two letters/digits with no link open, so no
+    rule can match across the cut and each side cleans independently.
+    """
+    return text[p - 1].isalnum() and text[p + 1].isalnum() and _can_cut(text[start:p])
+
+
+def _cut_before(text: str, start: int, end: int) -> int:
+    """The last cut in `text[start:end]`, or -1."""
+    p = text.rfind("\n", start + 1, min(end, len(text) - 1))
+    while p > start:
+        if _is_cut(text, start, p):
+            return p
+        p = text.rfind("\n", start + 1, p)
+    return -1
+
+
+def _cut_after(text: str, start: int, pos: int) -> int:
+    """The first cut after `pos` (measuring link balance from the cut at `start`), or -1."""
+    p = text.find("\n", pos)
+    while 0 < p < len(text) - 1:
+        if _is_cut(text, start, p):
+            return p
+        p = text.find("\n", p + 1)
+    return -1
+
+
+def _clean_segment(text: str) -> str:
+    """Clean `text` (no final strip) in one pass.
+
+    Without links, headers, rules or separator rows the remaining rules only
+    delete `*_`~`, turn `|` into `,` and collapse space and newline runs
+    (counting across deleted characters), which the tokenizer does as it goes.
+    Around a structural token, the text between the nearest cuts on either
+    side goes through `_clean_passes` instead, then tokenizing resumes; after
+    `_MAX_FALLBACKS` of those the rest of the segment is left to the passes.
+    """
+    try:
+        if not _FIRST_LINE.match(text):
+            return _TOKEN.sub(_replace, text)
+    except _NeedsPasses:
+        pass
+    out: List[str] = []
+    spans: List[Tuple[int, int]] = []  # input range each piece of `out` came from
+    pos = fallbacks = 0
+    at = 0 if _FIRST_LINE.match(text) else -1
+    while True:
+        if at < 0:
+            for m in _TOKEN.finditer(text, pos):
+                try:
+                    out.append(_replace(m))
+                except _NeedsPasses as e:
+                    at, start = e.args
+                    if start < at:  # the token's ordinary text run
+                        out.append(text[start:at])
+                        spans.append((start, at))
+                    break
+                spans.append(m.span())
+            else:
+                return "".join(out)
+        before = max(_cut_before(text, pos, at), pos)
+        while spans and spans[-1][0] >= before:
+            spans.pop()
+            out.pop()
+        if spans and spans[-1][1] > before:
+            # cuts fall inside ordinary text runs, which are copied verbatim
+            out[-1] = text[spans[-1][0]:before]
+        fallbacks += 1
+        after = _cut_after(text, before, at + 1) if fallbacks < _MAX_FALLBACKS else -1
+        if after < 0:
+            out.append(_clean_passes(text[before:]))
+            return "".join(out)
+        out.append(_clean_passes(text[before:after]))
+        spans.append((before, after))
+        pos, at = after, -1
+
+
+def iter_clean_markdown(pages: Iterable[str], segment_chars: int = SEGMENT_CHARS) -> Iterator[str]:
+    """Clean a stream of texts (e.g. extracted pages) as if they were one string.
+
+    Yields pieces whose concatenation equals `clean_markdown("".join(pages))`,
+    holding only about `segment_chars` of uncleaned text at a time (more only
+    if the input has no line break between two words for that long; see `_is_cut`).
+    """
+    buf = ""
+    first = True
+    for page in pages:
+        buf += page
+        start = 0
+        while len(buf) - start > segment_chars:
+            cut = _cut_before(buf, start, start + segment_chars)
+            if cut < 0:
+                cut = _cut_after(buf, start, start + segment_chars)
+            if cut < 0:
+                break
+            out = _clean_segment(buf[start:cut])
+            yield out.lstrip() if first else out
+            first = False
+            start = cut
+        buf = buf[start:]
+    out = _clean_segment(buf) if buf else ""
+    out = out.strip() if first else out.rstrip()
+    if out:
+        yield out
+
+
+def clean_markdown(text: str) -> str:
+    """Remove markdown syntax and special characters that degrade TTS quality."""
+    if not text:
+        return ""
+    if len(text) <= SEGMENT_CHARS:
+        return _clean_segment(text).strip()
+    return "".join(iter_clean_markdown((text,)))
@@ -0,0 +1,184 @@
+"""Content-addressed on-disk cache for synthesized TTS audio."""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional
+
+import regex as re
+
+from audiobooker.tts_providers import TTSProvider, WrappedTTSProvider, provider_name
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different chunks share a cache entry."""
+    return _WS_RE.sub(" ", text).strip()
+
+
+def cache_key(text: str, voice: str, rate: str, provider: str) -> str:
+    """Return the hex digest identifying the audio for this synthesis request."""
+    h = hashlib.sha256()
+    for part in (provider, voice, rate, normalize_text(text)):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    bytes_served: int = 0
+    bytes_stored: int = 0
+    synth_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def seconds_saved(self) -> float:
+        """Estimated TTS time avoided, using the mean latency of misses."""
+        if not self.misses:
+            return 0.0
+        return self.hits * (self.synth_seconds / self.misses)
+
+    def as_dict(self) -> dict:
+        d = asdict(self)
+        d["hit_rate"] = round(self.hit_rate, 4)
+        d["seconds_saved"] = round(self.seconds_saved, 3)
+        return d
+
+
+class TTSCache:
+    """Sharded directory of encoded audio with a byte budget and LRU eviction.
+
+    Entries live at `<root>/<key[:2]>/<key>.mp3`. Writes go to a temp file in the
+    same shard and are published with `os.replace`, so concurrent jobs (or
+    processes) sharing the directory never observe partial files. Recency is
+    tracked with the file mtime, which is bumped on every hit.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 2 * 1024**3) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._size = sum(p.stat().st_size for p in self._entries())
+
+    def _entries(self):
+        return self.root.glob("??/*.mp3")
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.mp3"
+
+    def get(self, key: str, out_path: str) -> bool:
+        """Copy the cached audio for `key` to `out_path`; return False on a miss."""
+        src = self.path_for(key)
+        try:
+            shutil.copyfile(src, out_path)
+            os.utime(src)
+        except FileNotFoundError:
+            with self._lock:
+                self.stats.misses += 1
+            return False
+        with self._lock:
+            self.stats.hits += 1
+            self.stats.bytes_served += os.path.getsize(out_path)
+        return True
+
+    def put(self, key: str, audio_path: str, synth_seconds: float = 0.0) -> None:
+        """Atomically store the audio file at `audio_path` under `key`."""
+        dest = self.path_for(key)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=dest.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out, open(audio_path, "rb") as src:
+                shutil.copyfileobj(src, out)
+            try:
+                replaced = dest.stat().st_size  # an entry for the same key is overwritten, not added
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp, dest)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+        size = dest.stat().st_size
+        with self._lock:
+            self._size += size - replaced
+            self.stats.bytes_stored += size
+            self.stats.synth_seconds += synth_seconds
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits its budget."""
+        entries = []
+        for p in self._entries():
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        with self._lock:
+            self._size = total
+            self.stats.evictions += removed
+        return removed
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+
+class CachedTTSProvider(WrappedTTSProvider):
+    """Wrap any `TTSProvider` so repeated chunks are served from a `TTSCache`."""
+
+    def __init__(self, inner: TTSProvider, cache: TTSCache) -> None:
+        super().__init__(inner)
+        self.cache = cache
+
+    def _key(self, text: str, voice: Optional[str]) -> str:
+        voice = voice or getattr(self.inner, "voice", "")
+        rate = getattr(self.inner, "rate", "")
+        return cache_key(text, voice, rate, provider_name(self.inner))
+
+    def synthesize(self, text: str, out_path: str, voice: Optional[str] = None) -> None:
+        key = self._key(text, voice)
+        if self.cache.get(key, out_path):
+            return
+        t0 = time.perf_counter()
+        self.inner.synthesize(text, out_path, voice=voice)
+        self.cache.put(key, out_path, time.perf_counter() - t0)
+
+    async def synthesize_async(self, text: str, out_path: str, voice: Optional[str] = None) -> None:
+        key = self._key(text, voice)
+        if self.cache.get(key, out_path):
+            return
+        t0 = time.perf_counter()
+        await self.inner.synthesize_async(text, out_path, voice=voice)
+        self.cache.put(key, out_path, time.perf_counter() - t0)
@@ -0,0 +1,239 @@
+"""Retries, adaptive concurrency and a circuit breaker around any TTS provider.
+
+The in-flight limit follows AIMD (additive increase, multiplicative decrease),
+as TCP congestion control does: each success with normal latency adds about
+one slot per round of requests, and a failure or a request much slower than
+usual halves the limit. A cut only counts requests started after the
+previous cut, so one burst of throttling halves the limit once, not once per
+failed request. Latency is compared per character, since chunks vary in
+length. Failed requests are retried after a jittered exponential backoff.
+After too many failures in a row the circuit opens: requests stop reaching
+the service until a cooldown passes, then one probe decides whether it closes.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple, Type
+
+from audiobooker import metrics
+from audiobooker.tts_providers import SharedLimit, TTSProvider, WrappedTTSProvider, provider_name
+
+# Errors that a retry cannot fix
+FATAL_ERRORS: Tuple[Type[BaseException], ...] = (ValueError, TypeError, NotImplementedError)
+# A request costs about as much as this many characters of text, whatever its length
+OVERHEAD_CHARS = 300
+# How often requests check whether the half-open probe has settled the circuit
+_PROBE_POLL_SECONDS = 0.05
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when the circuit breaker stops a request from reaching a failing TTS service."""
+
+
+@dataclass
+class TTSControlStats:
+    successes: int = 0
+    failures: int = 0
+    retries: int = 0
+    timeouts: int = 0
+    increases: int = 0
+    decreases: int = 0
+    circuit_opens: int = 0
+    limit_low: int = 0
+    limit_high: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)  # failures by exception type
+
+    def as_dict(self) -> dict:
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "circuit_opens": self.circuit_opens,
+            "limit_low": self.limit_low,
+            "limit_high": self.limit_high,
+            "errors": dict(self.errors),
+        }
+
+
+class ResilientTTSProvider(WrappedTTSProvider):
+    """Wrap a `TTSProvider` with retries, an adaptive in-flight limit and a circuit breaker.
+
+    With `adaptive`, the limit moves between `min_limit` and `max_limit`
+    (starting at `initial_limit`); otherwise it stays at `max_limit`. A request
+    is tried up to `retries + 1` times, each attempt cut off after `timeout`
+    seconds if set. `breaker_failures` consecutive failures open the circuit
+    for `breaker_cooldown` seconds. `stats`, `limit` and `state` show what the
+    controller is doing.
+    """
+
+    def __init__(
+        self,
+        inner: TTSProvider,
+        max_limit: int = 8,
+        min_limit: int = 1,
+        initial_limit: Optional[int] = None,
+        adaptive: bool = True,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: Optional[float] = None,
+        latency_tolerance: float = 2.0,
+        decrease_factor: float = 0.5,
+        breaker_failures: int = 10,
+        breaker_cooldown: float = 30.0,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        super().__init__(inner)
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.adaptive = adaptive
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self._rng = rng or random.Random()
+        start = initial_limit if adaptive and initial_limit is not None else self.max_limit
+        self._limit = float(min(self.max_limit, max(self.min_limit, start)))
+        self._gate = SharedLimit(int(self._limit))
+        self.stats = TTSControlStats(limit_low=int(self._limit), limit_high=int(self._limit))
+        self._lock = threading.Lock()
+        self._baseline: Optional[float] = None  # lowest recent seconds per character
+        self._last_decrease = 0.0
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._probing = False
+        self._provider = provider_name(inner)
+
+    @property
+    def limit(self) -> int:
+        return self._gate.limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._gate.in_flight
+
+    @property
+    def state(self) -> str:
+        if self._probing:
+            return "half-open"
+        return "open" if time.monotonic() < self._open_until else "closed"
+
+    def synthesize(self, text: str, out_path: str, voice: Optional[str] = None) -> None:
+        asyncio.run(self.synthesize_async(text, out_path, voice=voice))
+
+    async def synthesize_async(self, text: str, out_path: str, voice: Optional[str] = None) -> None:
+        error: Optional[BaseException] = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                with self._lock:
+                    self.stats.retries += 1
+                metrics.TTS_RETRIES.inc(provider=self._provider)
+                await asyncio.sleep(self._backoff_seconds(attempt))
+            admit = self._admit()
+            while admit == "probing":  # another request is testing the service; its outcome decides
+                await asyncio.sleep(_PROBE_POLL_SECONDS)
+                admit = self._admit()
+            if admit == "open":
+                error = CircuitOpenError(f"TTS circuit open after {self._consecutive_failures} failures in a row")
+                continue
+            probe = admit == "probe"
+            try:
+                async with self._gate:
+                    started = time.monotonic()
+                    try:
+                        if self.timeout:
+                            await asyncio.wait_for(self.inner.synthesize_async(text, out_path, voice=voice),
+                                                   self.timeout)
+                        else:
+                            await self.inner.synthesize_async(text, out_path, voice=voice)
+                    except FATAL_ERRORS:
+                        raise
+                    except Exception as e:
+                        error = e
+                        self._failed(e, started, probe)
+                        continue
+                    self._succeeded(time.monotonic() - started, len(text), started)
+                    return
+            finally:
+                if probe:
+                    with self._lock:
+                        self._probing = False
+        raise error
+
+    def _backoff_seconds(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, backoff * 2^(attempt-1)], capped; never shorter than an open circuit's wait."""
+        delay = self._rng.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+        return max(delay, self._open_until - time.monotonic())
+
+    def _admit(self) -> str:
+        """Whether a new attempt may go ("go"), is the half-open "probe", or must wait ("open", "probing")."""
+        with self._lock:
+            if time.monotonic() < self._open_until:
+                return "open"
+            if self._consecutive_failures >= self.breaker_failures:
+                if self._probing:
+                    return "probing"
+                self._probing = True  # cooldown over: let one request test the service
+                return "probe"
+            return "go"
+
+    def _set_limit(self, limit: float) -> None:
+        self._limit = min(float(self.max_limit), max(float(self.min_limit), limit))
+        n = int(self._limit)
+        if n != self._gate.limit:
+            self._gate.set_limit(n)
+            self.stats.limit_low = min(self.stats.limit_low, n)
+            self.stats.limit_high = max(self.stats.limit_high, n)
+
+    def _decrease(self, started: float) -> None:
+        if started < self._last_decrease:
+            return  # started before the last cut; that cut already accounted for it
+        self._last_decrease = time.monotonic()
+        self.stats.decreases += 1
+        self._set_limit(self._limit * self.decrease_factor)
+
+    def _succeeded(self, seconds: float, chars: int, started: float) -> None:
+        with self._lock:
+            self.stats.successes += 1
+            self._consecutive_failures = 0
+            if not self.adaptive:
+                return
+            per_char = seconds / (chars + OVERHEAD_CHARS)
+            # The baseline drifts up slowly, so a service that got slower for good stops counting as congested
+            self._baseline = per_char if self._baseline is None else min(per_char, self._baseline * 1.01)
+            if per_char > self.latency_tolerance * self._baseline:
+                self._decrease(started)
+            elif self._limit < self.max_limit:
+                self.stats.increases += 1
+                self._set_limit(self._limit + 1 / self._limit)
+
+    def _failed(self, error: BaseException, started: float, probe: bool) -> None:
+        with self._lock:
+            self.stats.failures += 1
+            name = type(error).__name__
+            self.stats.errors[name] = self.stats.errors.get(name, 0) + 1
+            if isinstance(error, asyncio.TimeoutError):
+                self.stats.timeouts += 1
+            self._consecutive_failures += 1
+            if probe or self._consecutive_failures == self.breaker_failures:
+                self._open_until = time.monotonic() + self.breaker_cooldown
+                self.stats.circuit_opens += 1
+            if self.adaptive:
+                self._decrease(started)
+        metrics.TTS_FAILURES.inc(provider=self._provider, error=name)
+
+    def summary(self) -> str:
+        st = self.stats
+        limits = f"limit {self.limit} (ranged {st.limit_low}-{st.limit_high}), " if self.adaptive else ""
+        return (f"TTS control: {limits}{st.successes} requests ok, {st.failures} failed, {st.retries} retries, "
+                f"{st.circuit_opens} circuit opens")
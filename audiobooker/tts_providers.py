@@ -1,13 +1,24 @@
 import asyncio
 """TTS provider interface and Edge TTS implementation."""
+import random
+import threading
+import time
+import wave
 from abc import ABC, abstractmethod
-from typing import Optional, Any, cast
+from collections import deque
+from pathlib import Path
+from typing import Optional, Any, Callable, Dict, Iterable, Tuple, cast
+
+from audiobooker import metrics
+from audiobooker.mp3_concat import write_silence
 
 try:
     from edge_tts import Communicate as _Communicate
 except ImportError:
     _Communicate = None
 
+DEFAULT_VOICE = "en-GB-RyanNeural"
+
 # For type-checking: allow calling Communicate via cast when it exists
 CommunicateCallable: Any = _Communicate
 
@@ -20,11 +31,53 @@ class TTSProvider(ABC):
         """Synthesize `text` to a file at `out_path` using optional voice id."""
         raise NotImplementedError
 
+    async def synthesize_async(self, text: str, out_path: str, voice: Optional[str] = None) -> None:
+        """Async variant of `synthesize`; by default runs the blocking call in a worker thread."""
+        await asyncio.to_thread(self.synthesize, text, out_path, voice)
+
+    async def synthesize_many_async(
+        self,
+        jobs: Iterable[Tuple[str, str]],
+        voice: Optional[str] = None,
+        concurrency: int = 4,
+        on_done: Optional[Callable[[str], None]] = None,
+    ) -> list[str]:
+        """Synthesize `(text, out_path)` jobs with at most `concurrency` in flight.
+
+        Returns the output paths in the same order as `jobs`. `on_done(out_path)`
+        is called as each job finishes; an exception from it aborts the batch.
+        """
+        sem = asyncio.Semaphore(max(1, concurrency))
+        provider = provider_name(self)
+
+        async def _one(text: str, out_path: str) -> str:
+            async with sem:
+                t0 = time.perf_counter()
+                await self.synthesize_async(text, out_path, voice=voice)
+                metrics.TTS_REQUEST_SECONDS.observe(time.perf_counter() - t0, provider=provider)
+            if on_done is not None:
+                on_done(out_path)
+            return out_path
+
+        return list(await asyncio.gather(*(_one(t, p) for t, p in jobs)))
+
+    def synthesize_many(
+        self,
+        jobs: Iterable[Tuple[str, str]],
+        voice: Optional[str] = None,
+        concurrency: int = 4,
+        on_done: Optional[Callable[[str], None]] = None,
+    ) -> list[str]:
+        """Blocking wrapper around `synthesize_many_async` using a single event loop."""
+        return asyncio.run(
+            self.synthesize_many_async(jobs, voice=voice, concurrency=concurrency, on_done=on_done)
+        )
+
 
 class EdgeTTSProvider(TTSProvider):
     """Edge TTS implementation using the `edge-tts` package."""
 
-    def __init__(self, voice: str = "en-GB-RyanNeural", rate: str = "0%") -> None:
+    def __init__(self, voice: str = DEFAULT_VOICE, rate: str = "0%") -> None:
         if _Communicate is None:
             raise RuntimeError("edge-tts not installed")
         self.voice = voice
@@ -32,10 +85,257 @@ class EdgeTTSProvider(TTSProvider):
 
     def synthesize(self, text: str, out_path: str, voice: Optional[str] = None) -> None:
         """Synthesize `text` into `out_path` using the configured voice."""
+        asyncio.run(self.synthesize_async(text, out_path, voice=voice))
+
+    async def synthesize_async(self, text: str, out_path: str, voice: Optional[str] = None) -> None:
+        """Stream `text` from Edge TTS into `out_path` on the running event loop."""
         voice = voice or self.voice
+        com = cast(Any, CommunicateCallable)(text, voice=voice)
+        await com.save(out_path)
+
+
+class StubTTSProvider(TTSProvider):
+    """Offline provider that mimics a remote TTS round-trip for tests and benchmarks.
+
+    Each call waits `latency` seconds and writes a small placeholder file.
+    """
+
+    def __init__(self, voice: str = "stub", latency: float = 0.0) -> None:
+        self.voice = voice
+        self.latency = latency
+
+    def _write(self, text: str, out_path: str) -> None:
+        p = Path(out_path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(b"STUB_MP3_CONTENT" + str(len(text)).encode())
+
+    def synthesize(self, text: str, out_path: str, voice: Optional[str] = None) -> None:
+        """Sleep for `latency` seconds, then write the placeholder file."""
+        if self.latency:
+            time.sleep(self.latency)
+        self._write(text, out_path)
+
+    async def synthesize_async(self, text: str, out_path: str, voice: Optional[str] = None) -> None:
+        """Non-blocking variant so many stub calls can overlap on one loop."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self._write(text, out_path)
+
+
+class SyntheticTTSProvider(TTSProvider):
+    """Offline provider that writes real audio deterministically, for tests and reproducible benchmarks.
+
+    Each chunk becomes silence lasting `len(text) / chars_per_sec` seconds: an
+    MP3 built frame by frame (the format Edge TTS returns), or 16-bit PCM WAV
+    when `out_path` ends in `.wav`. The same text always gives the same bytes.
+    Each call first waits `latency` seconds, like a remote round-trip.
+    """
+
+    def __init__(self, voice: str = "synthetic", chars_per_sec: float = 15.0, latency: float = 0.0,
+                 sample_rate: int = 24000) -> None:
+        self.voice = voice
+        self.chars_per_sec = chars_per_sec
+        self.latency = latency
+        self.sample_rate = sample_rate
+
+    def _write(self, text: str, out_path: str) -> None:
+        seconds = len(text) / self.chars_per_sec
+        if out_path.lower().endswith(".wav"):
+            with wave.open(out_path, "wb") as w:
+                w.setnchannels(1)
+                w.setsampwidth(2)
+                w.setframerate(self.sample_rate)
+                w.writeframes(bytes(2 * round(seconds * self.sample_rate)))
+        else:
+            write_silence(out_path, seconds, sample_rate=self.sample_rate)
+
+    def synthesize(self, text: str, out_path: str, voice: Optional[str] = None) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        self._write(text, out_path)
+
+    async def synthesize_async(self, text: str, out_path: str, voice: Optional[str] = None) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self._write(text, out_path)
+
+
+class ThrottledError(RuntimeError):
+    """Raised by `FaultyTTSProvider` when it is over capacity, like an HTTP 429 from a real service."""
+
+
+class FaultyTTSProvider(StubTTSProvider):
+    """Stub that fails the way a remote service under load does, for testing retries and concurrency control.
+
+    At most `capacity` requests are served at once; the rest are rejected
+    with ThrottledError after a short delay. `capacity` may be changed while
+    running to simulate a throttling episode, and `error_rate` makes that
+    fraction of calls fail at random (seeded, so runs repeat).
+    """
+
+    def __init__(self, voice: str = "stub", latency: float = 0.05, capacity: int = 8,
+                 error_rate: float = 0.0, seed: int = 0) -> None:
+        super().__init__(voice=voice, latency=latency)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.calls = 0
+        self.served = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    async def synthesize_async(self, text: str, out_path: str, voice: Optional[str] = None) -> None:
+        with self._lock:
+            self.calls += 1
+            over = self.in_flight >= self.capacity
+            fail = not over and self._rng.random() < self.error_rate
+            if over:
+                self.rejected += 1
+            else:
+                self.in_flight += 1
+        if over:
+            await asyncio.sleep(self.latency / 10)
+            raise ThrottledError(f"over capacity ({self.capacity} requests in flight)")
+        try:
+            await super().synthesize_async(text, out_path, voice=voice)
+            if fail:
+                raise ConnectionError("simulated connection reset")
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        with self._lock:
+            self.served += 1
+
+    def synthesize(self, text: str, out_path: str, voice: Optional[str] = None) -> None:
+        asyncio.run(self.synthesize_async(text, out_path, voice=voice))
+
+
+class SharedLimit:
+    """Cap on requests in flight shared by event loops in different threads.
+
+    `asyncio.Semaphore` only works within one loop; each generator runs its
+    own loop, so books generated side by side share this instead. Use it as
+    `async with limit:`. Waiters are served in arrival order. `set_limit`
+    resizes it while in use; requests already in flight are not interrupted.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = max(1, limit)
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self._waiters: deque = deque()
+
+    async def __aenter__(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.in_flight < self.limit and not self._waiters:
+                self._take()
+                return
+            fut = loop.create_future()
+            self._waiters.append((loop, fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, fut))
+                    queued = True
+                except ValueError:
+                    queued = False
+            if not queued and fut.done() and not fut.cancelled():
+                self._release()  # the slot was handed over just as we were cancelled
+            raise
+
+    async def __aexit__(self, *exc) -> None:
+        self._release()
+
+    def set_limit(self, limit: int) -> None:
+        with self._lock:
+            self.limit = max(1, limit)
+            self._dispatch()
+
+    def _take(self) -> None:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+
+    def _release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiters (caller holds the lock)."""
+        while self._waiters and self.in_flight < self.limit:
+            loop, fut = self._waiters.popleft()
+            self._take()
+            try:
+                loop.call_soon_threadsafe(self._hand_over, fut)
+            except RuntimeError:  # that waiter's loop has closed
+                self.in_flight -= 1
+
+    def _hand_over(self, fut: asyncio.Future) -> None:
+        if fut.done():  # cancelled meanwhile: pass the slot on
+            self._release()
+        else:
+            fut.set_result(None)
+
+
+class WrappedTTSProvider(TTSProvider):
+    """Base for providers that add behaviour around another provider's requests."""
+
+    def __init__(self, inner: TTSProvider) -> None:
+        self.inner = inner
+
+    def __getattr__(self, name: str):
+        # voice, rate, ... of the wrapped provider
+        return getattr(self.__dict__["inner"], name)
+
+
+class LimitedTTSProvider(WrappedTTSProvider):
+    """Wrap a `TTSProvider` so its requests count against a `SharedLimit`."""
+
+    def __init__(self, inner: TTSProvider, limit: SharedLimit) -> None:
+        super().__init__(inner)
+        self.limit = limit
+
+    def synthesize(self, text: str, out_path: str, voice: Optional[str] = None) -> None:
+        asyncio.run(self.synthesize_async(text, out_path, voice=voice))
+
+    async def synthesize_async(self, text: str, out_path: str, voice: Optional[str] = None) -> None:
+        async with self.limit:
+            await self.inner.synthesize_async(text, out_path, voice=voice)
+
+
+def provider_name(tts: TTSProvider) -> str:
+    """Class name of the provider that does the synthesis, looking through wrappers."""
+    while isinstance(tts, WrappedTTSProvider):
+        tts = tts.inner
+    return type(tts).__name__
+
+
+def _local_provider(**options) -> TTSProvider:
+    from audiobooker.local_tts import LocalTTSProvider  # it imports this module
+
+    return LocalTTSProvider(**options)
+
+
+# Providers selectable by name (--tts-provider, the web API's tts_provider field)
+TTS_PROVIDERS: Dict[str, Callable[..., TTSProvider]] = {
+    "edge": EdgeTTSProvider,
+    "local": _local_provider,
+    "synthetic": SyntheticTTSProvider,
+}
+
 
-        async def _s() -> None:
-            com = cast(Any, CommunicateCallable)(text, voice=voice)
-            await com.save(out_path)
+def make_tts_provider(name: str, voice: Optional[str] = None, **options) -> TTSProvider:
+    """Create the provider registered as `name`, with its default voice unless `voice` is given.
 
-        asyncio.run(_s())
+    `options` go to the provider's constructor (e.g. `engine` and `workers` for "local").
+    """
+    if name not in TTS_PROVIDERS:
+        raise ValueError(f"Unknown TTS provider {name!r}; choose from {list(TTS_PROVIDERS)}")
+    if voice:
+        options["voice"] = voice
+    return TTS_PROVIDERS[name](**options)
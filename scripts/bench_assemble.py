@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""Benchmark frame-level MP3 concatenation against the pydub decode/re-encode path."""
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from pydub import AudioSegment
+from pydub.utils import which
+
+from audiobooker.mp3_concat import concat_mp3, probe, write_silence
+
+
+def measure(fn):
+    """Run `fn` twice: once for wall time, once under tracemalloc for peak MB."""
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def pydub_concat(parts, out_file):
+    combined = None
+    for p in parts:
+        seg = AudioSegment.from_file(p)
+        combined = seg if combined is None else (combined + seg)
+    combined.export(out_file, format="mp3")
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--hours", type=float, default=3.0, help="total audio duration to assemble")
+    p.add_argument("--parts", type=int, default=60, help="number of input files")
+    p.add_argument("--skip-pydub", action="store_true", help="only time the frame-level path")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        per_part = args.hours * 3600 / args.parts
+        parts = [write_silence(str(Path(d) / f"part{k:04d}.mp3"), per_part) for k in range(args.parts)]
+        in_mb = sum(Path(x).stat().st_size for x in parts) / 1e6
+        print(f"{args.parts} parts, {args.hours:.1f} h, {in_mb:.1f} MB of MP3 input")
+
+        out = str(Path(d) / "frames.mp3")
+        elapsed, peak = measure(lambda: concat_mp3(parts, out))
+        print(f"frame concat : {elapsed:7.2f}s  peak {peak:8.1f} MB  -> {probe(out).duration / 3600:.2f} h")
+
+        if args.skip_pydub:
+            return
+        if not which("ffmpeg"):
+            print("pydub        : skipped (ffmpeg not found on PATH)")
+            return
+        out = str(Path(d) / "pydub.mp3")
+        elapsed, peak = measure(lambda: pydub_concat(parts, out))
+        print(f"pydub decode : {elapsed:7.2f}s  peak {peak:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""Compare assembling a book as MP3 parts with single-pass M4B/Opus encoding: encode CPU time and output size."""
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: child CPU time of the pydub chain is not counted
+    resource = None
+
+from audiobooker import encoder
+from audiobooker.generator import AudiobookGenerator
+from audiobooker.mp3_concat import probe
+from audiobooker.tts_providers import StubTTSProvider
+
+
+def make_chunk(path: str, seconds: float, k: int) -> str:
+    """Speech-like test audio: a wobbling tone over noise, 24 kHz mono 48 kbps like Edge TTS output."""
+    src = f"sine=frequency={180 + 7 * (k % 13)}:sample_rate=24000:duration={seconds}"
+    noise = f"anoisesrc=color=pink:amplitude=0.2:sample_rate=24000:duration={seconds}"
+    subprocess.run(["ffmpeg", "-v", "error", "-y", "-f", "lavfi", "-i", src, "-f", "lavfi", "-i", noise,
+                    "-filter_complex", "amix=inputs=2,tremolo=f=4:d=0.6", "-ac", "1", "-b:a", "48k", path],
+                   check=True)
+    return path
+
+
+def cpu_now() -> float:
+    """CPU time of this process plus its finished children (ffmpeg runs spawned by pydub)."""
+    t = time.process_time()
+    if resource is not None:
+        r = resource.getrusage(resource.RUSAGE_CHILDREN)
+        t += r.ru_utime + r.ru_stime
+    return t
+
+
+def mp3_chain(gen: AudiobookGenerator, chapters, out_dir: Path, decode: bool) -> float:
+    """The MP3 path of `process()`: one file per chapter, then the part; returns CPU seconds."""
+    assemble = gen._assemble_decoded if decode else gen.assemble_audio
+    cpu0 = cpu_now()
+    chapter_files = []
+    for j, (_, files) in enumerate(chapters):
+        chapter_files.append(assemble(files, str(out_dir / f"ch{j:02d}_full.mp3")))
+    assemble(chapter_files, str(out_dir / "part.mp3"))
+    return cpu_now() - cpu0
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--minutes", type=float, default=20.0, help="book length")
+    p.add_argument("--chapters", type=int, default=10)
+    p.add_argument("--chunk-seconds", type=float, default=60.0, help="length of one synthesized chunk")
+    p.add_argument("--skip-reencode", action="store_true", help="skip the pydub decode/re-encode MP3 chain")
+    args = p.parse_args()
+    if not encoder.available():
+        print("skipped: ffmpeg (and ffmpeg-python) are needed to make test audio and to encode M4B/Opus")
+        return
+
+    with tempfile.TemporaryDirectory() as d:
+        work = Path(d)
+        n_chunks = max(args.chapters, round(args.minutes * 60 / args.chunk_seconds))
+        per_chapter = [n_chunks // args.chapters + (c < n_chunks % args.chapters) for c in range(args.chapters)]
+        chapters, k = [], 0
+        for c, count in enumerate(per_chapter):
+            files = []
+            for _ in range(count):
+                files.append(make_chunk(str(work / f"chunk{k:04d}.mp3"), args.chunk_seconds, k))
+                k += 1
+            chapters.append((f"Chapter {c + 1}", files))
+        audio = sum(probe(f).duration for _, files in chapters for f in files)
+        in_mb = sum(os.path.getsize(f) for _, files in chapters for f in files) / 1e6
+        print(f"{k} chunks in {args.chapters} chapters, {audio / 60:.1f} min, {in_mb:.1f} MB of chunk MP3s\n")
+        print(f"{'output':<22} {'CPU s':>7} {'wall s':>7} {'MB':>7} {'MB/hour':>8}  encodes")
+
+        def row(name, cpu, wall, path, encodes):
+            mb = os.path.getsize(path) / 1e6
+            print(f"{name:<22} {cpu:7.2f} {wall:7.2f} {mb:7.2f} {mb * 3600 / audio:8.1f}  {encodes}")
+
+        gen = AudiobookGenerator(output_dir=str(work / "gen"), use_openclaw=False, play_vlc=False,
+                                 tts_provider=StubTTSProvider())  # only assembly is used
+        chains = [("mp3 (frame concat)", False, "0 (frames copied)")]
+        if args.skip_reencode:
+            pass
+        elif not shutil.which("ffprobe"):
+            print("mp3 (decode/re-encode): skipped (pydub needs ffprobe on PATH)")
+        else:
+            chains.append(("mp3 (decode/re-encode)", True, "2 (chapter + part)"))
+        for name, decode, encodes in chains:
+            out = work / ("reencode" if decode else "frames")
+            out.mkdir()
+            t0 = time.perf_counter()
+            cpu = mp3_chain(gen, chapters, out, decode)
+            row(name, cpu, time.perf_counter() - t0, out / "part.mp3", encodes)
+
+        for fmt in encoder.ENCODINGS:
+            out = work / f"book.{fmt}"
+            st = encoder.encode_chapters(chapters, str(out), fmt, title="Benchmark")
+            row(f"{fmt} (single encode)", st.cpu_seconds, st.wall_seconds, out, "1, with chapter markers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""Benchmark buffered, streaming and process-parallel page extraction.
+
+Each mode runs in a fresh interpreter so peak RSS is measured independently.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from make_sample_pdf import make_book_pdf
+
+MODES = ("buffered", "stream", "parallel")
+
+
+def mode_kwargs(mode: str, workers: int) -> dict:
+    if mode == "stream":
+        return {"stream": True}
+    if mode == "parallel":
+        return {"workers": workers}
+    return {}
+
+
+def run_mode(pdf: str, mode: str, workers: int) -> dict:
+    """Extract every page of `pdf` in `mode` and return timing and memory figures."""
+    from audiobooker.pdf_processor import extract_pages
+
+    t0 = time.perf_counter()
+    first = None
+    pages = 0
+    for _ in extract_pages(pdf, None, **mode_kwargs(mode, workers)):
+        if first is None:
+            first = time.perf_counter() - t0
+        pages += 1
+    elapsed = time.perf_counter() - t0
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        "mode": mode if mode != "parallel" else f"parallel/{workers}",
+        "pages": pages,
+        "seconds": round(elapsed, 2),
+        "pages_per_sec": round(pages / elapsed, 1),
+        "first_page_sec": round(first or 0.0, 2),
+        "peak_rss_mb": round(self_rss / 1024, 1),
+        "peak_worker_rss_mb": round(child_rss / 1024, 1),
+    }
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--pages", type=int, default=300)
+    p.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    p.add_argument("--workers", type=int, default=max(2, os.cpu_count() or 1))
+    p.add_argument("--run-mode", help=argparse.SUPPRESS)
+    p.add_argument("--pdf", help=argparse.SUPPRESS)
+    args = p.parse_args()
+
+    if args.run_mode:
+        print(json.dumps(run_mode(args.pdf, args.run_mode, args.workers)))
+        return
+
+    with tempfile.TemporaryDirectory() as d:
+        pdf = str(make_book_pdf(Path(d) / "book.pdf", args.pages))
+        for mode in args.modes:
+            res = subprocess.run(
+                [sys.executable, __file__, "--run-mode", mode, "--pdf", pdf, "--workers", str(args.workers)],
+                capture_output=True, text=True, check=True,
+            )
+            r = json.loads(res.stdout.strip().splitlines()[-1])
+            print(
+                f"{r['mode']:<11} {r['pages']:5d} pages {r['seconds']:7.2f}s "
+                f"{r['pages_per_sec']:7.1f} pages/s  first page {r['first_page_sec']:5.2f}s  "
+                f"peak RSS {r['peak_rss_mb']:7.1f} MB (workers {r['peak_worker_rss_mb']:.1f} MB)"
+            )
+
+
+if __name__ == "__main__":
+    main()
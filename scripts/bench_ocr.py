@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""Measure OCR throughput on a generated scanned PDF: cold (tesseract) and warm (OCR cache) runs."""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import fitz
+from make_sample_pdf import make_book_pdf, make_scanned_pdf
+
+from audiobooker import ocr
+from audiobooker.pdf_processor import extract_pages
+
+
+def run(pdf: str, **kwargs):
+    t0 = time.perf_counter()
+    pages = list(extract_pages(pdf, None, stream=True, **kwargs))
+    return time.perf_counter() - t0, pages
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--pages", type=int, default=40)
+    p.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    args = p.parse_args()
+    n = args.pages
+
+    with tempfile.TemporaryDirectory() as d:
+        text_pdf = str(make_book_pdf(Path(d) / "text.pdf", n))
+        # interleaved, best of three: the difference is small next to run-to-run noise
+        times = {False: [], True: []}
+        for _ in range(3):
+            for enabled in times:
+                times[enabled].append(run(text_pdf, ocr=enabled)[0])
+        t_off, t_on = min(times[False]), min(times[True])
+        print(f"text PDF, {n} pages: scanned-page detection costs {t_on - t_off:+.3f}s ({t_off:.2f}s -> {t_on:.2f}s)")
+
+        pdf = str(make_scanned_pdf(Path(d) / "scanned.pdf", n))
+        for workers in args.workers:
+            cache_dir = Path(d) / f"ocr{workers}"
+            if ocr.available():
+                elapsed, pages = run(pdf, ocr_workers=workers, ocr_cache_dir=str(cache_dir))
+                chars = sum(len(page.text) for page in pages)
+                print(f"cold  {workers} workers: {n / elapsed:6.2f} pages/s  ({elapsed:.1f}s, {chars} chars)")
+            else:
+                # no tesseract here: stand in the source text, so only the cached path is timed
+                cache = ocr.OCRCache(str(cache_dir))
+                with fitz.open(pdf) as doc, fitz.open(text_pdf) as src:
+                    for page, text_page in zip(doc, src):
+                        cache.put(ocr.page_key(page), text_page.get_text())
+                print(f"cold  {workers} workers: skipped (tesseract is not installed)")
+            elapsed, pages = run(pdf, ocr_workers=workers, ocr_cache_dir=str(cache_dir))
+            assert all(page.ocr for page in pages)
+            print(f"warm  {workers} workers: {n / elapsed:6.2f} pages/s  ({elapsed:.1f}s, from the OCR cache)")
+
+
+if __name__ == "__main__":
+    main()
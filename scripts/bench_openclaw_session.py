@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""Benchmark OpenClaw call latency: persistent agent sessions vs. spawning `openclaw` per call.
+
+A local stub agent stands in for OpenClaw: it sleeps `--startup` seconds when
+launched (Node startup plus gateway handshake) and `--think` seconds per prompt.
+"""
+import argparse
+import os
+import statistics
+import stat
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from audiobooker.agent_pool import AgentPool
+from audiobooker.openclaw_processor import OpenClawProcessor
+
+STUB = r'''
+import json, os, sys, time
+time.sleep(float(os.environ["STUB_STARTUP"]))
+think = float(os.environ["STUB_THINK"])
+if "--message" in sys.argv:
+    time.sleep(think)
+    print(sys.argv[sys.argv.index("--message") + 1][:20])
+    sys.exit(0)
+for line in sys.stdin:
+    req = json.loads(line)
+    if req["type"] == "ping":
+        print(json.dumps({"id": req["id"], "pong": True}), flush=True)
+        continue
+    time.sleep(think)
+    print(json.dumps({"id": req["id"], "reply": req["message"][:20]}), flush=True)
+'''
+
+
+def measure(oc: OpenClawProcessor, calls: int) -> list:
+    latencies = []
+    for k in range(calls):
+        t0 = time.perf_counter()
+        assert oc._call_agent(f"prompt number {k}")
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+
+def report(name: str, latencies: list) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{name:<8} mean {statistics.mean(latencies) * 1000:8.1f} ms  "
+          f"p50 {statistics.median(latencies) * 1000:8.1f} ms  p95 {p95 * 1000:8.1f} ms")
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--calls", type=int, default=20, help="sequential agent calls per mode")
+    p.add_argument("--startup", type=float, default=0.5, help="simulated agent startup seconds")
+    p.add_argument("--think", type=float, default=0.05, help="simulated seconds per prompt")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        exe = Path(d) / "openclaw"
+        exe.write_text(f"#!{sys.executable}\n{STUB}")
+        exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+        os.environ["PATH"] = f"{d}{os.pathsep}{os.environ['PATH']}"
+        os.environ["STUB_STARTUP"] = str(args.startup)
+        os.environ["STUB_THINK"] = str(args.think)
+
+        spawn = measure(OpenClawProcessor(use_sessions=False), args.calls)
+        pool = AgentPool([str(exe), "agent", "--stdio"], size=1)
+        t0 = time.perf_counter()
+        pool.call("warm-up")
+        warm = time.perf_counter() - t0
+        session = measure(OpenClawProcessor(pool=pool), args.calls)
+        pool.close()
+
+    report("spawn", spawn)
+    report("session", session)
+    print(f"session start-up (paid once): {warm * 1000:.1f} ms; "
+          f"speedup x{statistics.mean(spawn) / statistics.mean(session):.1f} per call")
+
+
+if __name__ == "__main__":
+    main()
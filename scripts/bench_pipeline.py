@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""Compare sequential and pipelined generation end to end: wall time, time to first audio, peak memory."""
+import argparse
+import contextlib
+import io
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from make_sample_pdf import make_book_pdf
+
+from audiobooker.generator import AudiobookGenerator
+from audiobooker.tts_providers import SyntheticTTSProvider
+
+
+def run(pdf: Path, work: Path, pipeline: bool, args) -> dict:
+    out = work / ("pipelined" if pipeline else "sequential")
+    src = work / f"{out.name}.pdf"
+    shutil.copy(pdf, src)  # process() moves its input into the output folder
+    first = []
+    gen = AudiobookGenerator(output_dir=str(out), use_openclaw=False, play_vlc=False, pipeline=pipeline,
+                             extract_engine=args.engine, tts_concurrency=args.tts_concurrency,
+                             split_seconds=args.split_seconds, tts_provider=SyntheticTTSProvider(latency=args.latency),
+                             on_segment=lambda index, path: first or first.append(time.perf_counter()))
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parts = gen.process(str(src))
+    seconds = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return {"seconds": seconds, "first_audio": first[0] - t0 if first else None, "peak_mb": peak,
+            "parts": len(parts)}
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--pages", type=int, nargs="+", default=[50, 200])
+    p.add_argument("--latency", type=float, default=0.2, help="simulated seconds per TTS call")
+    p.add_argument("--tts-concurrency", type=int, default=4)
+    p.add_argument("--split-seconds", type=int, default=3600)
+    p.add_argument("--engine", default="fitz", help="extraction engine")
+    args = p.parse_args()
+
+    print(f"{'pages':>6} {'mode':<11} {'total s':>8} {'first audio s':>14} {'peak MB':>8} {'parts':>6}")
+    for pages in args.pages:
+        with tempfile.TemporaryDirectory() as d:
+            work = Path(d)
+            pdf = make_book_pdf(work / "book.pdf", pages, table_every=10, chapter_every=max(1, pages // 10))
+            base = None
+            for pipeline in (False, True):
+                r = run(pdf, work, pipeline, args)
+                base = base or r["seconds"]
+                first = f"{r['first_audio']:.2f}" if r["first_audio"] is not None else "-"
+                print(f"{pages:>6} {'pipelined' if pipeline else 'sequential':<11} {r['seconds']:8.2f} "
+                      f"{first:>14} {r['peak_mb']:8.1f} {r['parts']:>6}  x{base / r['seconds']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
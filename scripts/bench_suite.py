@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+"""Benchmark every pipeline stage on synthetic books and check for regressions.
+
+For each book size (10/100/1000 pages by default) this times page extraction,
+clean_markdown, sentence splitting, chunking, part planning, MP3 assembly and
+an end-to-end `AudiobookGenerator.process` run driven by the synthetic TTS with
+realistic latency. Results (throughput and tracemalloc peak MB) are printed as
+JSON (use `--json FILE` for a copy free of library warnings). With `--baseline`, any stage slower or hungrier than the stored figures
+by more than the tolerance is reported and the run exits with status 1.
+"""
+import argparse
+import contextlib
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from make_sample_pdf import make_book_pdf
+
+from audiobooker.chunker import chunk_text, split_into_sentences
+from audiobooker.generator import AudiobookGenerator
+from audiobooker.mp3_concat import write_silence
+from audiobooker.pdf_processor import extract_pages
+from audiobooker.planner import plan_audio_files
+from audiobooker.text_cleaner import clean_markdown
+from audiobooker.tts_providers import SyntheticTTSProvider
+
+DEFAULT_BASELINE = Path(__file__).with_name("bench_baseline.json")
+
+
+def measure(fn, memory: bool = True, min_seconds: float = 0.2):
+    """Return (seconds per run, peak MB, result).
+
+    Fast stages are repeated until `min_seconds` have passed so timer noise
+    does not trip the regression check; memory is traced in a separate run so
+    tracemalloc's overhead does not skew the timing.
+    """
+    runs = 0
+    t0 = time.perf_counter()
+    while True:
+        result = fn()
+        runs += 1
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_seconds:
+            break
+    peak = None
+    if memory:
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return elapsed / runs, peak, result
+
+
+def record(results, name, seconds, peak, amount, unit):
+    results[name] = {
+        "seconds": round(seconds, 4),
+        "throughput": round(amount / seconds, 2) if seconds else None,
+        "unit": unit,
+        "peak_mb": round(peak, 1) if peak is not None else None,
+    }
+    print(f"{name:<22} {seconds:8.3f}s  {results[name]['throughput']:>12} {unit:<14} "
+          f"peak {results[name]['peak_mb']} MB", file=sys.stderr)
+
+
+def bench_size(pages: int, work: Path, args) -> dict:
+    results = {}
+    mem = not args.no_memory
+    pdf = make_book_pdf(work / f"book{pages}.pdf", pages, table_every=10, chapter_every=max(1, pages // 10))
+
+    def extract():
+        text = ""
+        for page in extract_pages(str(pdf), None, engine=args.engine):
+            text += page.text + "\n"
+            for t in page.tables:
+                text += "\n\n" + t + "\n"
+        return text
+
+    s, peak, text = measure(extract, mem)
+    record(results, f"extract/{pages}", s, peak, pages, "pages/s")
+    mb = len(text.encode()) / 1e6
+
+    s, peak, cleaned = measure(lambda: clean_markdown(text), mem)
+    record(results, f"clean/{pages}", s, peak, mb, "MB/s")
+    s, peak, _ = measure(lambda: split_into_sentences(cleaned), mem)
+    record(results, f"sentences/{pages}", s, peak, mb, "MB/s")
+    s, peak, chunks = measure(lambda: chunk_text(cleaned, max_chars=4000), mem)
+    record(results, f"chunk/{pages}", s, peak, mb, "MB/s")
+
+    # Planning over many chapters: the book's chapters, repeated to a realistic count
+    heads = cleaned.split("Chapter ")
+    chapters = [{"title": f"Chapter {i}", "content": c} for i, c in enumerate(heads * max(1, 200 // len(heads)))]
+    s, peak, _ = measure(lambda: plan_audio_files(chapters, 3600), mem)
+    record(results, f"plan/{pages}", s, peak, len(chapters), "chapters/s")
+
+    # Assemble one synthetic chunk per text chunk (~15 chars/s of speech)
+    audio_dir = work / f"audio{pages}"
+    audio_dir.mkdir()
+    parts = [write_silence(str(audio_dir / f"c{k:05d}.mp3"), len(c) / 15.0) for k, c in enumerate(chunks)]
+    audio_seconds = sum(len(c) / 15.0 for c in chunks)
+    gen = AudiobookGenerator(output_dir=str(work / "assemble_out"), use_openclaw=False, play_vlc=False,
+                             tts_provider="synthetic")
+    s, peak, _ = measure(lambda: gen.assemble_audio(parts, str(audio_dir / "book.mp3")), mem)
+    record(results, f"assemble/{pages}", s, peak, audio_seconds, "audio-sec/s")
+
+    def end_to_end():
+        out = work / "e2e_out"
+        shutil.rmtree(out, ignore_errors=True)
+        src = work / f"e2e{pages}.pdf"
+        shutil.copy(pdf, src)  # process() moves its input into the output folder
+        gen = AudiobookGenerator(output_dir=str(out), use_openclaw=False, play_vlc=False,
+                                 extract_engine=args.engine, tts_concurrency=args.tts_concurrency,
+                                 tts_provider=SyntheticTTSProvider(latency=args.tts_latency))
+        return gen.process(str(src))
+
+    s, peak, _ = measure(end_to_end, mem)
+    record(results, f"end_to_end/{pages}", s, peak, pages, "pages/s")
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float, mem_tolerance: float) -> list:
+    """List the stages that regressed against `baseline`."""
+    failures = []
+    for name, cur in results.items():
+        ref = baseline.get(name)
+        if ref is None:
+            continue
+        if ref.get("throughput") and cur["throughput"] < ref["throughput"] * (1 - tolerance):
+            failures.append(f"{name}: {cur['throughput']} {cur['unit']} < baseline {ref['throughput']} "
+                            f"(-{tolerance:.0%} allowed)")
+        if ref.get("peak_mb") is not None and cur["peak_mb"] is not None \
+                and cur["peak_mb"] > ref["peak_mb"] * (1 + mem_tolerance) + 1.0:
+            failures.append(f"{name}: peak {cur['peak_mb']} MB > baseline {ref['peak_mb']} MB "
+                            f"(+{mem_tolerance:.0%} allowed)")
+    return failures
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000], help="book sizes to benchmark")
+    p.add_argument("--engine", default="fitz", help="extract_pages engine (pdfplumber is ~10x slower)")
+    p.add_argument("--tts-latency", type=float, default=0.2, help="synthetic TTS seconds per chunk")
+    p.add_argument("--tts-concurrency", type=int, default=4)
+    p.add_argument("--no-memory", action="store_true", help="skip the tracemalloc runs")
+    p.add_argument("--json", help="also write the results to this file")
+    p.add_argument("--baseline", nargs="?", const=str(DEFAULT_BASELINE),
+                   help=f"compare against a stored baseline (default {DEFAULT_BASELINE.name})")
+    p.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    p.add_argument("--tolerance", type=float, default=0.3, help="allowed throughput drop vs. baseline")
+    p.add_argument("--mem-tolerance", type=float, default=0.3, help="allowed peak memory growth vs. baseline")
+    args = p.parse_args()
+
+    results = {}
+    # Pipeline chatter goes to stderr; stdout carries only the JSON report
+    with tempfile.TemporaryDirectory() as d, contextlib.redirect_stdout(sys.stderr):
+        for pages in args.pages:
+            work = Path(d) / str(pages)
+            work.mkdir()
+            results.update(bench_size(pages, work, args))
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "engine": args.engine,
+        "tts_latency": args.tts_latency,
+        "results": results,
+    }
+    out = json.dumps(report, indent=2)
+    print(out)
+    if args.json:
+        Path(args.json).write_text(out + "\n")
+    baseline_path = Path(args.baseline or DEFAULT_BASELINE)
+    if args.save_baseline:
+        baseline_path.write_text(out + "\n")
+        print(f"Saved baseline to {baseline_path}", file=sys.stderr)
+    elif args.baseline:
+        baseline = json.loads(baseline_path.read_text())["results"]
+        failures = compare(results, baseline, args.tolerance, args.mem_tolerance)
+        for f in failures:
+            print(f"REGRESSION {f}", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+        print(f"No regressions against {baseline_path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
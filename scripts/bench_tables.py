@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""Compare table modes (always, auto, never): extraction time, pages skipped and table recall."""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from make_sample_pdf import make_book_pdf
+
+from audiobooker.pdf_processor import ENGINES, TABLE_MODES, TableStats, extract_pages
+
+
+def run(pdf: str, engine: str, table_mode: str):
+    stats = TableStats()
+    t0 = time.perf_counter()
+    pages = list(extract_pages(pdf, None, engine=engine, table_mode=table_mode, table_stats=stats))
+    return time.perf_counter() - t0, pages, stats
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--pages", type=int, nargs="+", default=[50, 200])
+    p.add_argument("--table-every", type=int, default=10, help="put a ruled table on every Nth page")
+    p.add_argument("--engine", choices=sorted(ENGINES), default="pdfplumber")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        for n in args.pages:
+            pdf = str(make_book_pdf(Path(d) / f"book{n}.pdf", n, table_every=args.table_every))
+            print(f"--- {n} pages ({args.engine}) ---")
+            reference = None
+            for mode in TABLE_MODES:
+                elapsed, pages, stats = run(pdf, args.engine, mode)
+                found = sum(len(page.tables) for page in pages)
+                if reference is None:
+                    reference = found
+                recall = found / reference if reference else 1.0
+                print(
+                    f"{mode:<7} {elapsed:7.2f}s  tables on {stats.extracted:4d} pages, {stats.skipped:4d} skipped, {stats.audited:3d} audited  "
+                    f"classify {stats.classify_seconds:6.3f}s  extract {stats.extract_seconds:6.3f}s  "
+                    f"est. saved {stats.seconds_saved:6.3f}s  recall {recall:.0%}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""Compare a fixed TTS concurrency with the adaptive limit against a service that throttles for a while."""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from audiobooker.tts_control import ResilientTTSProvider
+from audiobooker.tts_providers import FaultyTTSProvider
+
+
+def run(args, adaptive: bool) -> dict:
+    """Synthesize `args.chunks` chunks while the service capacity drops during the middle phase."""
+    service = FaultyTTSProvider(latency=args.latency, capacity=args.capacity, error_rate=args.error_rate, seed=1)
+    tts = ResilientTTSProvider(service, max_limit=args.concurrency, initial_limit=2, adaptive=adaptive,
+                               retries=args.retries, backoff=args.backoff,
+                               breaker_cooldown=args.cooldown, rng=random.Random(0))
+    finished, limits = [], []
+
+    async def main(d: Path) -> float:
+        t0 = time.perf_counter()
+        sem = asyncio.Semaphore(args.concurrency)
+
+        async def one(k):
+            async with sem:
+                await tts.synthesize_async("text " * 100, str(d / f"c{k:05d}.mp3"))
+            finished.append(time.perf_counter() - t0)
+
+        async def throttle():
+            await asyncio.sleep(args.phase)
+            service.capacity = args.throttled
+            await asyncio.sleep(args.phase)
+            service.capacity = args.capacity
+
+        async def sample():
+            while True:
+                limits.append(tts.limit)
+                await asyncio.sleep(args.phase / 4)
+
+        sampler = asyncio.ensure_future(sample())
+        results = await asyncio.gather(throttle(), *(one(k) for k in range(args.chunks)), return_exceptions=True)
+        sampler.cancel()
+        return sum(isinstance(r, Exception) for r in results)
+
+    with tempfile.TemporaryDirectory() as d:
+        t0 = time.perf_counter()
+        failed = asyncio.run(main(Path(d)))
+        elapsed = time.perf_counter() - t0
+
+    def rate(a, b):
+        return sum(a <= t < b for t in finished) / (b - a)
+
+    p = args.phase
+    return {"seconds": elapsed, "failed": failed, "rejected": service.rejected, "retries": tts.stats.retries,
+            "before": rate(0, p), "during": rate(p, 2 * p), "after": rate(2 * p + p / 4, 3 * p), "limits": limits}
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--chunks", type=int, default=1500)
+    p.add_argument("--latency", type=float, default=0.05, help="simulated seconds per TTS call")
+    p.add_argument("--concurrency", type=int, default=16, help="fixed limit, and the adaptive maximum")
+    p.add_argument("--capacity", type=int, default=8, help="requests the service accepts at once")
+    p.add_argument("--throttled", type=int, default=2, help="capacity while throttling")
+    p.add_argument("--phase", type=float, default=2.0, help="seconds before, and length of, the throttling")
+    p.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls failing with a connection error")
+    p.add_argument("--retries", type=int, default=8)
+    p.add_argument("--backoff", type=float, default=0.05)
+    p.add_argument("--cooldown", type=float, default=1.0, help="seconds the circuit stays open")
+    args = p.parse_args()
+
+    print(f"{'mode':<9} {'total s':>8} {'before/s':>9} {'during/s':>9} {'after/s':>8} {'rejected':>9} "
+          f"{'retries':>8} {'failed':>7}  limit over time")
+    for adaptive in (False, True):
+        r = run(args, adaptive)
+        print(f"{'adaptive' if adaptive else 'fixed':<9} {r['seconds']:8.2f} {r['before']:9.1f} {r['during']:9.1f} "
+              f"{r['after']:8.1f} {r['rejected']:>9} {r['retries']:>8} {r['failed']:>7}  "
+              f"{' '.join(map(str, r['limits'][:16]))}")
+
+
+if __name__ == "__main__":
+    main()
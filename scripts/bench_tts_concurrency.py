@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+"""Benchmark sequential vs. concurrent chunk synthesis against an offline stub provider."""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from audiobooker.tts_providers import StubTTSProvider
+
+
+def run(chunks: int, latency: float, concurrency: int) -> float:
+    """Synthesize `chunks` stub chunks and return the wall time in seconds."""
+    tts = StubTTSProvider(latency=latency)
+    with tempfile.TemporaryDirectory() as d:
+        jobs = [(f"Chunk number {k}.", str(Path(d) / f"c{k:04d}.mp3")) for k in range(chunks)]
+        t0 = time.perf_counter()
+        out = tts.synthesize_many(jobs, concurrency=concurrency)
+        elapsed = time.perf_counter() - t0
+        assert out == [p for _, p in jobs], "output order not preserved"
+    return elapsed
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--chunks", type=int, default=100, help="number of chunks to synthesize")
+    p.add_argument("--latency", type=float, default=0.2, help="simulated seconds per TTS call")
+    p.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = p.parse_args()
+
+    baseline = None
+    for n in args.concurrency:
+        elapsed = run(args.chunks, args.latency, n)
+        baseline = baseline or elapsed
+        print(
+            f"concurrency={n:<3d} {elapsed:7.2f}s  "
+            f"{args.chunks / elapsed:7.1f} chunks/s  speedup x{baseline / elapsed:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""Compare TTS providers end to end on the same text: wall time, chunks/s and audio seconds per second.
+
+Providers that cannot run here (edge-tts offline, no espeak-ng) are reported and skipped.
+"""
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+from pathlib import Path
+
+from audiobooker.generator import AudiobookGenerator
+from audiobooker.mp3_concat import probe
+from audiobooker.tts_providers import TTS_PROVIDERS, make_tts_provider
+
+SENTENCE = "The quick brown fox jumps over the lazy dog while the narrator reads on. "
+
+
+def run(name: str, text: str, args) -> dict:
+    options = {"workers": args.workers} if name == "local" else {}
+    tts = make_tts_provider(name, **options)
+    chunks = []
+    with tempfile.TemporaryDirectory() as d:
+        gen = AudiobookGenerator(output_dir=d, use_openclaw=False, play_vlc=False, chunk_size=args.chunk_size,
+                                 chunk_overlap=0, tts_concurrency=args.tts_concurrency, tts_provider=tts,
+                                 on_segment=lambda index, path: chunks.append(index))
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            parts = gen.process(text, is_text=True)
+        seconds = time.perf_counter() - t0
+        audio = sum(probe(p).duration for p in parts)
+    if hasattr(tts, "close"):
+        tts.close()
+    return {"seconds": seconds, "chunks": len(chunks), "audio": audio}
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--providers", nargs="+", default=list(TTS_PROVIDERS), choices=list(TTS_PROVIDERS))
+    p.add_argument("--chars", type=int, default=40000, help="length of the text")
+    p.add_argument("--chunk-size", type=int, default=2000)
+    p.add_argument("--tts-concurrency", type=int, default=4)
+    p.add_argument("--workers", type=int, default=0, help="local engine processes (0 = one per core)")
+    args = p.parse_args()
+    text = (SENTENCE * (args.chars // len(SENTENCE) + 1))[:args.chars]
+
+    print(f"{'provider':<10} {'total s':>8} {'chunks/s':>9} {'audio s/s':>10}")
+    for name in args.providers:
+        try:
+            r = run(name, text, args)
+        except Exception as e:
+            print(f"{name:<10} skipped: {e}")
+            continue
+        print(f"{name:<10} {r['seconds']:8.2f} {r['chunks'] / r['seconds']:9.1f} {r['audio'] / r['seconds']:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
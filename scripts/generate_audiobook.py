@@ -1,16 +1,138 @@
 #!/usr/bin/env python
 """CLI script to generate audiobooks from PDF files."""
 import argparse
+import os
+import time
+from audiobooker import metrics
+from audiobooker.encoder import OUTPUT_FORMATS
+from audiobooker.batch import PRIORITIES, find_pdfs, load_deadlines, order_books, run_batch, write_report
 from audiobooker.generator import AudiobookGenerator
+from audiobooker.local_tts import ENGINES as LOCAL_ENGINES
+from audiobooker.pdf_processor import ENGINES, TABLE_MODES
+from audiobooker.planner import DurationModel
+from audiobooker.tts_cache import TTSCache
+from audiobooker.tts_providers import TTS_PROVIDERS, SharedLimit, make_tts_provider
 
 def main():
     """Main CLI entry point for audiobook generation."""
     p = argparse.ArgumentParser()
-    p.add_argument("pdf", nargs="?", help="input PDF file (English only) or empty for paste")
+    p.add_argument(
+        "pdf",
+        nargs="*",
+        help="input PDF file (English only) or empty for paste; with --batch, any number of "
+        "PDF files, directories and glob patterns",
+    )
     p.add_argument("--out", default="out", help="output directory")
-    p.add_argument("--voice", default="en-GB-RyanNeural", help="voice id (edge-tts)")
+    p.add_argument(
+        "--voice",
+        help="voice id (default: the provider's own; e.g. en-GB-RyanNeural for edge, en-gb for espeak-ng, "
+        "a .onnx model path for piper)",
+    )
+    p.add_argument(
+        "--tts-provider",
+        choices=list(TTS_PROVIDERS),
+        default="edge",
+        help="edge (Microsoft Edge online voices), local (an offline engine, see --tts-engine) or synthetic "
+        "(silence as long as the text would take to read, for tests and benchmarks)",
+    )
+    p.add_argument(
+        "--tts-engine",
+        choices=list(LOCAL_ENGINES),
+        default="espeak-ng",
+        help="with --tts-provider local, the engine to run",
+    )
+    p.add_argument(
+        "--tts-workers",
+        type=int,
+        default=0,
+        help="with --tts-provider local, engine processes run at once (0 = one per core)",
+    )
     p.add_argument("--chunk-size", type=int, default=4000)
+    p.add_argument(
+        "--chunk-overlap",
+        type=int,
+        default=200,
+        help="approx characters repeated at the start of each chunk (0 = no repeated words)",
+    )
     p.add_argument("--split-seconds", type=int, default=60 * 60)
+    p.add_argument(
+        "--tts-concurrency",
+        type=int,
+        default=4,
+        help="number of TTS chunk requests kept in flight at once (1 = sequential)",
+    )
+    p.add_argument(
+        "--tts-adaptive",
+        action="store_true",
+        help="adjust TTS requests in flight to the service (AIMD on errors and latency), up to --tts-concurrency",
+    )
+    p.add_argument(
+        "--tts-retries",
+        type=int,
+        default=3,
+        help="retries of a failed TTS request, with jittered exponential backoff (0 = fail at once)",
+    )
+    p.add_argument(
+        "--tts-timeout",
+        type=float,
+        default=0,
+        help="seconds before a TTS request is abandoned and retried (0 = no timeout)",
+    )
+    p.add_argument(
+        "--extract-engine",
+        choices=sorted(ENGINES),
+        default="pdfplumber",
+        help="PDF text engine: pdfplumber, fitz (PyMuPDF, much faster) or auto "
+        "(fitz text, pdfplumber tables)",
+    )
+    p.add_argument(
+        "--tables",
+        choices=TABLE_MODES,
+        default="auto",
+        help="table extraction: on every page (always), only on pages whose ruling lines "
+        "could form a table (auto), or never",
+    )
+    p.add_argument(
+        "--no-ocr",
+        action="store_true",
+        help="do not OCR scanned pages (pages with an image but no text layer)",
+    )
+    p.add_argument(
+        "--ocr-workers",
+        type=int,
+        default=0,
+        help="processes OCR-ing scanned pages (0 = one per core)",
+    )
+    p.add_argument(
+        "--ocr-cache-dir",
+        help="directory caching OCR text by page image, so re-runs skip OCR (disabled when omitted)",
+    )
+    p.add_argument(
+        "--stream-pages",
+        action="store_true",
+        help="detect headers/footers on a page sample and stream pages with bounded memory",
+    )
+    p.add_argument(
+        "--extract-workers",
+        type=int,
+        default=1,
+        help="extract page text and tables in this many processes (implies --stream-pages)",
+    )
+    p.add_argument(
+        "--cache-dir",
+        help="directory for the on-disk TTS cache (disabled when omitted)",
+    )
+    p.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=2048,
+        help="byte budget of the TTS cache in MB; least recently used entries are evicted",
+    )
+    p.add_argument(
+        "--duration-model",
+        default="~/.audiobooker/duration_model.json",
+        help="JSON file with the per-voice speech rate used to plan parts; updated after every run",
+    )
     p.add_argument(
         "--paste",
         action="store_true",
@@ -21,19 +143,92 @@ def main():
         action="store_true",
         help="do not delete intermediate audio chunks after assembly",
     )
+    p.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue an interrupted run from the book's manifest.json, redoing only missing chunks and parts",
+    )
     p.add_argument(
         "--no-openclaw",
         action="store_true",
         help="disable OpenClaw AI cleaning and chapter splitting",
     )
+    p.add_argument(
+        "--openclaw-parallelism",
+        type=int,
+        default=4,
+        help="number of OpenClaw window calls run at once when cleaning/splitting long texts",
+    )
+    p.add_argument(
+        "--openclaw-cache-dir",
+        help="directory caching OpenClaw window results by content hash (in-memory only when omitted)",
+    )
+    p.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="mp3",
+        help="output audio: mp3 parts, or m4b (AAC) / opus encoded once by ffmpeg with chapter markers",
+    )
+    p.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="overlap extraction, TTS and assembly; without OpenClaw, parts are cut at chunk boundaries",
+    )
+    p.add_argument(
+        "--batch",
+        action="store_true",
+        help="generate many books in one process: extraction on a shared CPU pool, one TTS limit for all books",
+    )
+    p.add_argument(
+        "--books",
+        type=int,
+        default=2,
+        help="with --batch, number of books generated at once",
+    )
+    p.add_argument(
+        "--cpu-workers",
+        type=int,
+        default=0,
+        help="with --batch, processes extracting PDFs for all books (0 = one per core)",
+    )
+    p.add_argument(
+        "--tts-limit",
+        type=int,
+        default=8,
+        help="with --batch, TTS requests in flight across all books (--tts-concurrency still caps each book)",
+    )
+    p.add_argument(
+        "--priority",
+        choices=PRIORITIES,
+        default="largest",
+        help="with --batch, order in which books start: largest or smallest file first, "
+        "earliest --deadlines entry first, or input order",
+    )
+    p.add_argument(
+        "--deadlines",
+        help="with --batch, JSON file mapping PDF paths or file names to ISO 8601 deadlines",
+    )
+    p.add_argument(
+        "--report",
+        help="with --batch, where to write the JSON summary (default: <out>/batch_report.json)",
+    )
+    p.add_argument(
+        "--metrics",
+        action="store_true",
+        help="record per-stage timings and counters and print them (Prometheus text format) at the end",
+    )
     args = p.parse_args()
 
     if not args.pdf and not args.paste:
         p.error("You must specify either a PDF file or --paste")
     if args.pdf and args.paste:
         p.error("Cannot specify both a PDF file and --paste")
+    if len(args.pdf) > 1 and not args.batch:
+        p.error("Give a single PDF file, or use --batch for several")
+    if args.batch and args.paste:
+        p.error("--batch takes PDF files, directories or globs, not --paste")
 
-    source = args.pdf
+    source = args.pdf[0] if args.pdf else None
     is_text = False
 
     if args.paste:
@@ -49,17 +244,78 @@ def main():
         source = text
         is_text = True
     
-    gen = AudiobookGenerator(
+    if args.metrics:
+        metrics.enable()
+
+    tts_cache = None
+    if args.cache_dir:
+        tts_cache = TTSCache(args.cache_dir, max_bytes=args.cache_size_mb * 1024 * 1024)
+
+    # One provider for the run, so batch books share a local engine's process pool
+    tts_options = dict(engine=args.tts_engine, workers=args.tts_workers) if args.tts_provider == "local" else {}
+    try:
+        tts = make_tts_provider(args.tts_provider, voice=args.voice, **tts_options)
+    except (RuntimeError, ValueError) as e:
+        p.error(str(e))
+
+    gen_kwargs = dict(
         output_dir=args.out,
         voice=args.voice,
+        tts_provider=tts,
         chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
         split_seconds=args.split_seconds,
         keep_chunks=args.keep_chunks,
-        use_openclaw=not args.no_openclaw
+        use_openclaw=not args.no_openclaw,
+        tts_concurrency=args.tts_concurrency,
+        tts_retries=args.tts_retries,
+        tts_timeout=args.tts_timeout or None,
+        tts_adaptive=args.tts_adaptive,
+        tts_cache=tts_cache,
+        stream_pages=args.stream_pages,
+        extract_workers=args.extract_workers,
+        extract_engine=args.extract_engine,
+        table_mode=args.tables,
+        ocr=not args.no_ocr,
+        ocr_workers=args.ocr_workers,
+        ocr_cache_dir=args.ocr_cache_dir,
+        resume=args.resume,
+        openclaw_parallelism=args.openclaw_parallelism,
+        openclaw_cache_dir=args.openclaw_cache_dir,
+        duration_model=DurationModel.load(args.duration_model),
+        output_format=args.format,
+        pipeline=args.pipeline,
     )
+
+    if args.batch:
+        pdfs = find_pdfs(args.pdf)
+        if not pdfs:
+            p.error("No PDF files found")
+        deadlines = load_deadlines(args.deadlines) if args.deadlines else {}
+        pdfs = order_books(pdfs, args.priority, deadlines)
+        tts_limit = SharedLimit(args.tts_limit)
+        print(f"Batch of {len(pdfs)} books, {args.books} at a time, up to {tts_limit.limit} TTS requests in flight")
+        t0 = time.time()
+        results = run_batch(
+            pdfs,
+            lambda **kw: AudiobookGenerator(**gen_kwargs, play_vlc=False, tts_limit=tts_limit, **kw),
+            books=args.books,
+            cpu_workers=args.cpu_workers,
+            deadlines=deadlines,
+        )
+        report = write_report(results, args.report or os.path.join(args.out, "batch_report.json"),
+                              time.time() - t0, priority=args.priority, tts_limit=tts_limit.limit,
+                              tts_peak_in_flight=tts_limit.peak)
+        if args.metrics:
+            print(metrics.REGISTRY.render(), end="")
+        raise SystemExit(1 if report["failed"] else 0)
+
+    gen = AudiobookGenerator(**gen_kwargs)
     
     parts = gen.process(source, is_text=is_text)
     print("Created parts:", parts)
+    if args.metrics:
+        print(metrics.REGISTRY.render(), end="")
 
 if __name__ == "__main__":
     main()
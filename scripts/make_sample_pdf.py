@@ -2,28 +2,84 @@ from pathlib import Path
 
 import fitz
 
-p = Path(__file__).resolve().parents[1] / "pdfs"
-p.mkdir(exist_ok=True)
-doc = fitz.open()
-# pages with headers/footers and table
-for i in range(1, 4):
+BODY = (
+    "This is sample content for testing the audiobook generator. "
+    "It should be read aloud by the TTS engine in a natural-sounding voice.\n\n"
+    "Here is a small table:\nName | Value\nAlpha | 123\nBeta | 456\nGamma | 789\n\n"
+    "End of sample page."
+)
+
+
+def make_sample_pdf(path: Path) -> Path:
+    """Write the 4-page sample: 3 pages with headers/footers and a table, then an index page."""
+    doc = fitz.open()
+    # pages with headers/footers and table
+    for i in range(1, 4):
+        page = doc.new_page()
+        header = f"My Book Title - Chapter {i}"
+        footer = f"Page {i} - Confidential"
+        page.insert_text((72, 40), header, fontsize=10)
+        page.insert_text((72, 750), footer, fontsize=10)
+        page.insert_textbox(fitz.Rect(72, 72, 540, 720), BODY, fontsize=11)
+    # index-like page
     page = doc.new_page()
-    header = f"My Book Title - Chapter {i}"
-    footer = f"Page {i} - Confidential"
-    page.insert_text((72, 40), header, fontsize=10)
-    page.insert_text((72, 750), footer, fontsize=10)
-    body = (
-        "This is sample content for testing the audiobook generator. "
-        "It should be read aloud by the TTS engine in a natural-sounding voice.\n\n"
-        "Here is a small table:\nName | Value\nAlpha | 123\nBeta | 456\nGamma | 789\n\n"
-        "End of sample page."
+    page.insert_text((72, 40), "Index")
+    idx_text = "alpha................................1\nbeta................................2\ngamma................................3\n"
+    page.insert_textbox(fitz.Rect(72, 72, 540, 720), idx_text, fontsize=11)
+    doc.save(str(path))
+    return path
+
+
+def draw_table(page, top: float, rows) -> None:
+    """Draw `rows` as a ruled grid (the kind pdfplumber's table finder detects) starting at y=`top`."""
+    col_w, row_h, left = 120, 18, 72
+    for r, row in enumerate(rows):
+        for c, cell in enumerate(row):
+            rect = fitz.Rect(left + c * col_w, top + r * row_h, left + (c + 1) * col_w, top + (r + 1) * row_h)
+            page.draw_rect(rect, color=(0, 0, 0), width=0.5)
+            page.insert_text((rect.x0 + 4, rect.y1 - 5), str(cell), fontsize=9)
+
+
+def make_book_pdf(path: Path, pages: int, table_every: int = 0, chapter_every: int = 0) -> Path:
+    """Write a `pages`-long book with a running header, footer and prose body.
+
+    With `table_every=N`, every Nth page also carries a small ruled table; with
+    `chapter_every=N`, a "Chapter K." heading opens page 1 and every Nth page after it.
+    """
+    doc = fitz.open()
+    prose = " ".join(
+        f"Sentence {k} of the page continues the story with ordinary narrative prose." for k in range(30)
     )
-    page.insert_textbox(fitz.Rect(72, 72, 540, 720), body, fontsize=11)
-# index-like page
-page = doc.new_page()
-page.insert_text((72, 40), "Index")
-idx_text = "alpha................................1\nbeta................................2\ngamma................................3\n"
-page.insert_textbox(fitz.Rect(72, 72, 540, 720), idx_text, fontsize=11)
-out = p / "new.pdf"
-doc.save(str(out))
-print("WROTE", out)
+    for i in range(1, pages + 1):
+        page = doc.new_page()
+        page.insert_text((72, 40), "My Book Title", fontsize=10)
+        page.insert_text((72, 750), "Confidential", fontsize=10)
+        opening = f"Page {i}. "
+        if chapter_every and (i - 1) % chapter_every == 0:
+            opening = f"Chapter {(i - 1) // chapter_every + 1}. {opening}"
+        if table_every and i % table_every == 0:
+            page.insert_textbox(fitz.Rect(72, 72, 540, 400), opening + prose[:1200], fontsize=11)
+            draw_table(page, 420, [["Name", "Value", "Unit"]] + [[f"Item {k}", str(k * i), "kg"] for k in range(4)])
+        else:
+            page.insert_textbox(fitz.Rect(72, 72, 540, 720), opening + prose, fontsize=11)
+    doc.save(str(path))
+    return path
+
+
+def make_scanned_pdf(path: Path, pages: int, dpi: int = 150) -> Path:
+    """Write a `pages`-long image-only PDF: each page of a `make_book_pdf` book as a grayscale scan, no text layer."""
+    make_book_pdf(path, pages)
+    src = fitz.open("pdf", path.read_bytes())
+    doc = fitz.open()
+    for page in src:
+        pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+        doc.new_page(width=page.rect.width, height=page.rect.height).insert_image(page.rect, pixmap=pix)
+    doc.save(str(path))
+    return path
+
+
+if __name__ == "__main__":
+    p = Path(__file__).resolve().parents[1] / "pdfs"
+    p.mkdir(exist_ok=True)
+    out = make_sample_pdf(p / "new.pdf")
+    print("WROTE", out)
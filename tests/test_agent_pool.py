@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from audiobooker.agent_pool import AgentDied, AgentPool, AgentTimeout, AgentUnavailable
+from audiobooker.openclaw_processor import OpenClawProcessor
+
+SESSION_STUB = r'''
+import json, os, sys, time
+for line in sys.stdin:
+    req = json.loads(line)
+    if req["type"] == "ping":
+        out = {"id": req["id"], "pong": True}
+    elif req["message"] == "hang":
+        time.sleep(60)
+        continue
+    elif req["message"] == "die":
+        sys.exit(1)
+    else:
+        print("log noise", flush=True)
+        out = {"id": req["id"], "reply": f"{os.getpid()}:{req['message'].upper()}"}
+    print(json.dumps(out), flush=True)
+'''
+
+
+@pytest.fixture
+def stub_command(tmp_path: Path) -> list:
+    script = tmp_path / "agent_stub.py"
+    script.write_text(SESSION_STUB)
+    return [sys.executable, str(script)]
+
+
+def test_sessions_are_reused_and_restarted(stub_command) -> None:
+    pool = AgentPool(stub_command, size=2, timeout=5)
+    try:
+        first = pool.call("hello")
+        pid, reply = first.split(":")
+        assert reply == "HELLO"
+        assert pool.call("again").split(":")[0] == pid  # same process, no new startup
+        assert pool.started == 1
+
+        # A dead agent is replaced and the call retried transparently once
+        with pytest.raises(AgentDied):
+            pool.call("die")
+        assert pool.call("after").split(":")[0] != pid
+        assert pool.restarts >= 1
+        assert pool.health()["idle"] == 1
+    finally:
+        pool.close()
+
+
+def test_hung_agent_times_out_and_is_replaced(stub_command) -> None:
+    pool = AgentPool(stub_command, size=1, timeout=5)
+    try:
+        pid = pool.call("x").split(":")[0]
+        with pytest.raises(AgentTimeout):
+            pool.call("hang", timeout=0.5)
+        assert pool.call("y").split(":")[0] != pid
+    finally:
+        pool.close()
+
+
+def test_processor_falls_back_to_spawning_when_sessions_fail(tmp_path: Path) -> None:
+    pool = AgentPool([sys.executable, "-c", "import sys; sys.exit(3)"], startup_timeout=2)
+    oc = OpenClawProcessor(pool=pool, timeout=5)
+    with pytest.raises(AgentUnavailable):
+        pool.call("x")
+    assert not pool.available
+    oc._spawn_agent = lambda prompt: "spawned"
+    assert oc._call_agent("anything") == "spawned"
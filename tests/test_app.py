@@ -0,0 +1,189 @@
+import asyncio
+import functools
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from audiobooker.generator import AudiobookGenerator
+from audiobooker.tts_providers import SyntheticTTSProvider
+
+fastapi = pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class GatedTTSProvider(SyntheticTTSProvider):
+    """Synthetic audio once `gate` is set; raises instead if `fail` is set."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.gate = threading.Event()
+        self.fail = False
+
+    async def synthesize_async(self, text, out_path, voice=None) -> None:
+        await asyncio.to_thread(self.gate.wait, 10)
+        if self.fail:
+            raise RuntimeError("synthesis failed")
+        await super().synthesize_async(text, out_path, voice)
+
+
+class RecordingNotifier:
+    def __init__(self) -> None:
+        self.sent = []
+
+    def notify(self, recipient_email, audiobook_name, download_url) -> bool:
+        self.sent.append((recipient_email, audiobook_name, download_url))
+        return True
+
+
+@pytest.fixture(scope="module")
+def app_module(tmp_path_factory):
+    """ui.app imported in a scratch directory, so its uploads, outputs and caches stay out of the tree."""
+    work = tmp_path_factory.mktemp("app")
+    (work / "ui").mkdir()
+    (work / "ui" / "static").symlink_to(ROOT / "ui" / "static")
+    cwd = os.getcwd()
+    env = {"AUDIOBOOKER_TTS_PROVIDERS": "synthetic", "AUDIOBOOKER_TTS_CACHE_DIR": str(work / "tts_cache"),
+           "AUDIOBOOKER_OCR_CACHE_DIR": str(work / "ocr_cache"),
+           "AUDIOBOOKER_DURATION_MODEL": str(work / "duration_model.json")}
+    saved = {k: os.environ.get(k) for k in env}
+    os.environ.update(env)
+    sys.path.insert(0, str(ROOT))
+    os.chdir(work)
+    try:
+        import ui.app as app_module
+        yield app_module
+    finally:
+        app_module.JOBS.shutdown()
+        os.chdir(cwd)
+        sys.path.remove(str(ROOT))
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+@pytest.fixture
+def app(app_module, monkeypatch):
+    monkeypatch.setitem(app_module.TTS_PROVIDERS, "synthetic", GatedTTSProvider())
+    monkeypatch.setattr(app_module, "TTS_CONTROL", {})
+    monkeypatch.setattr(app_module, "AudiobookGenerator", functools.partial(AudiobookGenerator, play_vlc=False))
+    return app_module
+
+
+def text_request(text: str, **extra) -> dict:
+    return {"text": text, "tts_provider": "synthetic", "openclaw": False, **extra}
+
+
+def wait_for(app, job_id: str, timeout: float = 10.0):
+    job = app.JOBS.get(job_id)
+    deadline = time.time() + timeout
+    while job.status not in ("done", "failed", "cancelled") and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_failed_job_leaves_no_outputs(app) -> None:
+    client, tts = TestClient(app.app), app.TTS_PROVIDERS["synthetic"]
+    tts.fail = True
+    r = client.post("/api/generate/text", json=text_request("This book fails to generate. " * 10))
+    job_id = r.json()["job_id"]
+    while job_id not in app.SEGMENTS and app.JOBS.get(job_id).status == "queued":
+        time.sleep(0.01)
+    tts.gate.set()
+
+    assert wait_for(app, job_id).status == "failed"
+    assert not (app.OUTPUT_DIR / job_id).exists()
+    assert job_id not in app.SEGMENTS
+
+
+def make_pdf(text: str) -> bytes:
+    fitz = pytest.importorskip("fitz")
+    doc = fitz.open()
+    doc.new_page().insert_textbox(fitz.Rect(72, 72, 540, 720), text, fontsize=11)
+    return doc.tobytes()
+
+
+def pdf_request(client, pdf: bytes, **extra):
+    return client.post("/api/generate/pdf", files={"file": ("book.pdf", pdf, "application/pdf")},
+                       data={"tts_provider": "synthetic", "openclaw": "false", "ocr": "false", **extra})
+
+
+def test_repeated_request_reuses_the_finished_job(app) -> None:
+    client = TestClient(app.app)
+    app.TTS_PROVIDERS["synthetic"].gate.set()
+    first = client.post("/api/generate/text", json=text_request("A book read once. " * 10))
+    assert first.status_code == 202 and wait_for(app, first.json()["job_id"]).status == "done"
+
+    again = client.post("/api/generate/text", json=text_request("A book read once. " * 10))
+
+    assert again.status_code == 200
+    assert again.json()["reused"] is True and again.json()["job_id"] == first.json()["job_id"]
+
+
+def test_concurrent_duplicate_joins_the_running_job(app, monkeypatch) -> None:
+    notifier = RecordingNotifier()
+    monkeypatch.setattr(app, "NOTIFIER", notifier)
+    client = TestClient(app.app)
+    pdf = make_pdf("A book asked for twice while it is generating. " * 20)
+    first = pdf_request(client, pdf, email="a@example.com")
+    second = pdf_request(client, pdf, email="b@example.com")
+    job_id = first.json()["job_id"]
+
+    assert second.status_code == 202 and second.json()["coalesced"] is True
+    assert second.json()["job_id"] == job_id
+    assert [p.name for p in app.UPLOAD_DIR.iterdir()] == [f"{job_id}_book.pdf"]  # the duplicate upload is gone
+    assert app.NOTIFY[job_id] == ["b@example.com"]
+
+    app.TTS_PROVIDERS["synthetic"].gate.set()
+    assert wait_for(app, job_id).status == "done"
+    assert sorted(address for address, *_ in notifier.sent) == ["a@example.com", "b@example.com"]
+    assert job_id not in app.NOTIFY and not any(app.UPLOAD_DIR.iterdir())
+
+
+def test_full_queue_refuses_the_request(app, monkeypatch) -> None:
+    monkeypatch.setattr(app.JOBS, "max_queue", 0)
+    client = TestClient(app.app)
+
+    r = pdf_request(client, make_pdf("A book that finds the queue full."))
+
+    assert r.status_code == 503
+    assert not any(app.UPLOAD_DIR.iterdir())
+
+
+def test_delete_cancels_the_job(app) -> None:
+    client = TestClient(app.app)
+    job_id = client.post("/api/generate/text", json=text_request("A book nobody waits for. " * 10)).json()["job_id"]
+    while job_id not in app.SEGMENTS:
+        time.sleep(0.01)
+
+    assert client.delete(f"/api/jobs/{job_id}").status_code == 200
+    app.TTS_PROVIDERS["synthetic"].gate.set()
+
+    assert wait_for(app, job_id).status == "cancelled"
+    assert client.get(f"/api/jobs/{job_id}").json()["status"] == "cancelled"
+    assert not (app.OUTPUT_DIR / job_id).exists()
+    assert client.delete("/api/jobs/no-such-job").status_code == 404
+
+
+def test_audio_is_served_by_range_and_revalidated(app) -> None:
+    client = TestClient(app.app)
+    app.TTS_PROVIDERS["synthetic"].gate.set()
+    job_id = client.post("/api/generate/text", json=text_request("A book to listen to. " * 10)).json()["job_id"]
+    assert wait_for(app, job_id).status == "done"
+    url = app.JOBS.get(job_id).result["audio_url"]
+
+    full = client.get(url)
+    part = client.get(url, headers={"Range": "bytes=0-99"})
+    cached = client.get(url, headers={"If-None-Match": full.headers["etag"]})
+
+    assert full.status_code == 200
+    assert part.status_code == 206 and part.content == full.content[:100]
+    assert part.headers["content-range"] == f"bytes 0-99/{len(full.content)}"
+    assert cached.status_code == 304 and not cached.content
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import fitz
+import pytest
+
+from audiobooker.batch import find_pdfs, order_books, run_batch, write_report
+from audiobooker.generator import AudiobookGenerator
+from audiobooker.mp3_concat import write_silence
+from audiobooker.tts_providers import SharedLimit, TTSProvider
+
+
+class SilenceTTSProvider(TTSProvider):
+    """Waits like a remote call, then writes one second of valid MP3 silence."""
+
+    async def synthesize_async(self, text, out_path, voice=None):
+        await asyncio.sleep(0.01)
+        write_silence(out_path, 1.0)
+
+    def synthesize(self, text, out_path, voice=None):
+        write_silence(out_path, 1.0)
+
+
+def make_pdf(path: Path, pages: int) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        body = " ".join(f"Sentence {k} of page {i + 1} in {path.stem}." for k in range(12))
+        page.insert_textbox(fitz.Rect(72, 72, 540, 720), body, fontsize=11)
+    doc.save(str(path))
+    return path
+
+
+def test_find_pdfs_takes_files_directories_and_globs(tmp_path: Path) -> None:
+    a = make_pdf(tmp_path / "a.pdf", 1)
+    b = make_pdf(tmp_path / "shelf" / "b.pdf", 1)
+    c = make_pdf(tmp_path / "shelf" / "deep" / "c.PDF", 1)
+    (tmp_path / "shelf" / "notes.txt").write_text("not a book")
+
+    assert find_pdfs([str(tmp_path / "shelf")]) == [b.resolve(), c.resolve()]
+    assert find_pdfs([str(tmp_path / "**" / "*.pdf")]) == [a.resolve(), b.resolve()]
+    # duplicates are dropped, the first mention keeps its place
+    assert find_pdfs([str(b), str(a), str(tmp_path / "shelf"), str(tmp_path / "missing*.pdf")]) == \
+        [b.resolve(), a.resolve(), c.resolve()]
+
+
+def test_order_books(tmp_path: Path) -> None:
+    small = make_pdf(tmp_path / "small.pdf", 1)
+    mid = make_pdf(tmp_path / "mid.pdf", 3)
+    big = make_pdf(tmp_path / "big.pdf", 6)
+    pdfs = [mid, small, big]
+
+    assert order_books(pdfs, "largest") == [big, mid, small]
+    assert order_books(pdfs, "smallest") == [small, mid, big]
+    assert order_books(pdfs, "input") == pdfs
+    deadlines = {"small.pdf": datetime(2030, 1, 2), str(mid): datetime(2030, 1, 1)}
+    assert order_books(pdfs, "deadline", deadlines) == [mid, small, big]
+    with pytest.raises(ValueError):
+        order_books(pdfs, "random")
+
+
+def test_batch_continues_past_failures_and_shares_the_tts_limit(tmp_path: Path) -> None:
+    pdfs = [make_pdf(tmp_path / "books" / f"book{i}.pdf", 2 + i) for i in range(3)]
+    broken = tmp_path / "books" / "broken.pdf"
+    broken.write_bytes(b"%PDF-1.4 not really")
+    pdfs.append(broken)
+    limit = SharedLimit(2)
+
+    def make_generator(**kw):
+        return AudiobookGenerator(output_dir=str(tmp_path / "out"), chunk_size=200, chunk_overlap=0,
+                                  use_openclaw=False, play_vlc=False, tts_concurrency=4,
+                                  tts_provider=SilenceTTSProvider(), tts_limit=limit, **kw)
+
+    results = run_batch(order_books(pdfs, "largest"), make_generator, books=3, cpu_workers=1)
+
+    by_name = {Path(r.pdf).name: r for r in results}
+    assert by_name["broken.pdf"].status == "failed" and by_name["broken.pdf"].error
+    for i in range(3):
+        r = by_name[f"book{i}.pdf"]
+        assert r.status == "done", r.error
+        assert r.parts and all(os.path.getsize(p) > 0 for p in r.parts)
+        assert {"extract", "tts"} <= set(r.stage_seconds)
+        assert sum(r.stage_seconds.values()) == pytest.approx(r.seconds, abs=0.05)
+    # each book would put four requests in flight; the shared limit held all three to two
+    assert limit.peak == 2 and limit.in_flight == 0
+
+    report = write_report(results, str(tmp_path / "out" / "report.json"), 1.0, tts_peak_in_flight=limit.peak)
+    saved = json.loads((tmp_path / "out" / "report.json").read_text())
+    assert saved == report
+    assert (saved["books"], saved["done"], saved["failed"]) == (4, 3, 1)
+    assert [r["pdf"] for r in saved["results"]] == [r.pdf for r in results]
+
+
+def test_same_named_books_get_their_own_folders(tmp_path: Path) -> None:
+    first = make_pdf(tmp_path / "vol1" / "book.pdf", 2)
+    second = make_pdf(tmp_path / "vol2" / "book.pdf", 3)
+    other = make_pdf(tmp_path / "vol2" / "other.pdf", 1)
+    pdfs = find_pdfs([str(tmp_path)])
+
+    def make_generator(**kw):
+        return AudiobookGenerator(output_dir=str(tmp_path / "out"), chunk_size=200, chunk_overlap=0,
+                                  use_openclaw=False, play_vlc=False, tts_provider=SilenceTTSProvider(), **kw)
+
+    results = run_batch(pdfs, make_generator, books=3, cpu_workers=1)
+
+    folders = {Path(r.pdf).parent.name + "/" + Path(r.pdf).name: r.folder for r in results}
+    assert folders["vol2/other.pdf"] == "other"
+    assert folders["vol1/book.pdf"] != folders["vol2/book.pdf"] and folders["vol1/book.pdf"].startswith("book-")
+    for r in results:
+        assert r.status == "done", r.error
+        assert {Path(p).parent.name for p in r.parts} == {r.folder}
+        assert (tmp_path / "out" / r.folder / Path(r.pdf).name).is_file()  # each source moved to its own folder
+        manifest = json.loads((tmp_path / "out" / r.folder / "manifest.json").read_text())
+        assert manifest["complete"]
+    assert not first.exists() and not second.exists() and not other.exists()
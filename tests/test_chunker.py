@@ -0,0 +1,44 @@
+from audiobooker.chunker import chunk_text, iter_chunks, iter_chunks_stream, split_into_sentences
+
+TEXT = (
+    "The first sentence is short. Is the second one a question? "
+    "The third exclaims!\n\nA fourth sentence follows a blank line. "
+    "And the text ends without a terminator"
+)
+
+
+def test_split_into_sentences() -> None:
+    assert split_into_sentences(TEXT) == [
+        "The first sentence is short.",
+        "Is the second one a question?",
+        "The third exclaims!",
+        "A fourth sentence follows a blank line.",
+        "And the text ends without a terminator",
+    ]
+
+
+def test_chunks_break_between_sentences_and_record_offsets() -> None:
+    chunks = list(iter_chunks(TEXT, max_chars=70, overlap=0))
+
+    assert [c.text for c in chunks] == chunk_text(TEXT, max_chars=70, overlap=0)
+    assert all(len(c.text) <= 70 for c in chunks)
+    assert " ".join(c.text for c in chunks) == " ".join(split_into_sentences(TEXT))
+    for c in chunks:
+        assert " ".join(TEXT[c.start:c.end].split()) == " ".join(c.text.split())
+    assert [(c.sentence_start, c.sentence_end) for c in chunks] == [(0, 2), (2, 4), (4, 5)]
+
+
+def test_overlap_repeats_tail_words_of_previous_chunk() -> None:
+    chunks = list(iter_chunks(TEXT, max_chars=70, overlap=10))
+
+    assert chunks[1].text.startswith("a question? ")
+    assert chunks[1].sentence_start == 1
+    assert TEXT[chunks[1].start:].startswith("a question?")
+
+
+def test_stream_matches_whole_text_for_any_split() -> None:
+    text = " ".join([TEXT] * 6) + " Dr. Smith met Mr. Jones... Then left!? Yes."
+    expected = chunk_text(text, max_chars=70, overlap=15)
+    for size in (1, 3, 17, 64, len(text)):
+        pieces = [text[k:k + size] for k in range(0, len(text), size)]
+        assert list(iter_chunks_stream(pieces, max_chars=70, overlap=15)) == expected
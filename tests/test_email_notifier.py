@@ -0,0 +1,155 @@
+import socketserver
+import threading
+import time
+
+import pytest
+
+from audiobooker import metrics
+from audiobooker.email_notifier import NotificationQueue, SMTPSettings
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Just enough of an SMTP server (EHLO, AUTH PLAIN, MAIL, RCPT, DATA) to count connections and messages.
+
+    `temp_failures` answers that many MAIL commands with 451, `reject` holds
+    recipients refused with 550, and `drop_every` hangs up after that many
+    messages on one connection.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), SMTPSession)
+        self.connections = 0
+        self.logins = 0
+        self.messages = []
+        self.temp_failures = 0
+        self.reject = set()
+        self.drop_every = 0
+        self.lock = threading.Lock()
+
+
+class SMTPSession(socketserver.StreamRequestHandler):
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        sent = 0
+        rcpt = None
+        self.reply("220 stand-in ready")
+        for raw in self.rfile:
+            cmd = raw.decode().strip()
+            verb = cmd.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.reply("250-stand-in")
+                self.reply("250 AUTH PLAIN")
+            elif verb == "AUTH":
+                with server.lock:
+                    server.logins += 1
+                self.reply("235 ok")
+            elif verb == "MAIL":
+                with server.lock:
+                    fail = server.temp_failures > 0
+                    server.temp_failures -= fail
+                self.reply("451 try again later" if fail else "250 ok")
+            elif verb == "RCPT":
+                rcpt = cmd.split("<", 1)[1].rstrip(">")
+                self.reply("550 no such user" if rcpt in server.reject else "250 ok")
+            elif verb == "DATA":
+                self.reply("354 go ahead")
+                data = b"".join(iter(self.rfile.readline, b".\r\n"))
+                with server.lock:
+                    server.messages.append((rcpt, data))
+                self.reply("250 queued")
+                sent += 1
+                if server.drop_every and sent % server.drop_every == 0:
+                    return  # hang up
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:  # NOOP, RSET
+                self.reply("250 ok")
+
+
+@pytest.fixture
+def smtp():
+    server = SMTPStandIn()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def notifier(smtp, **kw) -> NotificationQueue:
+    settings = SMTPSettings(server="127.0.0.1", port=smtp.server_address[1], user="u", password="p",
+                            sender="books@example.com", starttls=False, timeout=5)
+    kw = {"batch_wait": 0.05, "backoff": 0.01, **kw}
+    return NotificationQueue(settings, **kw)
+
+
+def test_a_burst_shares_one_authenticated_connection(smtp) -> None:
+    q = notifier(smtp)
+    t0 = time.monotonic()
+    for k in range(20):
+        assert q.notify(f"reader{k}@example.com", f"Book {k}", f"http://host/b{k}.mp3")
+    assert time.monotonic() - t0 < 0.5  # queuing never waits for the server
+    q.close(timeout=10)
+
+    assert sorted(r for r, _ in smtp.messages) == sorted(f"reader{k}@example.com" for k in range(20))
+    assert b"http://host/b7.mp3" in dict(smtp.messages)["reader7@example.com"]
+    assert smtp.connections == smtp.logins == 1
+    assert q.stats.sent == 20 and q.stats.batches <= 2 and q.depth == 0
+
+
+def test_connection_is_reused_across_batches_and_reopened_when_dropped(smtp) -> None:
+    q = notifier(smtp)
+    q.notify("a@example.com", "A", "http://host/a")
+    time.sleep(0.3)
+    q.notify("b@example.com", "B", "http://host/b")
+    time.sleep(0.3)
+    assert q.stats.batches == 2 and smtp.connections == 1
+
+    smtp.drop_every = 3  # hangs up after a, b, c0 and again after c1..c3
+    for k in range(5):
+        q.notify(f"c{k}@example.com", "C", "http://host/c")
+    q.close(timeout=10)
+    assert q.stats.sent == len(smtp.messages) == 7 and smtp.connections == 3
+
+
+def test_temporary_failures_are_retried_and_rejections_dropped(smtp) -> None:
+    metrics.enable(True)
+    metrics.REGISTRY.reset()
+    smtp.temp_failures = 2
+    smtp.reject = {"nobody@example.com"}
+    q = notifier(smtp, retries=3)
+    for address in ("a@example.com", "nobody@example.com", "b@example.com"):
+        q.notify(address, "Book", "http://host/x")
+    q.close(timeout=10)
+
+    assert sorted(r for r, _ in smtp.messages) == ["a@example.com", "b@example.com"]
+    assert (q.stats.sent, q.stats.failed) == (2, 1) and q.stats.retries >= 2
+    assert metrics.NOTIFICATIONS.value(outcome="sent") == 2
+    assert metrics.NOTIFICATIONS.value(outcome="failed") == 1
+
+
+def test_gives_up_after_the_retries(smtp) -> None:
+    smtp.temp_failures = 100
+    q = notifier(smtp, retries=2)
+    q.notify("a@example.com", "Book", "http://host/x")
+    q.close(timeout=10)
+    assert (q.stats.sent, q.stats.failed, q.stats.retries) == (0, 1, 2)
+
+
+def test_full_queue_and_missing_settings_drop_the_message(smtp) -> None:
+    q = notifier(smtp, max_queue=1)
+    q.settings.password = None
+    assert not q.notify("a@example.com", "Book", "http://host/x")
+    q.settings.password = "p"
+    q._thread = threading.Thread()  # keep the sender from draining the queue
+    assert q.notify("a@example.com", "Book", "http://host/x")
+    assert not q.notify("b@example.com", "Book", "http://host/x")
+    assert q.stats.dropped == 2 and q.depth == 1
@@ -0,0 +1,92 @@
+from pathlib import Path
+
+import mutagen
+import pytest
+
+from audiobooker import encoder
+from audiobooker.encoder import Chapter, chapter_marks, encode_chapters, ffmetadata
+from audiobooker.generator import AudiobookGenerator
+from audiobooker.mp3_concat import write_silence
+from audiobooker.tts_providers import TTSProvider
+
+needs_ffmpeg = pytest.mark.skipif(not encoder.available(), reason="ffmpeg is not installed")
+
+
+class SilenceTTSProvider(TTSProvider):
+    """Writes 1.5 seconds of valid MP3 silence per chunk."""
+
+    def synthesize(self, text, out_path, voice=None):
+        write_silence(out_path, 1.5)
+
+
+def make_chapters(tmp_path: Path):
+    return [(f"Chapter {c + 1}", [write_silence(str(tmp_path / f"c{c}_{k}.mp3"), 1.2) for k in range(c + 1)])
+            for c in range(3)]
+
+
+def test_chapter_marks_follow_the_chunk_frames(tmp_path: Path) -> None:
+    marks = chapter_marks(make_chapters(tmp_path))
+    one = marks[0].end
+    assert one == pytest.approx(1.2, abs=0.05)
+    assert [m.title for m in marks] == ["Chapter 1", "Chapter 2", "Chapter 3"]
+    # chapter c has c + 1 chunks, laid end to end
+    assert [(m.start / one, m.end / one) for m in marks] == [(0, 1), pytest.approx((1, 3)), pytest.approx((3, 6))]
+
+
+def test_ffmetadata() -> None:
+    chapters = [Chapter("Intro; part=1", 0.0, 61.5), Chapter("Two", 61.5, 3725.25)]
+    meta = ffmetadata(chapters, title="Book #1")
+    assert meta.startswith(";FFMETADATA1\ntitle=Book \\#1\n")
+    assert "[CHAPTER]\nTIMEBASE=1/1000\nSTART=61500\nEND=3725250\ntitle=Two\n" in meta
+    assert "title=Intro\\; part\\=1\n" in meta
+
+    comments = ffmetadata(chapters, comments=True)
+    assert "[CHAPTER]" not in comments
+    assert "CHAPTER000=00:00:00.000\nCHAPTER000NAME=Intro\\; part\\=1\nCHAPTER001=00:01:01.500\n" in comments
+
+
+def test_unknown_format_is_rejected(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        encode_chapters(make_chapters(tmp_path), str(tmp_path / "book.wav"), "wav")
+    with pytest.raises(ValueError):
+        AudiobookGenerator(output_dir=str(tmp_path), use_openclaw=False, play_vlc=False, output_format="wav")
+
+
+@needs_ffmpeg
+@pytest.mark.parametrize("fmt", ["m4b", "opus"])
+def test_encode_chapters_writes_chapter_markers(tmp_path: Path, fmt: str) -> None:
+    chapters = make_chapters(tmp_path)
+    marks = chapter_marks(chapters)
+    out = tmp_path / f"book.{fmt}"
+
+    stats = encode_chapters(chapters, str(out), fmt, title="My Book")
+
+    assert stats.bytes == out.stat().st_size > 0
+    assert stats.audio_seconds == pytest.approx(marks[-1].end)
+    assert not list(tmp_path.glob("*.tmp")) and not list(tmp_path.glob("*.ffmeta"))
+    audio = mutagen.File(str(out))
+    assert audio.info.length == pytest.approx(marks[-1].end, abs=0.1)
+    if fmt == "m4b":
+        assert [(c.title, round(c.start, 2)) for c in audio.chapters] == [(m.title, round(m.start, 2)) for m in marks]
+        assert audio.tags["\xa9alb"] == ["My Book"]
+    else:
+        assert [audio.tags[f"chapter{n:03d}name"][0] for n in range(3)] == [m.title for m in marks]
+        assert audio.tags["chapter002"][0] == encoder._clock(marks[2].start)
+
+
+@needs_ffmpeg
+def test_generator_m4b_output_skips_chapter_files(tmp_path: Path) -> None:
+    out = tmp_path / "out"
+    gen = AudiobookGenerator(output_dir=str(out), chunk_size=60, chunk_overlap=0, use_openclaw=False,
+                             play_vlc=False, keep_chunks=True, tts_provider=SilenceTTSProvider(),
+                             output_format="m4b")
+    text = " ".join(f"Sentence number {i} of the sample book." for i in range(12))
+
+    parts = gen.process(text, is_text=True)
+
+    assert [Path(p).name for p in parts] == ["audiobook_part_001.m4b"]
+    assert not list(out.glob("*_full.mp3"))
+    chunks = list(out.glob("group*_c*.mp3"))
+    assert mutagen.File(parts[0]).info.length == pytest.approx(sum(mutagen.File(str(c)).info.length
+                                                                   for c in chunks), abs=0.2)
+    assert [st.format for st in gen.encode_stats] == ["m4b"]
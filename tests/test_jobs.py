@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+from audiobooker.jobs import JobManager, JobQueueFull
+
+
+def wait_for(job, timeout: float = 5.0) -> None:
+    deadline = time.time() + timeout
+    while job.status not in ("done", "failed", "cancelled") and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_job_reports_progress_and_result() -> None:
+    jobs = JobManager(max_workers=1)
+
+    def work(job, n):
+        for i in range(1, n + 1):
+            job.progress("tts", i, n)
+        return {"parts": n}
+
+    job = jobs.submit(work, 3)
+    wait_for(job)
+
+    assert job.status == "done"
+    assert job.result == {"parts": 3}
+    assert (job.done, job.total) == (3, 3)
+    jobs.shutdown()
+
+
+def test_running_job_stops_at_next_progress_report_when_cancelled() -> None:
+    jobs = JobManager(max_workers=1)
+    started = threading.Event()
+
+    def work(job):
+        started.set()
+        while True:
+            job.progress("tts", 0, 1)
+            time.sleep(0.01)
+
+    job = jobs.submit(work)
+    started.wait(5)
+    jobs.cancel(job.id)
+    wait_for(job)
+
+    assert job.status == "cancelled"
+    jobs.shutdown()
+
+
+def test_queue_depth_is_bounded() -> None:
+    jobs = JobManager(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    running = jobs.submit(lambda job: release.wait(5))
+    while running.status != "running":
+        time.sleep(0.01)
+    queued = jobs.submit(lambda job: None)
+    with pytest.raises(JobQueueFull):
+        jobs.submit(lambda job: None)
+
+    jobs.cancel(queued.id)
+    assert queued.status == "cancelled"
+    release.set()
+    jobs.shutdown()
+
+
+def test_jobs_with_the_same_key_coalesce_until_finished() -> None:
+    jobs = JobManager(max_workers=1)
+    release = threading.Event()
+    calls = []
+
+    def work(job):
+        calls.append(job.id)
+        release.wait(5)
+        return "audio"
+
+    first = jobs.submit(work, key="book")
+    assert jobs.submit(work, key="book") is first
+    other = jobs.submit(work, key="other book")
+    assert other is not first
+    release.set()
+    wait_for(first)
+    wait_for(other)
+
+    assert first.result == "audio" and calls == [first.id, other.id]
+    # a finished job is not joined again; the caller reuses its stored result or starts over
+    again = jobs.submit(work, key="book")
+    assert again is not first
+    wait_for(again)
+    jobs.shutdown()
+
+
+def test_job_cancelled_as_the_pool_starts_it_ends_cancelled() -> None:
+    jobs = JobManager(max_workers=1)
+    release = threading.Event()
+    blocker = jobs.submit(lambda job: release.wait(5))
+    while blocker.status != "running":
+        time.sleep(0.01)
+    job = jobs.submit(lambda job: "ran", key="k")
+    job._future.cancel = lambda: False  # as if the pool had already started it
+    jobs.cancel(job.id)
+    assert job.status == "queued"
+    release.set()
+    wait_for(job)
+
+    assert job.status == "cancelled" and job.result is None and job.finished_at is not None
+    assert jobs.queued == 0
+    again = jobs.submit(lambda job: "ran", key="k")  # not merged onto the cancelled job
+    wait_for(again)
+    assert again is not job and again.result == "ran"
+    jobs.shutdown()
+
+
+def test_finish_hook_runs_for_every_final_state() -> None:
+    finished = []
+    jobs = JobManager(max_workers=1, on_finish=lambda job: finished.append((job.id, job.status)))
+    release = threading.Event()
+
+    def fail(job):
+        raise RuntimeError("boom")
+
+    blocker = jobs.submit(lambda job: release.wait(5), job_id="ok")
+    while blocker.status != "running":
+        time.sleep(0.01)
+    jobs.submit(fail, job_id="failed")
+    jobs.cancel(jobs.submit(lambda job: None, job_id="cancelled").id)  # never starts
+    release.set()
+    wait_for(jobs.get("failed"))
+
+    assert sorted(finished) == [("cancelled", "cancelled"), ("failed", "failed"), ("ok", "done")]
+    jobs.shutdown()
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from audiobooker import local_tts
+from audiobooker.local_tts import LocalTTSProvider
+from audiobooker.mp3_concat import probe
+
+REPO = Path(__file__).resolve().parents[1]
+
+# Stand-ins for the engine and encoder: "speech" is silence lasting one second per 15 characters
+FAKE_ESPEAK = """
+import sys, wave
+args = sys.argv[1:]
+text = sys.stdin.read()
+if "fail" in text:
+    sys.exit("espeak-ng: cannot speak this")
+with wave.open(args[args.index("-w") + 1], "wb") as w:
+    w.setnchannels(1); w.setsampwidth(2); w.setframerate(22050)
+    w.writeframes(bytes(2 * round(len(text) / 15 * 22050)))
+"""
+FAKE_FFMPEG = """
+import sys, wave
+from audiobooker.mp3_concat import write_silence
+args = sys.argv[1:]
+with wave.open(args[args.index("-i") + 1]) as w:
+    seconds = w.getnframes() / w.getframerate()
+write_silence(args[-1], seconds, sample_rate=int(args[args.index("-ar") + 1]))
+"""
+
+
+@pytest.fixture
+def fake_tools(tmp_path: Path, monkeypatch) -> Path:
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name, body in (("espeak-ng", FAKE_ESPEAK), ("ffmpeg", FAKE_FFMPEG)):
+        tool = bin_dir / name
+        tool.write_text(f"#!{sys.executable}\n{body}")
+        tool.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("PYTHONPATH", str(REPO))
+    return bin_dir
+
+
+def test_chunks_are_synthesized_in_the_process_pool(tmp_path: Path, fake_tools: Path) -> None:
+    texts = [f"Chunk {k} " * (k + 3) for k in range(6)]
+    with LocalTTSProvider(workers=2) as tts:
+        assert tts.voice == "en-gb"
+        paths = tts.synthesize_many([(t, str(tmp_path / f"c{k}.mp3")) for k, t in enumerate(texts)], concurrency=4)
+        for text, path in zip(texts, paths):
+            assert probe(path).duration == pytest.approx(len(text) / 15, abs=0.1)
+        assert sorted(p.name for p in tmp_path.glob("c*")) == [f"c{k}.mp3" for k in range(6)]  # no temp files left
+
+        with pytest.raises(RuntimeError, match="cannot speak this"):
+            asyncio.run(tts.synthesize_async("fail", str(tmp_path / "bad.mp3")))
+        assert not list(tmp_path.glob("bad*"))
+
+
+def test_missing_engine_or_voice_is_reported(fake_tools: Path) -> None:
+    with pytest.raises(RuntimeError, match="piper"):
+        LocalTTSProvider(engine="piper")
+    with pytest.raises(ValueError, match="Unknown local TTS engine"):
+        LocalTTSProvider(engine="say")
+    (fake_tools / "piper").symlink_to(fake_tools / "espeak-ng")
+    with pytest.raises(ValueError, match="needs a voice"):
+        LocalTTSProvider(engine="piper")
+    assert LocalTTSProvider(engine="piper", voice="en_GB-alan-medium.onnx").voice == "en_GB-alan-medium.onnx"
+
+
+@pytest.mark.skipif(not local_tts.available(), reason="espeak-ng or ffmpeg/lame is not installed")
+def test_espeak_speaks(tmp_path: Path) -> None:
+    with LocalTTSProvider() as tts:
+        tts.synthesize("Hello from the local speech engine.", str(tmp_path / "hello.mp3"))
+    info = probe(str(tmp_path / "hello.mp3"))
+    assert info.duration > 1 and info.sample_rate == local_tts.SAMPLE_RATE
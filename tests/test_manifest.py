@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+
+from audiobooker.generator import AudiobookGenerator
+from audiobooker.mp3_concat import probe, write_silence
+from audiobooker.tts_providers import TTSProvider
+
+
+class SilenceTTSProvider(TTSProvider):
+    """Writes one second of valid MP3 silence per chunk and counts calls; can fail on demand."""
+
+    def __init__(self, fail_after=None):
+        self.calls = 0
+        self.fail_after = fail_after
+
+    def synthesize(self, text, out_path, voice=None):
+        if self.fail_after is not None and self.calls >= self.fail_after:
+            raise RuntimeError("TTS service dropped")
+        self.calls += 1
+        write_silence(out_path, 1.0)
+
+
+def make_generator(out: Path, tts: TTSProvider, resume: bool = False) -> AudiobookGenerator:
+    gen = AudiobookGenerator(output_dir=str(out), chunk_size=60, chunk_overlap=0, use_openclaw=False,
+                             play_vlc=False, tts_concurrency=1, resume=resume)
+    gen.tts = tts
+    return gen
+
+
+TEXT = " ".join(f"Sentence number {i} of the sample book." for i in range(40))
+
+
+def test_resume_only_synthesizes_missing_chunks(tmp_path: Path) -> None:
+    out = tmp_path / "out"
+    with pytest.raises(RuntimeError):
+        make_generator(out, SilenceTTSProvider(fail_after=5)).process(TEXT, is_text=True)
+
+    tts = SilenceTTSProvider()
+    parts = make_generator(out, tts, resume=True).process(TEXT, is_text=True)
+    assert tts.calls > 0 and len(parts) == 1
+    # every chunk synthesized exactly once across both runs
+    chunk_seconds = probe(write_silence(str(tmp_path / "one.mp3"), 1.0)).duration
+    assert probe(parts[0]).duration == pytest.approx((5 + tts.calls) * chunk_seconds, abs=0.05)
+
+    again = SilenceTTSProvider()
+    assert make_generator(out, again, resume=True).process(TEXT, is_text=True) == parts
+    assert again.calls == 0
+
+
+def test_modified_chunk_and_changed_settings_are_redone(tmp_path: Path) -> None:
+    out = tmp_path / "out"
+    gen = make_generator(out, SilenceTTSProvider(fail_after=3))
+    gen.keep_chunks = True
+    with pytest.raises(RuntimeError):
+        gen.process(TEXT, is_text=True)
+    first = sorted(out.glob("group*_c[0-9]*.mp3"))[0]
+    first.write_bytes(b"corrupt")
+
+    tts = SilenceTTSProvider()
+    gen = make_generator(out, tts, resume=True)
+    gen.keep_chunks = True
+    gen.process(TEXT, is_text=True)
+    n_chunks = len(list(out.glob("group*_c[0-9]*.mp3")))
+    assert tts.calls == n_chunks - 2  # the corrupted chunk is synthesized again
+
+    tts = SilenceTTSProvider()
+    gen = make_generator(out, tts, resume=True)
+    gen.voice = "en-US-AriaNeural"
+    gen.process(TEXT, is_text=True)
+    assert tts.calls == n_chunks
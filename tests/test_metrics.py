@@ -0,0 +1,43 @@
+import pytest
+
+from audiobooker import metrics
+
+
+@pytest.fixture
+def registry():
+    metrics.enable()
+    reg = metrics.Registry()
+    yield reg
+    metrics.enable(False)
+
+
+def test_render_prometheus_text(registry) -> None:
+    c = registry.register(metrics.Counter("t_items_total", "Items", labels=("kind",)))
+    h = registry.register(metrics.Histogram("t_seconds", "Time", labels=("stage",), buckets=(0.1, 1)))
+    registry.register(metrics.Gauge("t_depth", "Depth", lambda: 3))
+    c.inc(kind='a"b')
+    c.inc(2, kind='a"b')
+    h.observe(0.05, stage="x")
+    h.observe(0.5, stage="x")
+    with h.time(stage="y"):
+        pass
+
+    text = registry.render()
+    assert '# TYPE t_items_total counter\nt_items_total{kind="a\\"b"} 3.0' in text
+    assert 't_seconds_bucket{stage="x",le="0.1"} 1.0' in text
+    assert 't_seconds_bucket{stage="x",le="1.0"} 2.0' in text
+    assert 't_seconds_bucket{stage="x",le="+Inf"} 2.0' in text
+    assert 't_seconds_count{stage="x"} 2.0' in text
+    assert h.count(stage="y") == 1
+    assert "t_depth 3.0" in text
+
+
+def test_disabled_metrics_record_nothing(registry) -> None:
+    c = registry.register(metrics.Counter("t_off_total", "Off"))
+    h = registry.register(metrics.Histogram("t_off_seconds", "Off"))
+    metrics.enable(False)
+    c.inc()
+    with h.time():
+        h.observe(1.0)
+    assert c.value() == 0 and h.count() == 0
+    assert h.time() is h.time()  # the shared no-op context, nothing allocated per call
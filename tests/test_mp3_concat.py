@@ -0,0 +1,31 @@
+from pathlib import Path
+
+import pytest
+from mutagen.mp3 import MP3
+
+from audiobooker.mp3_concat import FormatMismatch, concat_mp3, probe, write_silence
+
+
+def test_concat_strips_tags_and_writes_info_header(tmp_path: Path) -> None:
+    a = write_silence(str(tmp_path / "a.mp3"), 4.0)
+    b = write_silence(str(tmp_path / "b.mp3"), 2.0)
+    # Wrap b in an ID3v2 header and an ID3v1 trailer, as encoders typically do
+    body = Path(b).read_bytes()
+    Path(b).write_bytes(b"ID3\x03\x00\x00\x00\x00\x00\x0a" + b"\x00" * 10 + body + b"TAG" + b"\x00" * 125)
+
+    out = concat_mp3([a, b], str(tmp_path / "out.mp3"))
+
+    info = probe(out)
+    assert info.frames == probe(a).frames + probe(b).frames
+    assert info.duration == pytest.approx(6.0, abs=0.05)
+    assert MP3(out).info.length == pytest.approx(info.duration)
+    # Re-joining an output must not count its Info frame as audio
+    again = concat_mp3([out], str(tmp_path / "again.mp3"))
+    assert probe(again).frames == info.frames
+
+
+def test_concat_rejects_mismatched_sample_rates(tmp_path: Path) -> None:
+    a = write_silence(str(tmp_path / "a.mp3"), 1.0, sample_rate=24000)
+    b = write_silence(str(tmp_path / "b.mp3"), 1.0, sample_rate=44100, kbps=128)
+    with pytest.raises(FormatMismatch):
+        concat_mp3([a, b], str(tmp_path / "out.mp3"))
@@ -0,0 +1,113 @@
+import threading
+from pathlib import Path
+
+import fitz
+import pytest
+
+from audiobooker import ocr
+from audiobooker.pdf_processor import extract_pages
+
+
+def make_mixed_pdf(path: Path) -> None:
+    """Pages 1 and 4 have a text layer; pages 2, 3 and 5 are scans (a page image, no text)."""
+    doc = fitz.open()
+    for i in range(1, 6):
+        page = doc.new_page()
+        page.insert_text((72, 40), "My Book Title", fontsize=10)
+        page.insert_textbox(fitz.Rect(72, 72, 540, 300), f"Page {i} tells the story in large print.", fontsize=20)
+        if i in (2, 3, 5):
+            pix = page.get_pixmap(dpi=100, colorspace=fitz.csGRAY)
+            scan = doc.new_page(-1, width=page.rect.width, height=page.rect.height)
+            scan.insert_image(scan.rect, pixmap=pix)
+            doc.delete_page(doc.page_count - 2)
+    doc.save(str(path))
+
+
+def fill_cache(pdf: Path, cache_dir: Path, pages) -> None:
+    """Record what OCR would read for the given 0-based pages, keyed like `ocr_page` keys them."""
+    cache = ocr.OCRCache(str(cache_dir))
+    with fitz.open(str(pdf)) as doc:
+        for idx in pages:
+            cache.put(ocr.page_key(doc[idx]), f"My Book Title\nScanned page {idx + 1} text.\n")
+
+
+def test_scanned_pages_are_read_from_the_ocr_cache_in_page_order(tmp_path: Path) -> None:
+    pdf = tmp_path / "mixed.pdf"
+    make_mixed_pdf(pdf)
+    fill_cache(pdf, tmp_path / "ocr", [1, 2, 4])
+
+    cache_dir = str(tmp_path / "ocr")
+    buffered = list(extract_pages(str(pdf), ocr_cache_dir=cache_dir))
+    assert [(p.page_no, p.ocr) for p in buffered] == [(1, False), (2, True), (3, True), (4, False), (5, True)]
+    # the OCR'd running header is detected and dropped like the text-layer one
+    assert [p.text for p in buffered if p.ocr] == [f"Scanned page {n} text." for n in (2, 3, 5)]
+    assert buffered[0].text == "Page 1 tells the story in large print."
+
+    for kwargs in (dict(stream=True), dict(stream=True, ocr_workers=1), dict(workers=2, pages_per_task=2)):
+        assert list(extract_pages(str(pdf), ocr_cache_dir=cache_dir, **kwargs)) == buffered, kwargs
+
+    without = list(extract_pages(str(pdf), ocr=False))
+    assert [p.text for p in without if p.page_no in (2, 3, 5)] == ["", "", ""]
+    assert not any(p.ocr for p in without)
+
+
+def test_needs_ocr() -> None:
+    assert ocr.needs_ocr("") and ocr.needs_ocr("  12 \n")
+    assert not ocr.needs_ocr("Chapter One")
+
+
+def test_page_key_identifies_the_page_image(tmp_path: Path) -> None:
+    pdf = tmp_path / "mixed.pdf"
+    make_mixed_pdf(pdf)
+    copy = tmp_path / "copy.pdf"
+    with fitz.open(str(pdf)) as doc:
+        keys = [ocr.page_key(page) for page in doc]
+        assert ocr.page_key(doc[1], lang="deu") != keys[1]
+        assert ocr.page_key(doc[1], dpi=150) != keys[1]
+        doc.save(str(copy), garbage=3)
+    assert len(set(keys)) == len(keys)
+    with fitz.open(str(copy)) as doc:
+        assert [ocr.page_key(page) for page in doc] == keys
+
+
+@pytest.mark.skipif(not ocr.available(), reason="tesseract is not installed")
+def test_tesseract_reads_scanned_pages(tmp_path: Path) -> None:
+    pdf = tmp_path / "mixed.pdf"
+    make_mixed_pdf(pdf)
+    cache_dir = tmp_path / "ocr"
+
+    pages = list(extract_pages(str(pdf), ocr_cache_dir=str(cache_dir)))
+    for p in pages:
+        if p.ocr:
+            assert f"Page {p.page_no} tells the story" in " ".join(p.text.split())
+    assert len(list(cache_dir.glob("??/*.txt"))) == 3
+    text, cached = ocr.ocr_page(str(pdf), 1, str(cache_dir))
+    assert cached
+
+
+def test_two_pdfs_ocr_at_once_in_threads(tmp_path: Path) -> None:
+    def make_scanned_pdf(path: Path, pages: int) -> None:
+        doc = fitz.open()
+        for i in range(pages):
+            src = fitz.open()
+            src.new_page().insert_text((72, 72), f"Scanned page {i}", fontsize=20)
+            doc.new_page().insert_image(fitz.Rect(0, 0, 612, 792), pixmap=src[0].get_pixmap(dpi=50))
+        doc.save(str(path))
+
+    errors, counts = [], {}
+
+    def extract(name: str) -> None:
+        pdf = tmp_path / f"{name}.pdf"
+        make_scanned_pdf(pdf, 40)
+        try:
+            for _ in range(4):
+                counts[name] = len(list(extract_pages(str(pdf), stream=True, ocr_cache_dir=str(tmp_path / "ocr"))))
+        except Exception as e:  # one job closing the other's document used to land here
+            errors.append(e)
+
+    threads = [threading.Thread(target=extract, args=(name,)) for name in ("a", "b")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == [] and set(counts) == {"a", "b"}
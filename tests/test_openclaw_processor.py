@@ -0,0 +1,87 @@
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+from audiobooker.openclaw_processor import OpenClawProcessor, merge_windows, split_windows
+
+STUB = r'''
+import json, os, re, sys, time
+msg = sys.argv[sys.argv.index("--message") + 1]
+with open(os.environ["OPENCLAW_STUB_LOG"], "a") as log:
+    log.write(f"start {time.time()}\n")
+time.sleep(float(os.environ.get("OPENCLAW_STUB_DELAY", "0")))
+body = msg.split("--- TEXT START ---\n", 1)[1].rsplit("\n--- TEXT END ---", 1)[0]
+if "text cleaning" in msg:
+    print(re.sub(r"PAGE \d+ ", "", body))
+else:
+    print(json.dumps([{"title": m.group(1), "start": m.group(0)}
+                      for m in re.finditer(r"(Chapter \d+)\. [^.]*\.", body)]))
+with open(os.environ["OPENCLAW_STUB_LOG"], "a") as log:
+    log.write(f"end {time.time()}\n")
+'''
+
+
+@pytest.fixture
+def stub_openclaw(tmp_path: Path, monkeypatch) -> Path:
+    """Put a fake `openclaw` executable first on PATH; returns its call log."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    exe = bin_dir / "openclaw"
+    exe.write_text(f"#!{sys.executable}\n{STUB}")
+    exe.chmod(exe.stat().st_mode | stat.S_IEXEC)
+    log = tmp_path / "calls.log"
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("OPENCLAW_STUB_LOG", str(log))
+    return log
+
+
+def book(n_chapters: int = 12, noisy: bool = True) -> str:
+    parts = []
+    for c in range(1, n_chapters + 1):
+        sentences = [f"Chapter {c}. It opens here."]
+        for s in range(15):
+            noise = f"PAGE {c * 100 + s} " if noisy and s % 5 == 0 else ""
+            sentences.append(f"{noise}Sentence {s} of chapter {c} goes on.")
+        parts.append("\n".join(sentences))
+    return "\n".join(parts)
+
+
+def test_windows_overlap_on_sentence_boundaries_and_merge_back() -> None:
+    sentences = [f"Sentence number {i} is here." for i in range(200)]
+    text = " ".join(sentences)
+    windows = split_windows(text, window_chars=500, overlap_chars=100)
+    assert windows[0][0] == 0 and windows[-1][1] == 200
+    for (_, prev_end), (start, _) in zip(windows, windows[1:]):
+        assert 0 < prev_end - start <= 4
+    pieces = [" ".join(sentences[i:j]) for i, j in windows]
+    overlaps = [prev_end - start for (_, prev_end), (start, _) in zip(windows, windows[1:])]
+    assert " ".join(merge_windows(pieces, overlaps).split()) == text
+
+
+def test_map_reduce_cleans_and_splits_the_whole_book(stub_openclaw: Path, tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("OPENCLAW_STUB_DELAY", "0.2")
+    oc = OpenClawProcessor(window_chars=1500, window_overlap=200, parallelism=4, cache_dir=str(tmp_path / "cache"),
+                           use_sessions=False)
+    cleaned = oc.clean_text(book())
+    assert " ".join(cleaned.split()) == " ".join(book(noisy=False).split())
+
+    starts = [float(l.split()[1]) for l in stub_openclaw.read_text().splitlines() if l.startswith("start")]
+    ends = [float(l.split()[1]) for l in stub_openclaw.read_text().splitlines() if l.startswith("end")]
+    assert len(starts) > 4
+    assert sum(s < min(ends) for s in starts) > 1  # several windows were in flight at once
+
+    chapters = oc.split_into_chapters(cleaned)
+    calls = stub_openclaw.read_text().count("start")
+    assert [c["title"] for c in chapters] == [f"Chapter {c}" for c in range(1, 13)]
+    assert all(c["content"].startswith(c["title"] + ".") for c in chapters)
+    assert "".join(c["content"] for c in chapters).replace("\n", "") == cleaned.replace("\n", "")
+
+    # A fresh processor sharing the cache directory makes no agent calls
+    monkeypatch.setenv("OPENCLAW_STUB_DELAY", "0")
+    again = OpenClawProcessor(window_chars=1500, window_overlap=200, cache_dir=str(tmp_path / "cache"), use_sessions=False)
+    assert again.clean_text(book()) == cleaned
+    assert again.split_into_chapters(cleaned) == chapters
+    assert stub_openclaw.read_text().count("start") == calls
@@ -0,0 +1,130 @@
+from pathlib import Path
+
+import fitz
+import pytest
+
+from audiobooker.pdf_processor import ENGINES, TableStats, extract_pages, might_have_table
+from test_smoke import make_sample_pdf
+
+
+def test_streaming_and_parallel_match_buffered(tmp_path: Path) -> None:
+    pdf = tmp_path / "new.pdf"
+    make_sample_pdf(pdf)
+
+    buffered = list(extract_pages(str(pdf)))
+    streamed = list(extract_pages(str(pdf), stream=True))
+    parallel = list(extract_pages(str(pdf), workers=2, pages_per_task=1))
+
+    assert [p.page_no for p in buffered] == [1, 2, 3]
+    assert streamed == buffered
+    assert parallel == buffered
+
+
+def test_engines_produce_the_same_pages(tmp_path: Path) -> None:
+    pdf = tmp_path / "new.pdf"
+    make_sample_pdf(pdf)
+
+    reference = list(extract_pages(str(pdf), engine="pdfplumber"))
+    for engine in ("fitz", "auto"):
+        assert list(extract_pages(str(pdf), engine=engine)) == reference
+
+
+def make_table_pdf(path: Path) -> dict:
+    """Write pages with ruled tables of assorted shapes and pages with ruling lines that are not tables.
+
+    Returns {page_no: number of tables drawn on it}.
+    """
+    doc = fitz.open()
+    prose = " ".join(f"Sentence {k} keeps the narrative going." for k in range(40))
+    expected = {}
+
+    def rect_grid(page, left, top, rows, cols, w=90, h=18):
+        for r in range(rows):
+            for c in range(cols):
+                cell = fitz.Rect(left + c * w, top + r * h, left + (c + 1) * w, top + (r + 1) * h)
+                page.draw_rect(cell, width=0.5)
+                page.insert_text((cell.x0 + 3, cell.y1 - 5), f"R{r} C{c} cell", fontsize=8)
+
+    def line_grid(page, left, top, rows, cols, w=90, h=18):
+        for r in range(rows + 1):
+            page.draw_line((left, top + r * h), (left + cols * w, top + r * h), width=0.5)
+        for c in range(cols + 1):
+            page.draw_line((left + c * w, top), (left + c * w, top + rows * h), width=0.5)
+        for r in range(rows):
+            for c in range(cols):
+                page.insert_text((left + c * w + 3, top + (r + 1) * h - 5), f"V{r}{c} item", fontsize=8)
+
+    tables = [
+        lambda p: rect_grid(p, 72, 420, 5, 3),
+        lambda p: rect_grid(p, 300, 430, 2, 1),  # one column, header + one row
+        lambda p: rect_grid(p, 72, 600, 1, 4),  # a single ruled row
+        lambda p: line_grid(p, 100, 450, 6, 2),
+        lambda p: (rect_grid(p, 72, 420, 3, 2), line_grid(p, 72, 560, 4, 4, w=60)),
+    ]
+    decoys = [
+        lambda p: None,
+        lambda p: [p.draw_line((72, y), (540, y), width=0.3) for y in range(90, 700, 14)],  # underlines
+        lambda p: p.draw_rect(fitz.Rect(60, 60, 552, 710), width=1),  # page frame
+        lambda p: [
+            p.draw_line(a, b, width=0.3)
+            for x in range(60, 552, 6)
+            for a, b in (((x, 60), (x + 3, 60)), ((x, 710), (x + 3, 710)))
+        ] + [p.draw_line((60, y), (60, y + 3)) for y in range(60, 710, 6)],  # dashed border
+        lambda p: [p.draw_line((72, y), (540, y)) for y in (100, 300, 500)] + [p.draw_line((300, 90), (300, 96))],
+    ]
+    for i in range(20):
+        page = doc.new_page()
+        page.insert_text((72, 40), "Table Book", fontsize=10)
+        page.insert_textbox(fitz.Rect(72, 72, 540, 400), prose, fontsize=11)
+        if i % 2:
+            tables[i // 2 % len(tables)](page)
+            expected[i + 1] = 2 if i // 2 % len(tables) == 4 else 1
+        else:
+            decoys[i // 2 % len(decoys)](page)
+    doc.save(str(path))
+    return expected
+
+
+def test_might_have_table_needs_two_cells() -> None:
+    assert might_have_table([10, 30, 50], [0, 100])
+    assert might_have_table([10, 30], [0, 100, 200])
+    assert not might_have_table([10, 30], [0, 100])  # a single frame
+    assert not might_have_table([10, 10.5, 30], [0, 100])  # one ruling drawn twice
+    assert not might_have_table(range(0, 700, 14), [])  # underlines
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_auto_table_mode_keeps_every_table(tmp_path: Path, engine: str) -> None:
+    pdf = tmp_path / "tables.pdf"
+    expected = make_table_pdf(pdf)
+
+    always_stats, auto_stats, never_stats = TableStats(), TableStats(), TableStats()
+    always = list(extract_pages(str(pdf), engine=engine, table_mode="always", table_stats=always_stats))
+    auto = list(extract_pages(str(pdf), engine=engine, table_mode="auto", table_stats=auto_stats))
+    never = list(extract_pages(str(pdf), engine=engine, table_mode="never", table_stats=never_stats))
+
+    found = {p.page_no: len(p.tables) for p in always if p.tables}
+    if engine == "fitz":  # PyMuPDF's finder drops the single-column table
+        assert found.items() <= expected.items()
+    else:
+        assert found == expected
+    assert auto == always  # full recall: every table "always" finds, "auto" finds too
+    assert auto_stats.extracted == len(expected)
+    assert auto_stats.audited == 1 and auto_stats.skipped == 20 - len(expected) - 1 and auto_stats.missed == 0
+    assert auto_stats.tables == always_stats.tables == sum(found.values())
+    assert always_stats.skipped == 0 and never_stats.skipped == 20
+    assert all(not p.tables for p in never)
+    assert [p.text for p in never] == [p.text for p in always]
+
+
+def test_table_stats_add_up_across_workers(tmp_path: Path) -> None:
+    pdf = tmp_path / "tables.pdf"
+    make_table_pdf(pdf)
+
+    serial, parallel = TableStats(), TableStats()
+    pages = list(extract_pages(str(pdf), stream=True, table_stats=serial))
+    assert list(extract_pages(str(pdf), workers=2, pages_per_task=3, table_stats=parallel)) == pages
+    assert (parallel.pages, parallel.extracted, parallel.tables) == (serial.pages, serial.extracted, serial.tables)
+    # each worker audits the first page it rules out
+    assert parallel.skipped + parallel.audited == serial.skipped + serial.audited == 10
+    assert parallel.audited == 7 and serial.audited == 1
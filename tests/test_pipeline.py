@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import fitz
+import pytest
+
+from audiobooker.generator import AudiobookGenerator
+from audiobooker.mp3_concat import probe, write_silence
+from audiobooker.pipeline import Pipeline, PipelineAborted
+from audiobooker.tts_providers import TTSProvider
+
+TEXT = " ".join(f"Sentence number {i} of the **sample** book." for i in range(60))
+
+
+class RecordingTTSProvider(TTSProvider):
+    """One second of MP3 silence per chunk; records what it was asked and can fail on request."""
+
+    def __init__(self, fail_at=None):
+        self.texts = []
+        self.fail_at = fail_at
+
+    async def synthesize_async(self, text, out_path, voice=None):
+        await asyncio.sleep(0.005)
+        if self.fail_at is not None and len(self.texts) >= self.fail_at:
+            raise RuntimeError("TTS service unavailable")
+        self.texts.append(text)
+        write_silence(out_path, 1.0)
+
+    def synthesize(self, text, out_path, voice=None):
+        write_silence(out_path, 1.0)
+
+
+def make_generator(out: Path, tts, **kw) -> AudiobookGenerator:
+    kw = {"chunk_size": 200, "chunk_overlap": 0, "split_seconds": 3600, **kw}
+    return AudiobookGenerator(output_dir=str(out), use_openclaw=False, play_vlc=False, tts_provider=tts, **kw)
+
+
+def test_channel_backpressure_and_order() -> None:
+    got = []
+    with Pipeline() as pipe:
+        ch = pipe.channel(2)
+
+        def produce():
+            for k in range(20):
+                ch.put(k)
+            ch.close()
+
+        pipe.spawn(produce)
+        for item in ch:
+            time.sleep(0.002)
+            got.append(item)
+    assert got == list(range(20))
+    assert ch.peak <= 2
+
+
+def test_failing_stage_stops_the_others() -> None:
+    blocked = threading.Event()
+    aborted = []
+
+    def stuck(ch):
+        blocked.set()
+        try:
+            ch.get()  # nothing will ever arrive
+        except PipelineAborted:
+            aborted.append(True)
+            raise
+
+    def broken():
+        blocked.wait()
+        raise ValueError("bad page")
+
+    with pytest.raises(ValueError, match="bad page"):
+        with Pipeline() as pipe:
+            pipe.spawn(stuck, pipe.channel(1))
+            pipe.spawn(broken)
+    assert aborted == [True]
+
+
+def test_pipelined_output_matches_sequential(tmp_path: Path) -> None:
+    seq_tts, pipe_tts = RecordingTTSProvider(), RecordingTTSProvider()
+    seq = make_generator(tmp_path / "seq", seq_tts).process(TEXT, is_text=True)
+    piped = make_generator(tmp_path / "pipe", pipe_tts, pipeline=True).process(TEXT, is_text=True)
+
+    assert pipe_tts.texts == seq_tts.texts
+    assert [Path(p).name for p in piped] == [Path(p).name for p in seq]
+    assert probe(piped[0]).duration == pytest.approx(probe(seq[0]).duration)
+
+
+def test_streamed_text_is_cut_into_parts_while_synthesizing(tmp_path: Path) -> None:
+    tts = RecordingTTSProvider()
+    gen = make_generator(tmp_path, tts, pipeline=True, split_seconds=30)
+    chars_per_part = round(30 * gen.duration_model.chars_per_sec(gen.voice, gen._tts_rate()))
+    parts = gen.process(TEXT, is_text=True)
+
+    # a part is closed at the first chunk boundary at or past `split_seconds` worth of text
+    per_part, chars = [0], 0
+    for text in tts.texts:
+        per_part[-1] += 1
+        chars += len(text)
+        if chars >= chars_per_part:
+            per_part.append(0)
+            chars = 0
+    per_part = [n for n in per_part if n]
+    assert len(parts) == len(per_part) > 1
+    assert [Path(p).name for p in parts] == [f"audiobook_part_{k + 1:03d}.mp3" for k in range(len(parts))]
+    assert [round(probe(p).duration) for p in parts] == per_part  # one second of audio per chunk
+
+
+def test_tts_failure_propagates_and_resume_skips_finished_work(tmp_path: Path) -> None:
+    failing = RecordingTTSProvider(fail_at=5)
+    gen = make_generator(tmp_path, failing, pipeline=True, split_seconds=8, resume=True)
+    with pytest.raises(RuntimeError, match="TTS service unavailable"):
+        gen.process(TEXT, is_text=True)
+    assert len(failing.texts) == 5
+
+    tts = RecordingTTSProvider()
+    parts = make_generator(tmp_path, tts, pipeline=True, split_seconds=8, resume=True).process(TEXT, is_text=True)
+    full = RecordingTTSProvider()
+    expected = make_generator(tmp_path / "full", full, pipeline=True, split_seconds=8).process(TEXT, is_text=True)
+
+    # only the chunks the first run did not finish are synthesized again
+    assert failing.texts + tts.texts == full.texts
+    assert [Path(p).name for p in parts] == [Path(p).name for p in expected]
+    assert sum(probe(p).duration for p in parts) == pytest.approx(len(full.texts), abs=0.1)
+
+    again = RecordingTTSProvider()
+    assert make_generator(tmp_path, again, pipeline=True, split_seconds=8, resume=True).process(
+        TEXT, is_text=True) == parts
+    assert again.texts == []
+
+
+def test_synthesis_starts_before_extraction_ends(tmp_path: Path) -> None:
+    doc = fitz.open()
+    for i in range(12):
+        body = " ".join(f"Sentence {k} of page {i + 1} in the long book." for k in range(12))
+        doc.new_page().insert_textbox(fitz.Rect(72, 72, 540, 720), body, fontsize=11)
+    pdf = tmp_path / "book.pdf"
+    doc.save(str(pdf))
+
+    events = []
+    tts = RecordingTTSProvider()
+    gen = make_generator(tmp_path / "out", tts, pipeline=True)
+    record_extraction = gen._record_extraction
+    gen._record_extraction = lambda *a: (events.append("extracted"), record_extraction(*a))
+    gen.on_segment = lambda index, path: events.append("chunk")
+    parts = gen.process(str(pdf))
+
+    assert len(parts) == 1 and events.count("chunk") == len(tts.texts) > 4
+    assert events.index("chunk") < events.index("extracted")
@@ -0,0 +1,57 @@
+import itertools
+import random
+from pathlib import Path
+
+import pytest
+
+from audiobooker.mp3_concat import write_silence
+from audiobooker.planner import DurationModel, balanced_partition, mp3_duration, plan_audio_files
+
+
+def brute_force_cost(durations, target):
+    n = len(durations)
+    best = float("inf")
+    for mask in itertools.product((0, 1), repeat=n - 1):
+        cuts = [0] + [i + 1 for i, m in enumerate(mask) if m] + [n]
+        best = min(best, sum((sum(durations[s:e]) - target) ** 2 for s, e in zip(cuts, cuts[1:])))
+    return best
+
+
+def test_balanced_partition_is_optimal_and_contiguous() -> None:
+    rng = random.Random(7)
+    for _ in range(200):
+        durations = [rng.uniform(60, 2400) for _ in range(rng.randint(1, 9))]
+        target = rng.choice([600, 1800, 3600])
+        parts = balanced_partition(durations, target)
+        assert [s for s, _ in parts][0] == 0 and parts[-1][1] == len(durations)
+        assert all(e == s2 for (_, e), (s2, _) in zip(parts, parts[1:]))
+        cost = sum((sum(durations[s:e]) - target) ** 2 for s, e in parts)
+        assert cost == pytest.approx(brute_force_cost(durations, target))
+        assert balanced_partition(durations, target) == parts
+
+
+def test_model_calibrates_from_mp3_headers_and_persists(tmp_path: Path) -> None:
+    chunk = write_silence(str(tmp_path / "c.mp3"), 10.0)
+    assert mp3_duration(chunk) == pytest.approx(10.0, abs=0.05)
+    assert mp3_duration(str(tmp_path / "missing.mp3")) is None
+
+    path = tmp_path / "model.json"
+    model = DurationModel.load(str(path))
+    uncalibrated = model.estimate(1000, "v")
+    for _ in range(50):
+        model.observe_file(chunk, 200, "v", "0%")  # 20 chars/sec
+    assert model.chars_per_sec("v", "0%") == pytest.approx(20.0, rel=0.05)
+    assert model.estimate(1000, "other") == uncalibrated
+    model.save()
+    assert DurationModel.load(str(path)).chars_per_sec("v", "0%") == model.chars_per_sec("v", "0%")
+
+
+def test_plan_packs_whole_chapters_near_target() -> None:
+    model = DurationModel()
+    for _ in range(100):
+        model.observe(1500, 100.0, "v")  # 15 chars/sec
+    chapters = [{"title": f"c{i}", "content": "x" * n} for i, n in enumerate([9000, 27000, 18000, 9000, 36000, 4500])]
+    plan = plan_audio_files(chapters, 3600, model=model, voice="v")
+    assert [c for group in plan for c in group] == chapters
+    hours = [sum(model.estimate(len(c["content"]), "v") for c in group) / 3600 for group in plan]
+    assert len(plan) == 2 and all(0.9 < h < 1.05 for h in hours)
@@ -0,0 +1,68 @@
+import io
+import os
+import time
+from pathlib import Path
+
+from audiobooker.manifest import file_sha256
+from audiobooker.results import ResultStore, job_key, save_upload
+
+
+def make_output(root: Path, job_id: str, size: int) -> None:
+    (root / job_id).mkdir(parents=True)
+    (root / job_id / "audiobook_part_001.mp3").write_bytes(b"\xff" * size)
+
+
+def test_save_upload_streams_and_hashes(tmp_path: Path) -> None:
+    data = os.urandom(3 * 1024 * 1024 + 7)
+    dest = tmp_path / "book.pdf"
+
+    digest = save_upload(io.BytesIO(data), dest, block_size=64 * 1024)
+
+    assert dest.read_bytes() == data
+    assert digest == file_sha256(str(dest))
+    assert not (tmp_path / "book.pdf.part").exists()
+
+
+def test_job_key_covers_the_settings() -> None:
+    settings = {"voice": "en-GB-RyanNeural", "use_openclaw": True, "chunk_size": 4000}
+
+    assert job_key("abc", settings) == job_key("abc", dict(reversed(list(settings.items()))))
+    assert job_key("abc", settings) != job_key("abd", settings)
+    assert job_key("abc", settings) != job_key("abc", {**settings, "voice": "en-US-AriaNeural"})
+
+
+def test_store_returns_results_and_survives_restart(tmp_path: Path) -> None:
+    store = ResultStore(tmp_path)
+    make_output(tmp_path, "job1", 100)
+    store.put("key1", "job1", {"audio_url": "/api/download/job1/audiobook_part_001.mp3"})
+
+    entry = ResultStore(tmp_path).get("key1")
+    assert entry["job_id"] == "job1" and entry["bytes"] == 100
+    assert entry["result"]["audio_url"].endswith("audiobook_part_001.mp3")
+    assert store.get("missing") is None
+
+    # outputs deleted behind the store's back are not served
+    (tmp_path / "job1" / "audiobook_part_001.mp3").unlink()
+    (tmp_path / "job1").rmdir()
+    assert store.get("key1") is None and len(store) == 0
+
+
+def test_eviction_by_size_and_age(tmp_path: Path) -> None:
+    evicted = []
+    store = ResultStore(tmp_path, max_bytes=250, max_age=3600, on_evict=evicted.append)
+    for n in range(3):
+        make_output(tmp_path, f"job{n}", 100)
+        store.put(f"key{n}", f"job{n}", {})
+        time.sleep(0.01)
+    # job0 was least recently used when job2 pushed the total over budget
+    assert evicted == ["job0"] and not (tmp_path / "job0").exists()
+    assert store.size_bytes == 200
+
+    store.get("key1")
+    store.max_bytes = 150
+    assert store.evict() == 1 and evicted == ["job0", "job2"]
+
+    store.max_age = 0
+    time.sleep(0.01)
+    assert store.get("key1") is None
+    assert evicted == ["job0", "job2", "job1"] and not (tmp_path / "job1").exists()
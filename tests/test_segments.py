@@ -0,0 +1,27 @@
+from pathlib import Path
+
+import pytest
+
+from audiobooker.mp3_concat import write_silence
+from audiobooker.segments import SegmentStore
+
+
+def test_only_contiguous_segments_are_ready_and_seekable(tmp_path: Path) -> None:
+    store = SegmentStore(str(tmp_path / "segments"))
+    for i in (1, 0, 3):
+        src = write_silence(str(tmp_path / f"c{i}.mp3"), 2.0)
+        store.add(i, src)
+        Path(src).unlink()  # the generator deletes its chunk files
+
+    assert store.ready == 2
+    assert store.ready_seconds() == pytest.approx(4.0, abs=0.05)
+    index, offset = store.locate(3.0)
+    assert index == 1 and offset == pytest.approx(1.0, abs=0.05)
+    assert len(store.read(1, offset)) < len(store.read(1))
+    assert "#EXT-X-ENDLIST" not in store.playlist(str)
+
+    store.add(2, write_silence(str(tmp_path / "c2.mp3"), 2.0))
+    store.finish()
+    playlist = store.playlist(lambda i: f"seg/{i}.mp3")
+    assert playlist.count("#EXTINF") == 4 and playlist.endswith("#EXT-X-ENDLIST\n")
+    assert SegmentStore.load(str(tmp_path / "segments")).ready == 4
@@ -0,0 +1,87 @@
+import json
+import os
+import time
+from email.utils import formatdate
+from pathlib import Path
+
+import pytest
+
+from audiobooker.manifest import MANIFEST_NAME, file_sha256
+from audiobooker.mp3_concat import write_silence
+from audiobooker.serving import (FileInfoCache, RangeNotSatisfiable, not_modified, parse_range, range_applies,
+                                 recorded_parts)
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-99", (0, 100)),
+    ("bytes=100-", (100, 1000)),
+    ("bytes=900-5000", (900, 1000)),
+    ("bytes=-100", (900, 1000)),
+    ("bytes=-5000", (0, 1000)),
+    ("bytes=0-1,5-9", None),  # several ranges: the whole file is sent
+    ("bytes=9-1", None),
+    ("bytes=abc", None),
+    ("items=0-1", None),
+])
+def test_parse_range(header, expected) -> None:
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=2000-3000", "bytes=-0"])
+def test_range_past_the_end_is_not_satisfiable(header) -> None:
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, 1000)
+
+
+def test_conditional_requests() -> None:
+    etag, mtime = '"abc"', 1_700_000_000.5
+    stamp = formatdate(int(mtime), usegmt=True)
+
+    assert not_modified({"if-none-match": '"x", W/"abc"'}, etag, mtime)
+    assert not_modified({"if-none-match": "*"}, etag, mtime)
+    assert not not_modified({"if-none-match": '"x"', "if-modified-since": stamp}, etag, mtime)
+    assert not_modified({"if-modified-since": stamp}, etag, mtime)
+    assert not not_modified({"if-modified-since": formatdate(int(mtime) - 10, usegmt=True)}, etag, mtime)
+    assert not not_modified({"if-modified-since": "yesterday"}, etag, mtime)
+    assert not not_modified({}, etag, mtime)
+
+    assert range_applies({}, etag, mtime)
+    assert range_applies({"if-range": etag}, etag, mtime)
+    assert range_applies({"if-range": stamp}, etag, mtime)
+    assert not range_applies({"if-range": '"old"'}, etag, mtime)
+    assert not range_applies({"if-range": 'W/"abc"'}, etag, mtime)
+
+
+def test_etag_comes_from_manifest_or_content_and_follows_rewrites(tmp_path: Path) -> None:
+    part = Path(write_silence(str(tmp_path / "audiobook_part_001.mp3"), 2.0))
+    loose = Path(write_silence(str(tmp_path / "audiobook_part_002.mp3"), 1.0))
+    (tmp_path / MANIFEST_NAME).write_text(json.dumps(
+        {"parts": {part.name: {"chunks": [], "sha256": "f" * 64}}, "complete": True}))
+    info = FileInfoCache()
+
+    assert info.etag(part) == '"' + "f" * 32 + '"'  # recorded checksum, no hashing
+    assert info.etag(loose) == '"' + file_sha256(str(loose))[:32] + '"'
+    assert info.duration(part) == pytest.approx(2.0, abs=0.05)
+
+    # a part rewritten after its manifest entry is hashed again
+    time.sleep(0.01)
+    write_silence(str(part), 3.0)
+    os.utime(part, ns=(time.time_ns() + 10**9,) * 2)
+    assert info.etag(part) == '"' + file_sha256(str(part))[:32] + '"'
+    assert info.duration(part) == pytest.approx(3.0, abs=0.05)
+
+
+def test_recorded_parts_lists_finished_parts_of_text_and_pdf_jobs(tmp_path: Path) -> None:
+    book = tmp_path / "book"
+    book.mkdir()
+    for name in ("audiobook_part_002.mp3", "audiobook_part_001.mp3"):
+        write_silence(str(book / name), 1.0)
+    (book / MANIFEST_NAME).write_text(json.dumps({"parts": {
+        "audiobook_part_002.mp3": {}, "audiobook_part_001.mp3": {}, "audiobook_part_003.mp3": {}},
+        "complete": False}))
+
+    assert recorded_parts(tmp_path) == [(book / "audiobook_part_001.mp3", False),
+                                        (book / "audiobook_part_002.mp3", False)]
+    assert recorded_parts(book) == recorded_parts(tmp_path)
+    assert recorded_parts(tmp_path / "missing") == []
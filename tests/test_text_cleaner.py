@@ -0,0 +1,98 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from audiobooker.text_cleaner import _clean_passes, clean_markdown, iter_clean_markdown
+
+GOLDEN = [
+    ("", ""),
+    ("# Title\n\nSome **bold** and _italic_ `code`.", "Title\n\nSome bold and italic code."),
+    # links are rewritten before images, so an image with alt text keeps its "!"
+    ("See [the docs](http://x.y/z) and ![logo](img.png) here.", "See the docs and !logo here."),
+    ("Logo: ![](img.png) done", "Logo: done"),
+    ("| a | b |\n|---|:-:|\n| 1 | 2 |", ", a , b ,\n\n, 1 , 2 ,"),
+    ("Intro\n\n---\n\nBody ~~struck~~ text", "Intro\n\nBody struck text"),
+    ("too    many   spaces\n\n\n\n\nand lines", "too many spaces\n\nand lines"),
+    ("  * item one\n  * item two  ", "item one\n item two"),
+    ("#\n\n  # not a header\nnext", "# not a header\nnext"),
+    ("a * b\n*\n\nc", "a b\n\nc"),
+    ("Table summary: Name: Alpha; Value: 1 | Name: Beta; Value: 2", "Table summary: Name: Alpha; Value: 1 , Name: Beta; Value: 2"),
+]
+
+
+def reference(text: str) -> str:
+    return _clean_passes(text).strip() if text else ""
+
+
+def book_text(pages: int) -> list[str]:
+    """Page texts shaped like `_build_plan` output: prose, running header, table summaries, some markdown."""
+    rnd = random.Random(pages)
+    words = "the quick brown fox jumps over a lazy dog while narrators read chapters aloud".split()
+    out = []
+    for i in range(1, pages + 1):
+        lines = [f"My Book Title {i}"]
+        for _ in range(rnd.randint(5, 25)):
+            line = " ".join(rnd.choice(words) for _ in range(rnd.randint(3, 14)))
+            line = rnd.choice(["{}", "*{}*", "{} | {}", "## {}", "{}  {}", "[{}](http://example.com/{})", "{}\n\n\n"]).format(line, i)
+            lines.append(line)
+        if i % 7 == 0:
+            lines += ["| Name | Value |", "|------|------:|", f"| Item | {i} |", "", "***", ""]
+        out.append("\n".join(lines) + "\n")
+        if i % 5 == 0:
+            out.append(f"\n\nTable summary: Name: Item {i}; Value: {i * 3} | Name: Other; Value: 1\n")
+    return out
+
+
+@pytest.mark.parametrize("text,expected", GOLDEN)
+def test_golden_outputs(text: str, expected: str) -> None:
+    assert reference(text) == expected
+    assert clean_markdown(text) == expected
+    assert "".join(iter_clean_markdown([text])) == expected
+
+
+def test_matches_reference_passes_on_corpus() -> None:
+    readme = (Path(__file__).resolve().parents[1] / "README.md").read_text(encoding="utf-8")
+    book = "".join(book_text(400))
+    assert len(book) > 1 << 17  # long enough to be cleaned in several segments
+    for text in (readme, book, readme * 40):
+        assert clean_markdown(text) == reference(text)
+
+
+def test_matches_reference_passes_on_random_markup() -> None:
+    rnd = random.Random(0)
+    alphabet = list("ab1 ") * 3 + list("\n\n\t*_`~|-:#[]()!.") + ["---", "| --- |", "](", "\n\n\n", "# ", "a\nb"]
+    for _ in range(3000):
+        text = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 50)))
+        assert clean_markdown(text) == reference(text), repr(text)
+
+
+def test_streaming_matches_whole_text() -> None:
+    rnd = random.Random(1)
+    pages = book_text(60)
+    whole = reference("".join(pages))
+    for segment_chars in (1, 50, 1000, 1 << 16):
+        assert "".join(iter_clean_markdown(pages, segment_chars=segment_chars)) == whole
+    alphabet = ["a\nb", "x", "\n", "[", "]", "(", ")", "](", "!", "#", "-", "|", " ", "*", "\n\n\n", "[q\nr](s\nt)"]
+    for _ in range(2000):
+        text = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 30)))
+        cuts = sorted(rnd.sample(range(len(text) + 1), min(len(text) + 1, 3)))
+        split = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+        got = "".join(iter_clean_markdown(split, segment_chars=rnd.randint(1, 10)))
+        assert got == reference(text), repr(split)
+
+
+def test_streaming_yields_before_input_is_exhausted() -> None:
+    consumed = 0
+
+    def pages():
+        nonlocal consumed
+        for page in book_text(200):
+            consumed += 1
+            yield page
+
+    it = iter_clean_markdown(pages(), segment_chars=2000)
+    first = next(it)
+    assert first and consumed < 20
+    rest = "".join(it)
+    assert first + rest == reference("".join(book_text(200)))
@@ -0,0 +1,63 @@
+import os
+from pathlib import Path
+
+from audiobooker.tts_cache import CachedTTSProvider, TTSCache, cache_key
+from audiobooker.tts_providers import StubTTSProvider
+
+
+class CountingStub(StubTTSProvider):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def synthesize(self, text, out_path, voice=None):
+        self.calls += 1
+        super().synthesize(text, out_path, voice)
+
+
+def test_repeated_chunks_are_served_from_cache(tmp_path: Path) -> None:
+    cache = TTSCache(str(tmp_path / "cache"))
+    inner = CountingStub()
+    tts = CachedTTSProvider(inner, cache)
+
+    tts.synthesize("Hello   world.", str(tmp_path / "a.mp3"))
+    tts.synthesize("Hello world.\n", str(tmp_path / "b.mp3"))
+    tts.synthesize("Hello world.", str(tmp_path / "c.mp3"), voice="other")
+
+    assert inner.calls == 2
+    assert cache.stats.hits == 1 and cache.stats.misses == 2
+    assert (tmp_path / "a.mp3").read_bytes() == (tmp_path / "b.mp3").read_bytes()
+    assert not list((tmp_path / "cache").glob("*/*.tmp"))
+
+
+def test_eviction_drops_least_recently_used(tmp_path: Path) -> None:
+    src = tmp_path / "audio.mp3"
+    src.write_bytes(b"x" * 100)
+    cache = TTSCache(str(tmp_path / "cache"), max_bytes=250)
+    keys = [cache_key(f"t{i}", "v", "0%", "P") for i in range(3)]
+
+    for i, k in enumerate(keys[:2]):
+        cache.put(k, str(src))
+        os.utime(cache.path_for(k), (1000 + i, 1000 + i))
+    assert cache.get(keys[0], str(tmp_path / "hit.mp3"))  # keys[0] becomes most recent
+    cache.put(keys[2], str(src))
+
+    assert cache.path_for(keys[0]).exists()
+    assert not cache.path_for(keys[1]).exists()
+    assert cache.path_for(keys[2]).exists()
+    assert cache.size_bytes == 200
+    assert cache.stats.evictions == 1
+
+
+def test_rewriting_a_key_counts_only_the_size_difference(tmp_path: Path) -> None:
+    src = tmp_path / "audio.mp3"
+    cache = TTSCache(str(tmp_path / "cache"), max_bytes=1000)
+    key = cache_key("t", "v", "0%", "P")
+
+    src.write_bytes(b"x" * 100)
+    cache.put(key, str(src))
+    cache.put(key, str(src))
+    assert cache.size_bytes == 100
+    src.write_bytes(b"x" * 60)
+    cache.put(key, str(src))
+    assert cache.size_bytes == 60 and cache.stats.evictions == 0
@@ -0,0 +1,146 @@
+import asyncio
+import random
+import time
+from pathlib import Path
+
+import pytest
+
+from audiobooker import metrics
+from audiobooker.generator import AudiobookGenerator
+from audiobooker.mp3_concat import probe, write_silence
+from audiobooker.tts_control import CircuitOpenError, ResilientTTSProvider
+from audiobooker.tts_providers import FaultyTTSProvider, StubTTSProvider, provider_name
+
+
+class FlakyTTSProvider(StubTTSProvider):
+    """Fails each of the first `failures` calls with `error`, then writes one second of silence."""
+
+    def __init__(self, failures: int, error=ConnectionError, latency: float = 0.0) -> None:
+        super().__init__(latency=latency)
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    async def synthesize_async(self, text, out_path, voice=None):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error("service unavailable")
+        await super().synthesize_async(text, out_path, voice)
+        write_silence(out_path, 1.0)
+
+
+def control(inner, **kw) -> ResilientTTSProvider:
+    kw = {"backoff": 0.001, "max_backoff": 0.01, "rng": random.Random(0), **kw}
+    return ResilientTTSProvider(inner, **kw)
+
+
+def test_retries_transient_failures_but_not_fatal_ones(tmp_path: Path) -> None:
+    metrics.enable(True)
+    metrics.REGISTRY.reset()
+    tts = control(FlakyTTSProvider(failures=2), retries=3)
+    tts.synthesize("hello", str(tmp_path / "a.mp3"))
+
+    assert (tmp_path / "a.mp3").exists()
+    assert (tts.stats.successes, tts.stats.failures, tts.stats.retries) == (1, 2, 2)
+    assert tts.stats.errors == {"ConnectionError": 2}
+    assert metrics.TTS_RETRIES.value(provider="FlakyTTSProvider") == 2
+    assert provider_name(tts) == "FlakyTTSProvider" and tts.voice == "stub"
+
+    with pytest.raises(ConnectionError):
+        control(FlakyTTSProvider(failures=5), retries=2).synthesize("hello", str(tmp_path / "b.mp3"))
+    fatal = FlakyTTSProvider(failures=5, error=ValueError)
+    with pytest.raises(ValueError):
+        control(fatal, retries=3).synthesize("hello", str(tmp_path / "c.mp3"))
+    assert fatal.calls == 1
+
+
+def test_hung_request_times_out_and_is_retried(tmp_path: Path) -> None:
+    class HangsOnce(FlakyTTSProvider):
+        async def synthesize_async(self, text, out_path, voice=None):
+            if self.calls == 0:
+                self.calls += 1
+                await asyncio.sleep(10)
+            await super().synthesize_async(text, out_path, voice)
+
+    tts = control(HangsOnce(failures=0), timeout=0.05)
+    t0 = time.monotonic()
+    tts.synthesize("hello", str(tmp_path / "a.mp3"))
+
+    assert time.monotonic() - t0 < 1.0
+    assert tts.stats.timeouts == 1 and tts.stats.successes == 1
+
+
+def test_circuit_opens_fails_fast_and_closes_after_a_good_probe(tmp_path: Path) -> None:
+    inner = FlakyTTSProvider(failures=3)
+    tts = control(inner, retries=0, breaker_failures=3, breaker_cooldown=0.2)
+    for k in range(3):
+        with pytest.raises(ConnectionError):
+            tts.synthesize("hello", str(tmp_path / f"{k}.mp3"))
+    assert tts.state == "open" and tts.stats.circuit_opens == 1
+
+    with pytest.raises(CircuitOpenError):
+        tts.synthesize("hello", str(tmp_path / "x.mp3"))
+    assert inner.calls == 3  # the open circuit kept the request from the service
+
+    time.sleep(0.25)
+    tts.synthesize("hello", str(tmp_path / "y.mp3"))  # the half-open probe succeeds
+    assert tts.state == "closed" and inner.calls == 4
+
+
+def test_requests_wait_out_an_open_circuit_within_their_retries(tmp_path: Path) -> None:
+    tts = control(FlakyTTSProvider(failures=2), retries=4, breaker_failures=2, breaker_cooldown=0.1)
+
+    async def run():
+        await asyncio.gather(*(tts.synthesize_async("hello", str(tmp_path / f"{k}.mp3")) for k in range(6)))
+
+    asyncio.run(run())
+    assert tts.stats.circuit_opens == 1 and tts.stats.successes == 6
+
+
+def test_adaptive_limit_backs_off_under_throttling_and_recovers(tmp_path: Path) -> None:
+    service = FaultyTTSProvider(latency=0.02, capacity=8)
+    tts = control(service, max_limit=16, initial_limit=2, retries=8, breaker_failures=100)
+    finished = []
+
+    async def run():
+        t0 = time.monotonic()
+
+        async def one(k):
+            await tts.synthesize_async("text " * 100, str(tmp_path / f"{k}.mp3"))
+            finished.append(time.monotonic() - t0)
+
+        async def throttle():
+            await asyncio.sleep(0.6)
+            service.capacity = 2
+            await asyncio.sleep(0.6)
+            service.capacity = 8
+
+        sem = asyncio.Semaphore(16)  # the generator's own cap
+
+        async def bounded(k):
+            async with sem:
+                await one(k)
+
+        await asyncio.gather(throttle(), *(bounded(k) for k in range(500)))
+
+    asyncio.run(run())
+
+    def rate(a, b):
+        return sum(a <= t < b for t in finished) / (b - a)
+
+    assert tts.stats.successes == 500 and tts.stats.decreases > 0
+    assert tts.stats.limit_low <= 2 and tts.stats.limit_high >= 7
+    assert rate(0.6, 1.2) < rate(0.2, 0.6)  # the throttling bites...
+    assert rate(1.4, 2.0) >= 0.8 * rate(0.2, 0.6)  # ...and throughput is back once it ends
+    assert service.rejected < 100
+
+
+def test_generator_survives_transient_tts_failures(tmp_path: Path) -> None:
+    text = " ".join(f"Sentence number {i} of the sample book." for i in range(30))
+    gen = AudiobookGenerator(output_dir=str(tmp_path), chunk_size=200, chunk_overlap=0, use_openclaw=False,
+                             play_vlc=False, tts_provider=FlakyTTSProvider(failures=3), tts_retries=3)
+    gen.tts_control.backoff = 0.001
+    parts = gen.process(text, is_text=True)
+
+    assert len(parts) == 1 and probe(parts[0]).duration > 0
+    assert gen.tts_control.stats.failures == 3 and gen.tts_control.stats.failures <= gen.tts_control.stats.retries
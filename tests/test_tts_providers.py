@@ -0,0 +1,111 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import wave
+from pathlib import Path
+
+import pytest
+
+from audiobooker.generator import AudiobookGenerator
+from audiobooker.mp3_concat import probe
+from audiobooker.tts_providers import (LimitedTTSProvider, SharedLimit, StubTTSProvider, SyntheticTTSProvider,
+                                       make_tts_provider, provider_name)
+
+
+class CountingStub(StubTTSProvider):
+    """Stub that records the peak number of concurrent synthesize calls."""
+
+    def __init__(self, latency: float) -> None:
+        super().__init__(latency=latency)
+        self.active = 0
+        self.peak = 0
+
+    async def synthesize_async(self, text, out_path, voice=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await super().synthesize_async(text, out_path, voice)
+        finally:
+            self.active -= 1
+
+
+def test_synthesize_many_preserves_order_and_bounds_concurrency(tmp_path: Path) -> None:
+    tts = CountingStub(latency=0.01)
+    jobs = [(f"chunk {k}", str(tmp_path / f"c{k:03d}.mp3")) for k in range(20)]
+
+    out = tts.synthesize_many(jobs, concurrency=3)
+
+    assert out == [p for _, p in jobs]
+    assert all(Path(p).stat().st_size > 0 for p in out)
+    assert tts.peak == 3
+
+
+def test_default_async_runs_blocking_synthesize(tmp_path: Path) -> None:
+    tts = StubTTSProvider()
+    out = tmp_path / "a.mp3"
+    # The base-class async path delegates to the blocking implementation
+    asyncio.run(super(StubTTSProvider, tts).synthesize_async("hi", str(out)))
+    assert out.exists()
+
+
+def test_shared_limit_spans_event_loops_in_different_threads(tmp_path: Path) -> None:
+    limit = SharedLimit(3)
+    tts = [LimitedTTSProvider(CountingStub(latency=0.01), limit) for _ in range(4)]
+
+    def run(k: int) -> list[str]:
+        jobs = [(f"chunk {i}", str(tmp_path / f"t{k}_c{i:03d}.mp3")) for i in range(10)]
+        return tts[k].synthesize_many(jobs, concurrency=3)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        outs = list(pool.map(run, range(4)))
+
+    assert all(len(out) == 10 and all(Path(p).exists() for p in out) for out in outs)
+    assert limit.peak == 3 and limit.in_flight == 0
+    assert provider_name(tts[0]) == "CountingStub"
+
+
+def test_shared_limit_can_be_resized_while_in_use() -> None:
+    limit = SharedLimit(1)
+    active = peak = 0
+
+    async def one(k: int) -> None:
+        nonlocal active, peak
+        async with limit:
+            active += 1
+            peak = max(peak, active)
+            if k == 0:
+                limit.set_limit(4)  # frees three more slots for the waiting requests
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def run() -> None:
+        await asyncio.gather(*(one(k) for k in range(8)))
+
+    asyncio.run(run())
+    assert peak == 4 and limit.in_flight == 0
+
+
+def test_synthetic_audio_is_deterministic_and_as_long_as_the_text(tmp_path: Path) -> None:
+    tts = make_tts_provider("synthetic")
+    assert isinstance(tts, SyntheticTTSProvider) and tts.voice == "synthetic"
+    text = "Thirty characters of the text."
+    tts.synthesize(text, str(tmp_path / "a.mp3"))
+    tts.synthesize(text, str(tmp_path / "b.mp3"))
+    tts.synthesize(text, str(tmp_path / "c.wav"))
+
+    assert (tmp_path / "a.mp3").read_bytes() == (tmp_path / "b.mp3").read_bytes()
+    assert probe(str(tmp_path / "a.mp3")).duration == pytest.approx(2.0, abs=0.05)
+    with wave.open(str(tmp_path / "c.wav")) as w:
+        assert w.getnframes() / w.getframerate() == pytest.approx(2.0)
+    with pytest.raises(ValueError, match="Unknown TTS provider"):
+        make_tts_provider("nope")
+
+
+def test_generator_picks_providers_by_name(tmp_path: Path) -> None:
+    gen = AudiobookGenerator(output_dir=str(tmp_path), use_openclaw=False, play_vlc=False, chunk_size=300,
+                             chunk_overlap=0, tts_provider="synthetic")
+    assert gen.voice == "synthetic" and gen._manifest_settings()["tts_provider"] == "SyntheticTTSProvider"
+    text = " ".join(f"Sentence number {i} of the sample book." for i in range(40))
+    parts = gen.process(text, is_text=True)
+
+    assert len(parts) == 1
+    assert probe(parts[0]).duration == pytest.approx(len(text) / 15, rel=0.05)
@@ -1,10 +1,16 @@
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-import shutil
+import asyncio
+import atexit
+import json
+import mimetypes
 import os
+import shutil
+import time
 from pathlib import Path
+from urllib.parse import quote
 import uuid
 from typing import Optional
 
@@ -12,8 +18,20 @@ from typing import Optional
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
+from audiobooker import metrics
 from audiobooker.generator import AudiobookGenerator
-from audiobooker.email_notifier import send_notification_email
+from audiobooker.email_notifier import NotificationQueue
+from audiobooker.encoder import OUTPUT_FORMATS
+from audiobooker.manifest import text_sha256
+from audiobooker.jobs import JobManager, JobQueueFull, TERMINAL
+from audiobooker.segments import SegmentStore
+from audiobooker.serving import (IMMUTABLE, REVALIDATE, FileInfoCache, RangeNotSatisfiable, http_date,
+                                 not_modified, parse_range, range_applies, recorded_parts)
+from audiobooker.pdf_processor import ENGINES, TABLE_MODES
+from audiobooker.planner import DurationModel
+from audiobooker.results import ResultStore, job_key, save_upload
+from audiobooker.tts_cache import TTSCache
+from audiobooker.tts_providers import make_tts_provider
 
 app = FastAPI()
 
@@ -26,9 +44,163 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 OUTPUT_DIR = Path("ui_outputs")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# Shared across jobs so repeated text/voice combinations skip synthesis
+TTS_CACHE = TTSCache(
+    os.getenv("AUDIOBOOKER_TTS_CACHE_DIR", "tts_cache"),
+    max_bytes=int(os.getenv("AUDIOBOOKER_TTS_CACHE_MB", "2048")) * 1024 * 1024,
+)
+
+# OCR text of scanned pages, cached by page image across jobs
+OCR_CACHE_DIR = os.getenv("AUDIOBOOKER_OCR_CACHE_DIR", "ocr_cache")
+
+# Encoded parts are served with their own content type
+mimetypes.add_type("audio/mp4", ".m4b")
+mimetypes.add_type("audio/ogg", ".opus")
+
+# Speech-rate calibration shared by all jobs, so part planning improves as books are generated
+DURATION_MODEL = DurationModel.load(os.getenv("AUDIOBOOKER_DURATION_MODEL", "duration_model.json"))
+
+def _forget_job(job) -> None:
+    """However a job ends, forget the emails merged onto it (a successful job has already queued them).
+
+    Only a successful job's outputs go to RESULTS, which deletes them in time; a
+    failed or cancelled job's folder and segment index are dropped here.
+    """
+    NOTIFY.pop(job.id, None)
+    if job.status != "done":
+        SEGMENTS.pop(job.id, None)
+        shutil.rmtree(OUTPUT_DIR / job.id, ignore_errors=True)
+
+# Generation runs in the background; requests only enqueue work
+JOBS = JobManager(
+    max_workers=int(os.getenv("AUDIOBOOKER_MAX_JOBS", "2")),
+    max_queue=int(os.getenv("AUDIOBOOKER_MAX_QUEUE", "16")),
+    on_finish=_forget_job,
+)
+SSE_POLL_SECONDS = 0.5
+
+# Prometheus metrics at /metrics (set AUDIOBOOKER_METRICS=0 to turn instrumentation off)
+metrics.enable(os.getenv("AUDIOBOOKER_METRICS", "1") != "0")
+metrics.REGISTRY.register(metrics.Gauge("audiobooker_jobs_queued", "Jobs waiting for a worker", lambda: JOBS.queued))
+metrics.REGISTRY.register(metrics.Gauge("audiobooker_jobs_running", "Jobs currently generating", lambda: JOBS.running))
+# Per-job chunk audio, served while the rest of the book is still generating
+SEGMENTS: dict = {}
+
+# Finished jobs by input hash and settings: an identical request gets the stored outputs back.
+# Outputs unused for the max age are deleted, then the least recently used while over the size budget.
+RESULTS = ResultStore(
+    OUTPUT_DIR,
+    max_bytes=int(os.getenv("AUDIOBOOKER_RESULTS_MB", "10240")) * 1024 * 1024,
+    max_age=float(os.getenv("AUDIOBOOKER_RESULTS_MAX_AGE_HOURS", "168")) * 3600,
+    on_evict=lambda job_id: SEGMENTS.pop(job_id, None),
+)
+CHUNK_SIZE = int(os.getenv("AUDIOBOOKER_CHUNK_SIZE", "4000"))
+# Every job retries failed TTS requests and adapts its requests in flight to the service
+TTS_CONTROL = dict(
+    tts_retries=int(os.getenv("AUDIOBOOKER_TTS_RETRIES", "3")),
+    tts_adaptive=os.getenv("AUDIOBOOKER_TTS_ADAPTIVE", "1") != "0",
+)
+# TTS providers a request may pick with `tts_provider`; each is created once and shared by all jobs,
+# so a local engine keeps one process pool
+TTS_PROVIDER_NAMES = os.getenv("AUDIOBOOKER_TTS_PROVIDERS", "edge,local").split(",")
+TTS_PROVIDERS: dict = {}
+# Generator options that change the audio, and so the job key
+RESULT_SETTINGS = ("voice", "tts_provider", "use_openclaw", "chunk_size", "extract_engine", "table_mode", "ocr",
+                   "output_format", "pipeline")
+# Emails of requests coalesced onto a running job, notified along with its own
+NOTIFY: dict = {}
+# "Audiobook ready" emails go out from a background sender over one reused SMTP connection,
+# so a slow mail server never holds up a job; whatever is queued is sent before exit
+NOTIFIER = NotificationQueue()
+metrics.REGISTRY.register(metrics.Gauge("audiobooker_notifications_queued", "Notification emails waiting to be sent",
+                                        lambda: NOTIFIER.depth))
+atexit.register(NOTIFIER.close, timeout=30)
+
+# ETags and durations of served audio, computed once per file version
+FILE_INFO = FileInfoCache()
+# Behind nginx, set to an `internal` location aliasing OUTPUT_DIR (e.g. "/protected/"): the app then only
+# checks the request and nginx sends the file itself with sendfile, ranges included
+ACCEL_REDIRECT = os.getenv("AUDIOBOOKER_ACCEL_REDIRECT", "")
+
+class FileRangeResponse(Response):
+    """`count` bytes of the file at `path` from `offset`.
+
+    Sent zero-copy when the ASGI server offers the zerocopysend (any range) or
+    pathsend (whole file) extension; otherwise read in blocks off the event
+    loop, stopping early if the client goes away.
+    """
+
+    block_size = 256 * 1024
+
+    def __init__(self, path: Path, offset: int, count: int, size: int, status_code: int, headers: dict,
+                 media_type: str) -> None:
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.path, self.offset, self.count, self.size = path, offset, count, size
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        extensions = scope.get("extensions") or {}
+        if scope["method"] == "HEAD" or not self.count:
+            await send({"type": "http.response.body", "body": b""})
+        elif "http.response.zerocopysend" in extensions:
+            with open(self.path, "rb") as f:
+                await send({"type": "http.response.zerocopysend", "file": f, "offset": self.offset,
+                            "count": self.count})
+        elif "http.response.pathsend" in extensions and self.count == self.size:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+        else:
+            await self._send_blocks(receive, send)
+
+    async def _send_blocks(self, receive, send) -> None:
+        async def disconnected():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        watcher = asyncio.create_task(disconnected())
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                left = self.count
+                while left and not watcher.done():
+                    block = await asyncio.to_thread(f.read, min(self.block_size, left))
+                    left = left - len(block) if block else 0
+                    await send({"type": "http.response.body", "body": block, "more_body": bool(left)})
+        finally:
+            watcher.cancel()
+
+def _serve_file(request: Request, path: Path, media_type: str, immutable: bool,
+                filename: Optional[str] = None) -> Response:
+    """Serve a finished audio file with a strong ETag, conditional 304s and byte ranges."""
+    path = path.resolve()
+    st = path.stat()
+    etag = FILE_INFO.etag(path, st)
+    headers = {"ETag": etag, "Last-Modified": http_date(st.st_mtime), "Accept-Ranges": "bytes",
+               "Cache-Control": IMMUTABLE if immutable else REVALIDATE}
+    if not_modified(request.headers, etag, st.st_mtime):
+        return Response(status_code=304, headers=headers)
+    if filename:
+        quoted = quote(filename)
+        headers["Content-Disposition"] = (f'attachment; filename="{filename}"' if quoted == filename
+                                          else f"attachment; filename*=utf-8''{quoted}")
+    if ACCEL_REDIRECT:
+        headers["X-Accel-Redirect"] = ACCEL_REDIRECT + quote(path.relative_to(OUTPUT_DIR.resolve()).as_posix())
+        return Response(headers=headers, media_type=media_type)
+    byte_range = None
+    if range_applies(request.headers, etag, st.st_mtime):
+        try:
+            byte_range = parse_range(request.headers.get("range"), st.st_size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{st.st_size}", **headers})
+    start, end = byte_range or (0, st.st_size)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{st.st_size}"
+    headers["Content-Length"] = str(end - start)
+    return FileRangeResponse(path, start, end - start, st.st_size, 206 if byte_range else 200, headers, media_type)
+
 class TextRequest(BaseModel):
     text: str
-    voice: str = "en-GB-RyanNeural"
+    voice: Optional[str] = None  # the provider's default voice when omitted
+    tts_provider: str = "edge"
     openclaw: bool = True
     email: Optional[str] = None
 
@@ -36,90 +208,291 @@ class TextRequest(BaseModel):
 async def read_index():
     return FileResponse("ui/static/index.html")
 
+def _job_urls(job_id: str) -> dict:
+    return {
+        "job_id": job_id,
+        "status_url": f"/api/jobs/{job_id}",
+        "events_url": f"/api/jobs/{job_id}/events",
+        "stream_url": f"/api/jobs/{job_id}/stream.mp3",
+        "playlist_url": f"/api/jobs/{job_id}/playlist.m3u8",
+    }
+
+def _job_key(source_hash: str, gen_kwargs: dict) -> str:
+    return job_key(source_hash, {k: gen_kwargs.get(k) for k in RESULT_SETTINGS})
+
+def _submit(fn, *args, label: str = "", job_id: str, key: str, email: Optional[str] = None):
+    """Return (id of the job serving the request, response).
+
+    A stored result for `key` is returned at once (200); a queued or running job
+    with the same key takes the request over (202, `coalesced`); otherwise `fn`
+    is queued as job `job_id`.
+    """
+    stored = RESULTS.get(key)
+    if stored is not None:
+        metrics.JOB_REQUESTS.inc(outcome="reused")
+        return stored["job_id"], JSONResponse(content={"status": "done", "reused": True,
+                                                       **_job_urls(stored["job_id"]), **stored["result"]})
+    try:
+        job = JOBS.submit(fn, *args, label=label, job_id=job_id, key=key)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    coalesced = job.id != job_id
+    if coalesced and email:
+        NOTIFY.setdefault(job.id, []).append(email)
+    metrics.JOB_REQUESTS.inc(outcome="coalesced" if coalesced else "new")
+    return job.id, JSONResponse(status_code=202, content={"status": job.status, "coalesced": coalesced,
+                                                          **_job_urls(job.id)})
+
+def _tts_provider(name: str):
+    """The shared provider registered as `name`; 400 if it is not offered or cannot run here."""
+    if name not in TTS_PROVIDER_NAMES:
+        raise HTTPException(status_code=400, detail=f"Unknown tts_provider; choose from {TTS_PROVIDER_NAMES}")
+    if name not in TTS_PROVIDERS:
+        try:
+            TTS_PROVIDERS[name] = make_tts_provider(name)
+        except (RuntimeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"TTS provider {name} is unavailable: {e}")
+    return TTS_PROVIDERS[name]
+
+def _run_generation(job, source, is_text, gen_kwargs, email, audiobook_name, base_url):
+    job_out = OUTPUT_DIR / job.id
+    segments = SEGMENTS[job.id] = SegmentStore(job_out / "segments")
+    gen_kwargs = {**gen_kwargs, "tts_provider": _tts_provider(gen_kwargs["tts_provider"])}
+    gen = AudiobookGenerator(output_dir=job_out, keep_chunks=False, progress=job.progress,
+                             on_segment=segments.add, **TTS_CONTROL, **gen_kwargs)
+    try:
+        parts = gen.process(source, is_text=is_text)
+    finally:
+        segments.finish()
+        # Cleanup upload if it was not moved by process
+        if not is_text and os.path.exists(source):
+            os.remove(source)
+    if not parts:
+        raise RuntimeError("No audio generated")
+    urls = [f"/api/download/{job.id}/{Path(p).relative_to(job_out).as_posix()}" for p in parts]
+    result = {"audio_url": urls[0], "parts": urls}
+    if not is_text:
+        result["table_detection"] = gen.table_stats.as_dict()
+    if gen.output_format != "mp3":
+        result["encoding"] = [st.as_dict() for st in gen.encode_stats]
+    if gen.tts_control is not None:
+        result["tts_control"] = gen.tts_control.stats.as_dict()
+    RESULTS.put(job.key, job.id, result)
+    for address in dict.fromkeys([email, *NOTIFY.pop(job.id, [])]):
+        if address:
+            NOTIFIER.notify(address, audiobook_name, f"{base_url}{urls[0]}")
+    return result
+
 @app.post("/api/generate/text")
 def generate_from_text(request: TextRequest, fastapi_request: Request):
-    try:
-        job_id = str(uuid.uuid4())
-        job_out = OUTPUT_DIR / job_id
-        
-        gen = AudiobookGenerator(
-            output_dir=job_out,
-            voice=request.voice,
-            keep_chunks=False,
-            use_openclaw=request.openclaw
-        )
-        
-        parts = gen.process(request.text, is_text=True)
-        
-        if not parts:
-            raise HTTPException(status_code=500, detail="No audio generated")
-            
-        final_file = parts[0]
-        relative_path = f"/api/download/{job_id}/{Path(final_file).name}"
-        
-        if request.email:
-            # Build absolute URL
-            base_url = str(fastapi_request.base_url).rstrip('/')
-            absolute_url = f"{base_url}{relative_path}"
-            send_notification_email(request.email, "Your Text Snippet", absolute_url)
-        
-        return {"status": "success", "audio_url": relative_path}
-    except Exception as e:
-        print(f"Error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    _tts_provider(request.tts_provider)
+    gen_kwargs = dict(voice=request.voice, tts_provider=request.tts_provider, use_openclaw=request.openclaw,
+                      chunk_size=CHUNK_SIZE, tts_cache=TTS_CACHE, duration_model=DURATION_MODEL)
+    base_url = str(fastapi_request.base_url).rstrip('/')
+    key = _job_key(text_sha256(request.text), gen_kwargs)
+    _, response = _submit(_run_generation, request.text, True, gen_kwargs, request.email,
+                          "Your Text Snippet", base_url, label="text", job_id=str(uuid.uuid4()), key=key,
+                          email=request.email)
+    return response
 
 @app.post("/api/generate/pdf")
 def generate_from_pdf(
     fastapi_request: Request,
     file: UploadFile = File(...), 
-    voice: str = Form("en-GB-RyanNeural"),
+    voice: Optional[str] = Form(None),
+    tts_provider: str = Form("edge"),
     openclaw: bool = Form(True),
-    email: Optional[str] = Form(None)
+    email: Optional[str] = Form(None),
+    extract_engine: str = Form("pdfplumber"),
+    tables: str = Form("auto"),
+    ocr: bool = Form(True),
+    format: str = Form("mp3"),
+    pipeline: bool = Form(False)
 ):
+    if extract_engine not in ENGINES:
+        raise HTTPException(status_code=400, detail=f"Unknown extract_engine; choose from {sorted(ENGINES)}")
+    if tables not in TABLE_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown tables mode; choose from {list(TABLE_MODES)}")
+    if format not in OUTPUT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format; choose from {list(OUTPUT_FORMATS)}")
+    _tts_provider(tts_provider)
+    job_id = str(uuid.uuid4())
+    filename = file.filename
+    temp_pdf = UPLOAD_DIR / f"{job_id}_{filename}"
+    source_hash = save_upload(file.file, temp_pdf)
+
+    gen_kwargs = dict(voice=voice, tts_provider=tts_provider, use_openclaw=openclaw, chunk_size=CHUNK_SIZE,
+                      tts_cache=TTS_CACHE,
+                      extract_engine=extract_engine, table_mode=tables, ocr=ocr, ocr_cache_dir=OCR_CACHE_DIR,
+                      duration_model=DURATION_MODEL, output_format=format, pipeline=pipeline)
+    base_url = str(fastapi_request.base_url).rstrip('/')
     try:
-        job_id = str(uuid.uuid4())
-        job_out = OUTPUT_DIR / job_id
-        
-        filename = file.filename
-        temp_pdf = UPLOAD_DIR / f"{job_id}_{filename}"
-        with open(temp_pdf, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        gen = AudiobookGenerator(
-            output_dir=job_out,
-            voice=voice,
-            keep_chunks=False,
-            use_openclaw=openclaw
-        )
-        
-        parts = gen.process(str(temp_pdf), is_text=False)
-        
-        # Cleanup upload if it was moved/copied by process
-        if os.path.exists(temp_pdf):
-            os.remove(temp_pdf)
-        
-        if not parts:
-            raise HTTPException(status_code=500, detail="No audio generated")
-            
-        final_file = parts[0]
-        relative_path = f"/api/download/{job_id}/{Path(final_file).name}"
-        
-        if email:
-            base_url = str(fastapi_request.base_url).rstrip('/')
-            absolute_url = f"{base_url}{relative_path}"
-            send_notification_email(email, filename, absolute_url)
-        
-        return {"status": "success", "audio_url": relative_path}
-    except Exception as e:
-        print(f"Error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/api/download/{job_id}/{filename}")
-async def download_file(job_id: str, filename: str):
-    file_path = OUTPUT_DIR / job_id / filename
-    if not file_path.exists():
+        served_by, response = _submit(_run_generation, str(temp_pdf), False, gen_kwargs, email, filename,
+                                      base_url, label=filename, job_id=job_id,
+                                      key=_job_key(source_hash, gen_kwargs), email=email)
+    except HTTPException:
+        os.remove(temp_pdf)
+        raise
+    if served_by != job_id:
+        os.remove(temp_pdf)  # an earlier job's outputs answer this request
+    return response
+
+def _job_dir_or_404(job_id: str) -> Path:
+    job_dir = (OUTPUT_DIR / job_id).resolve()
+    if job_dir.parent != OUTPUT_DIR.resolve() or not job_dir.is_dir():
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_dir
+
+def _job_finished(job_id: str) -> bool:
+    """A finished job's files never change; jobs unknown to this server run finished in an earlier one."""
+    job = JOBS.get(job_id)
+    return job is None or job.status == "done"
+
+def _job_or_404(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def _job_status(job) -> dict:
+    status = job.snapshot()
+    segments = SEGMENTS.get(job.id)
+    status["segments_ready"] = segments.ready if segments else 0
+    status["seconds_ready"] = round(segments.ready_seconds(), 1) if segments else 0.0
+    if job.status == "done":
+        status.update(job.result)
+    return status
+
+@app.get("/api/jobs/{job_id}")
+def job_status(job_id: str):
+    return _job_status(_job_or_404(job_id))
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """Server-Sent Events stream of job progress; ends once the job finishes."""
+    job = _job_or_404(job_id)
+
+    async def stream():
+        last_version = -1
+        last_sent = 0.0
+        while True:
+            if await request.is_disconnected():
+                return
+            if job.version != last_version:
+                last_version = job.version
+                last_sent = time.monotonic()
+                yield f"event: progress\ndata: {json.dumps(_job_status(job))}\n\n"
+                if job.status in TERMINAL:
+                    return
+            elif time.monotonic() - last_sent > 15:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(SSE_POLL_SECONDS)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def _segments_or_404(job_id: str) -> SegmentStore:
+    segments = SEGMENTS.get(job_id)
+    if segments is None:
+        seg_dir = OUTPUT_DIR / job_id / "segments"
+        if not seg_dir.is_dir():
+            raise HTTPException(status_code=404, detail="No audio for this job")
+        # Job from a previous server run: rebuild the index from the files on disk
+        segments = SEGMENTS[job_id] = SegmentStore.load(seg_dir)
+    return segments
+
+@app.get("/api/jobs/{job_id}/playlist.m3u8")
+def job_playlist(job_id: str):
+    """HLS playlist of the chunks finished so far; grows until the job completes."""
+    segments = _segments_or_404(job_id)
+    body = segments.playlist(lambda i: f"/api/jobs/{job_id}/segments/{i}.mp3")
+    return Response(body, media_type="application/vnd.apple.mpegurl", headers={"Cache-Control": "no-cache"})
+
+@app.api_route("/api/jobs/{job_id}/segments/{index}.mp3", methods=["GET", "HEAD"])
+def job_segment(job_id: str, index: int, request: Request):
+    segments = _segments_or_404(job_id)
+    if index < 0 or index >= segments.ready:
+        raise HTTPException(status_code=404, detail="Segment not ready")
+    return _serve_file(request, segments.path(index), "audio/mpeg", immutable=True)
+
+@app.get("/api/jobs/{job_id}/manifest")
+def job_manifest(job_id: str):
+    """Every finished part of the job, in order, with its size, duration and ETag."""
+    job_dir = _job_dir_or_404(job_id)
+    recorded = recorded_parts(job_dir)
+    job = JOBS.get(job_id)
+    parts = []
+    for path, _ in recorded:
+        st = path.stat()
+        seconds = FILE_INFO.duration(path, st)
+        parts.append({
+            "name": path.name,
+            "url": f"/api/download/{job_id}/{path.relative_to(job_dir).as_posix()}",
+            "media_type": mimetypes.guess_type(path.name)[0] or "audio/mpeg",
+            "bytes": st.st_size,
+            "seconds": round(seconds, 3) if seconds is not None else None,
+            "etag": FILE_INFO.etag(path, st),
+        })
+    return JSONResponse({
+        "job_id": job_id,
+        "complete": bool(parts) and (job.status == "done" if job else all(done for _, done in recorded)),
+        "parts": parts,
+        "total_bytes": sum(p["bytes"] for p in parts),
+        "total_seconds": round(sum(p["seconds"] or 0.0 for p in parts), 3),
+    }, headers={"Cache-Control": REVALIDATE})
+
+@app.get("/api/jobs/{job_id}/stream.mp3")
+async def job_stream(job_id: str, request: Request, start: float = 0.0):
+    """Continuous MP3 of the book from `start` seconds, following generation as it progresses."""
+    segments = _segments_or_404(job_id)
+
+    async def stream():
+        index, offset = segments.locate(start)
+        while True:
+            if index < segments.ready:
+                yield await asyncio.to_thread(segments.read, index, offset)
+                index, offset = index + 1, 0.0
+                continue
+            if segments.complete or await request.is_disconnected():
+                return
+            await asyncio.sleep(SSE_POLL_SECONDS)
+
+    return StreamingResponse(stream(), media_type="audio/mpeg", headers={"Cache-Control": "no-cache"})
+
+@app.delete("/api/jobs/{job_id}")
+def cancel_job(job_id: str):
+    job = JOBS.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.snapshot()
+
+@app.get("/api/jobs")
+def list_jobs():
+    return {"running": JOBS.running, "queued": JOBS.queued,
+            "max_workers": JOBS.max_workers, "max_queue": JOBS.max_queue}
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    stats = TTS_CACHE.stats.as_dict()
+    stats["size_bytes"] = TTS_CACHE.size_bytes
+    stats["max_bytes"] = TTS_CACHE.max_bytes
+    stats["results"] = {"entries": len(RESULTS), "size_bytes": RESULTS.size_bytes, "max_bytes": RESULTS.max_bytes}
+    return stats
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return Response(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.api_route("/api/download/{job_id}/{filename:path}", methods=["GET", "HEAD"])
+def download_file(job_id: str, filename: str, request: Request):
+    # PDF jobs keep their parts in a subfolder named after the book
+    job_dir = _job_dir_or_404(job_id)
+    file_path = (job_dir / filename).resolve()
+    if job_dir not in file_path.parents or not file_path.is_file():
         raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(file_path, media_type="audio/mpeg", filename=filename)
+    media_type = mimetypes.guess_type(file_path.name)[0] or "audio/mpeg"
+    return _serve_file(request, file_path, media_type, immutable=_job_finished(job_id), filename=file_path.name)
 
 if __name__ == "__main__":
     import uvicorn